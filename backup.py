@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Backup
+以 SQLite 線上備份 API（Connection.backup）分段複製資料庫，其他程式寫入時也能得到一致的副本
+
+可在背景執行緒中使用，也可在命令列執行（例如排程每晚的快照）：
+
+    python backup.py app.db backups/ --check
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+# 每一步複製的頁數；每一步之間會釋放來源資料庫的鎖定，讓其他連接可以寫入
+BACKUP_PAGES = 1024
+
+# 來源資料庫被鎖定時，重試前等待的秒數
+BACKUP_RETRY_SLEEP = 0.05
+
+# 其他連接在兩步之間寫入時 SQLite 會從第一頁重新備份；重新開始超過這個次數就改為一步複製整個資料庫
+BACKUP_MAX_RESTARTS = 3
+
+
+class BackupCancelled(Exception):
+    """進度回呼要求取消備份"""
+
+
+class _BackupRestarted(Exception):
+    """來源資料庫持續被寫入，分段備份一再重新開始"""
+
+
+def _open_source(source_path):
+    """以唯讀方式開啟來源資料庫，避免備份過程意外寫入"""
+    uri = Path(os.path.abspath(source_path)).as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+
+def snapshot_path(source_path, directory):
+    """在 directory 中產生帶有時間戳記的備份檔名，例如 app-20240101-020000.db"""
+    stem, extension = os.path.splitext(os.path.basename(source_path))
+    return os.path.join(directory, f"{stem}-{time.strftime('%Y%m%d-%H%M%S')}{extension or '.db'}")
+
+
+def check_integrity(path):
+    """對資料庫執行 PRAGMA integrity_check，回傳問題列表（沒有問題時為空列表）"""
+    connection = sqlite3.connect(path)
+    try:
+        problems = [row[0] for row in connection.execute("PRAGMA integrity_check")]
+    finally:
+        connection.close()
+    return [] if problems == ['ok'] else problems
+
+
+def backup_database(source_path, target_path, pages=BACKUP_PAGES, progress_callback=None, verify=False,
+                    sleep=BACKUP_RETRY_SLEEP, max_restarts=BACKUP_MAX_RESTARTS):
+    """將 source_path 備份到 target_path，回傳 (頁數, 完整性檢查的問題列表；未檢查時為 None)
+
+    每一步只複製 pages 頁，來源資料庫只在每一步期間被鎖定。其他連接在兩步之間寫入時，
+    SQLite 會從第一頁重新開始複製（該步完成後剩餘頁數沒有減少），結果仍是一致的快照；但來源持續被寫入時可能永遠無法完成，
+    因此重新開始超過 max_restarts 次後改為一步複製整個資料庫（期間持有讀取鎖定，WAL 模式下不會阻擋寫入）。
+    備份先寫入暫存檔，完成後才取代 target_path。
+    progress_callback(已複製頁數, 總頁數) 回傳 True 時取消，並拋出 BackupCancelled。
+    verify=True 時對備份執行 PRAGMA integrity_check（在取代 target_path 之後，問題由回傳值報告）。
+    """
+    temp_path = f"{target_path}.part"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    last_remaining = [None]
+    restarts = [0]
+
+    def on_progress(status, remaining, total):
+        if progress_callback and progress_callback(total - remaining, total):
+            raise BackupCancelled()
+        # 成功的一步之後剩餘頁數沒有減少，表示備份已從頭重新開始（等待鎖定的步驟不計）
+        if status == sqlite3.SQLITE_OK and last_remaining[0] is not None and remaining >= last_remaining[0]:
+            restarts[0] += 1
+            if restarts[0] > max_restarts:
+                raise _BackupRestarted()
+        last_remaining[0] = remaining
+
+    page_count = 0
+    source = _open_source(source_path)
+    try:
+        target = sqlite3.connect(temp_path)
+        try:
+            try:
+                source.backup(target, pages=max(1, pages), progress=on_progress, sleep=sleep)
+            except _BackupRestarted:
+                source.backup(target, pages=-1, progress=on_progress, sleep=sleep)
+            page_count = target.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            target.close()
+        os.replace(temp_path, target_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    finally:
+        source.close()
+
+    return page_count, check_integrity(target_path) if verify else None
+
+
+def main(argv=None):
+    """命令列介面；成功時回傳 0，完整性檢查失敗回傳 1，備份失敗回傳 2"""
+    parser = argparse.ArgumentParser(description="Back up a SQLite database with the online backup API.")
+    parser.add_argument('source', help="database to back up (may be in use by other processes)")
+    parser.add_argument('target', help="backup file, or an existing directory for a timestamped snapshot")
+    parser.add_argument('--pages', type=int, default=BACKUP_PAGES,
+                        help=f"pages copied per step (default {BACKUP_PAGES})")
+    parser.add_argument('--check', action='store_true', help="run PRAGMA integrity_check on the backup")
+    parser.add_argument('--quiet', action='store_true', help="do not print progress")
+    args = parser.parse_args(argv)
+
+    target_path = snapshot_path(args.source, args.target) if os.path.isdir(args.target) else args.target
+
+    def report(copied, total):
+        print(f"\r{copied}/{total} pages", end='', file=sys.stderr, flush=True)
+
+    started = time.monotonic()
+    try:
+        page_count, problems = backup_database(args.source, target_path, args.pages,
+                                               None if args.quiet else report, args.check)
+    except (sqlite3.Error, OSError) as e:
+        print(f"\nBackup failed: {e}", file=sys.stderr)
+        return 2
+    if not args.quiet:
+        print(file=sys.stderr)
+
+    print(f"Backed up {page_count} pages to {target_path} in {time.monotonic() - started:.1f}s")
+    if problems:
+        print("Integrity check failed:", *problems, sep='\n  ', file=sys.stderr)
+        return 1
+    if problems is not None:
+        print("Integrity check passed")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Edit Session Changes
+編輯過程中的變更記錄（復原/重做、提交時的衝突檢查）
+"""
+
+import csv
+import io
+
+from db_handler import coerce_value, get_type_affinity
+
+
+class EditJournal:
+    """編輯操作的復原/重做記錄
+
+    每一筆記錄是一個 dict，'kind' 為 'update'（整列前後的值）、'insert'、'delete'，
+    或 'batch'（'entries' 中的多個操作，一次復原）；其餘內容由呼叫端決定；套用與還原記錄的工作也由呼叫端負責，
+    因此復原只需處理受影響的資料列，不必重新載入表格。
+    """
+
+    def __init__(self):
+        self._undo_stack = []
+        self._redo_stack = []
+
+    def record(self, entry):
+        """記錄一個新操作；新的操作會清除重做記錄"""
+        self._undo_stack.append(entry)
+        self._redo_stack.clear()
+
+    def can_undo(self):
+        return bool(self._undo_stack)
+
+    def can_redo(self):
+        return bool(self._redo_stack)
+
+    def peek_undo(self):
+        return self._undo_stack[-1] if self._undo_stack else None
+
+    def undo(self):
+        """取出最後一個操作並移到重做記錄，沒有時回傳 None"""
+        if not self._undo_stack:
+            return None
+        entry = self._undo_stack.pop()
+        self._redo_stack.append(entry)
+        return entry
+
+    def redo(self):
+        """取出最後一個被復原的操作並移回復原記錄，沒有時回傳 None"""
+        if not self._redo_stack:
+            return None
+        entry = self._redo_stack.pop()
+        self._undo_stack.append(entry)
+        return entry
+
+    def discard_last(self):
+        """移除最後一個操作（例如套用到資料庫失敗時）"""
+        if self._undo_stack:
+            self._undo_stack.pop()
+
+    def clear(self):
+        self._undo_stack.clear()
+        self._redo_stack.clear()
+
+    def __len__(self):
+        return len(self._undo_stack)
+
+
+
+class ChangeTracker:
+    """追蹤未提交的變更，以來源模型的列號識別資料列
+
+    刪除的資料列只會被隱藏、不會從模型移除，因此列號在模型存在期間保持不變。
+    更新只記錄被修改的儲存格；查詢某一列是否有變更、取消變更都是 O(1)。
+    """
+
+    def __init__(self):
+        self._dirty = {}     # 列號 → {欄位: 新的文字}
+        self._keys = {}      # 列號 → 資料列識別值（rowid 或主鍵）
+        self._inserted = {}  # 列號 → 新增時輸入的資料
+        self._deleted = {}   # 列號 → 資料列識別值
+
+    def set_cell(self, row, key, column, value, original):
+        """記錄儲存格的新值；與原始值相同時取消該儲存格的變更"""
+        cells = self._dirty.get(row)
+        if value == original:
+            if cells and column in cells:
+                del cells[column]
+                if not cells:
+                    del self._dirty[row]
+                    self._keys.pop(row, None)
+            return
+        if cells is None:
+            cells = self._dirty[row] = {}
+            self._keys[row] = key
+        cells[column] = value
+
+    def cell_value(self, row, column, default=None):
+        """取得儲存格未提交的新值，沒有變更時回傳 default"""
+        cells = self._dirty.get(row)
+        if cells and column in cells:
+            return cells[column]
+        return default
+
+    def dirty_cells(self, row):
+        return dict(self._dirty.get(row, {}))
+
+    def is_dirty(self, row):
+        return row in self._dirty
+
+    def is_modified(self, row):
+        """資料列是否有未提交的更新或是新增的資料列"""
+        return row in self._dirty or row in self._inserted
+
+    def dirty_rows(self):
+        return list(self._dirty)
+
+    def mark_inserted(self, row, data):
+        self._inserted[row] = data
+
+    def is_inserted(self, row):
+        return row in self._inserted
+
+    def mark_deleted(self, row_keys):
+        """標記刪除 {列號: 識別值}"""
+        self._deleted.update(row_keys)
+
+    def unmark_deleted(self, rows):
+        for row in rows:
+            self._deleted.pop(row, None)
+
+    def is_deleted(self, row):
+        return row in self._deleted
+
+    def deleted_rows(self):
+        return list(self._deleted)
+
+    def take_rows(self, rows):
+        """取出並移除指定資料列的新增與更新記錄（例如刪除這些列時），回傳可交給 restore_rows 的狀態"""
+        state = {'dirty': {}, 'inserted': {}}
+        for row in rows:
+            if row in self._dirty:
+                state['dirty'][row] = (self._keys.pop(row, None), self._dirty.pop(row))
+            if row in self._inserted:
+                state['inserted'][row] = self._inserted.pop(row)
+        return state
+
+    def restore_rows(self, state):
+        for row, (key, cells) in state['dirty'].items():
+            self._dirty[row] = dict(cells)
+            self._keys[row] = key
+        self._inserted.update(state['inserted'])
+
+    def has_changes(self):
+        return bool(self._dirty or self._inserted or self._deleted)
+
+    def __len__(self):
+        """未提交變更的資料列數"""
+        return len(self._dirty) + len(self._inserted) + len(self._deleted)
+
+    def clear(self):
+        self._dirty.clear()
+        self._keys.clear()
+        self._inserted.clear()
+        self._deleted.clear()
+
+    def to_changes(self):
+        """轉換為變更列表：每筆新增、每列更新各一筆，所有刪除合併為一筆"""
+        changes = [{'action': 'insert', 'row': row, 'data': data}
+                   for row, data in sorted(self._inserted.items())]
+        changes += [{'action': 'update', 'row': row, 'key': self._keys.get(row), 'values': dict(cells)}
+                    for row, cells in sorted(self._dirty.items())]
+        if self._deleted:
+            rows = sorted(self._deleted)
+            changes.append({'action': 'delete', 'rows': rows, 'keys': [self._deleted[row] for row in rows]})
+        return changes
+
+# 提交時發現資料列已被其他連線修改的處理方式
+KEEP_THEIRS = 'keep'       # 保留資料庫目前的內容，放棄這一列的變更
+OVERWRITE = 'overwrite'    # 以目前編輯的整列內容覆寫
+MERGE = 'merge'            # 只寫入自己修改的欄位，保留其他欄位的新內容
+
+
+def find_conflicts(changes, current_rows):
+    """比較提交前重新讀取的資料列與開始編輯時的快照，找出被其他連線修改的資料列
+
+    changes 中的更新帶有 'original'（快照），刪除帶有 'originals'（{識別值: 快照}）；
+    current_rows 為 {識別值: {欄位: 值}}，已不存在的資料列不在其中。
+    回傳衝突列表，每筆為 dict：key、action、original、current（被刪除時為 None）、
+    ours（自己修改的欄位）、their_columns（被其他連線修改的欄位）、overlap（雙方改到同一欄位）。
+    """
+    conflicts = []
+    for change in changes:
+        if change['action'] == 'update':
+            snapshots = {change['key']: change.get('original')}
+            ours = change.get('values') or {}
+        elif change['action'] == 'delete':
+            snapshots = change.get('originals') or {}
+            ours = {}
+        else:
+            continue
+
+        for key, original in snapshots.items():
+            if original is None:
+                continue
+            current = current_rows.get(key)
+            if current is None:
+                # 刪除的資料列已經不存在，不算衝突
+                if change['action'] == 'update':
+                    conflicts.append({'key': key, 'action': 'update', 'original': original, 'current': None,
+                                      'ours': ours, 'their_columns': [], 'overlap': False})
+                continue
+
+            their_columns = [column for column, value in original.items()
+                             if column in current and current[column] != value]
+            if their_columns:
+                conflicts.append({'key': key, 'action': change['action'], 'original': original,
+                                  'current': current, 'ours': ours, 'their_columns': their_columns,
+                                  'overlap': bool(set(their_columns) & set(ours))})
+    return conflicts
+
+
+def overwrite_values(original, values, column_types):
+    """組成 OVERWRITE 時寫入的整列內容，回傳 {欄位: 值}
+
+    未修改的欄位使用開始編輯時讀取的原始值（保留 NULL、BLOB 等型別，不經過顯示文字），
+    修改過的儲存格依欄位的型別親和性轉換。
+    """
+    row_values = dict(original or {})
+    for column, value in values.items():
+        row_values[column] = coerce_value(value, column_types.get(column))
+    return row_values
+
+
+def resolve_conflicts(changes, conflicts, resolutions):
+    """依使用者選擇的處理方式（{識別值: KEEP_THEIRS | OVERWRITE | MERGE}）調整變更
+
+    未指定的衝突以 MERGE 處理；已被刪除的資料列無法更新，一律略過。
+    """
+    conflict_map = {(conflict['action'], conflict['key']): conflict for conflict in conflicts}
+    resolved = []
+    for change in changes:
+        if change['action'] == 'update':
+            conflict = conflict_map.get(('update', change['key']))
+            if conflict is None:
+                resolved.append(change)
+                continue
+            resolution = resolutions.get(change['key'], MERGE)
+            if conflict['current'] is None or resolution == KEEP_THEIRS:
+                continue
+            if resolution == OVERWRITE:
+                values = dict(change.get('row_values') or change['values'])
+                resolved.append(dict(change, values=values))
+            else:
+                resolved.append(change)
+        elif change['action'] == 'delete':
+            keys = [key for key in change['keys']
+                    if not (('delete', key) in conflict_map and resolutions.get(key, MERGE) == KEEP_THEIRS)]
+            if keys:
+                resolved.append(dict(change, keys=keys))
+        else:
+            resolved.append(change)
+    return resolved
+
+
+def rebase_changes(changes, current_rows):
+    """以重新讀取的資料列（current_rows）取代變更中的快照
+
+    使用者看過並處理衝突後呼叫；之後的 find_conflicts 只會找出這次讀取之後的新修改。
+    """
+    rebased = []
+    for change in changes:
+        if change['action'] == 'update' and change['key'] in current_rows and change.get('original') is not None:
+            current = current_rows[change['key']]
+            change = dict(change, original={column: current.get(column, value)
+                                            for column, value in change['original'].items()})
+        elif change['action'] == 'delete' and change.get('originals'):
+            change = dict(change, originals={
+                key: ({column: current_rows[key].get(column, value) for column, value in original.items()}
+                      if key in current_rows and original is not None else original)
+                for key, original in change['originals'].items()})
+        rebased.append(change)
+    return rebased
+
+
+def parse_pasted_text(text):
+    """解析從試算表複製的文字，回傳字串列表的列表
+
+    含 Tab 時視為 TSV（試算表複製的格式），否則視為 CSV；結尾的空白列會被移除。
+    """
+    if not text:
+        return []
+    delimiter = '\t' if '\t' in text else ','
+    rows = list(csv.reader(io.StringIO(text), delimiter=delimiter))
+    while rows and not any(cell.strip() for cell in rows[-1]):
+        rows.pop()
+    return rows
+
+
+def detect_header(rows, columns):
+    """第一列的每個值都是表格的欄位名稱（不分大小寫）時，視為標題列"""
+    if not rows or not rows[0]:
+        return False
+    names = {column.lower() for column in columns}
+    return all(cell.strip().lower() in names for cell in rows[0])
+
+
+def map_pasted_columns(rows, columns, has_header=False):
+    """決定貼上資料的每一欄寫入哪個表格欄位，回傳 (目標欄位列表, 資料列)
+
+    有標題列時依名稱對應，否則依序對應到 columns；沒有對應欄位的位置為 None。
+    """
+    if has_header:
+        lookup = {column.lower(): column for column in columns}
+        return [lookup.get(cell.strip().lower()) for cell in rows[0]], rows[1:]
+    width = max((len(row) for row in rows), default=0)
+    return [columns[index] if index < len(columns) else None for index in range(width)], rows
+
+
+def coerce_pasted_rows(rows, targets, column_types):
+    """依欄位的型別親和性轉換貼上的文字，回傳 ([{欄位: 值}], 不符合型別的儲存格 [(列索引, 欄位)])
+
+    數值欄位收到無法轉換的文字時保留原字串（SQLite 也會照樣儲存），但列入警告；
+    比目標欄位短的資料列只包含有值的欄位。
+    """
+    numeric = {column for column in targets
+               if column is not None and get_type_affinity(column_types.get(column)) in ('INTEGER', 'REAL', 'NUMERIC')}
+    values_rows = []
+    mismatches = []
+    for index, row in enumerate(rows):
+        values = {}
+        for text, column in zip(row, targets):
+            if column is None:
+                continue
+            value = coerce_value(text, column_types.get(column))
+            if column in numeric and isinstance(value, str):
+                mismatches.append((index, column))
+            values[column] = value
+        values_rows.append(values)
+    return values_rows, mismatches
@@ -176,6 +176,30 @@ class ConfigManager:
                 pass
         return None
 
+    def set_append_only_table(self, db_path, table_name, enabled):
+        """設定表格是否只會附加資料列（外部寫入時只讀取新的資料列）"""
+        if 'append_only_tables' not in self.config:
+            self.config['append_only_tables'] = {}
+        
+        import hashlib
+        key_string = f"{db_path}::{table_name}"
+        key = hashlib.md5(key_string.encode()).hexdigest()
+        if enabled:
+            self.config['append_only_tables'][key] = '1'
+        else:
+            self.config['append_only_tables'].pop(key, None)
+        self.save_config()
+
+    def is_append_only_table(self, db_path, table_name):
+        """表格是否被設定為只會附加資料列"""
+        if 'append_only_tables' not in self.config:
+            return False
+        
+        import hashlib
+        key_string = f"{db_path}::{table_name}"
+        key = hashlib.md5(key_string.encode()).hexdigest()
+        return key in self.config['append_only_tables']
+
     def save_last_database(self, db_path):
         """保存上次打開的資料庫"""
         if 'app' not in self.config:
@@ -5,9 +5,505 @@ SQLite Explorer - Database Handler
 """
 
 import sqlite3
+import re
+import string
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from PyQt5.QtCore import QObject, pyqtSignal
 import os
 
+from schema import read_schema_snapshot
+
+
+def quote_identifier(name):
+    """以雙引號包住識別字（表格、欄位名稱），避免特殊字元造成語法錯誤"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+@lru_cache(maxsize=128)
+def _compile_regexp(pattern):
+    return re.compile(pattern)
+
+
+def sqlite_regexp(pattern, value):
+    """SQLite 的 REGEXP 使用者函式：`value REGEXP pattern`
+
+    編譯後的正規表示式會被快取，避免每一列都重新編譯。
+    """
+    if pattern is None or value is None:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode('utf-8', errors='replace')
+    return 1 if _compile_regexp(pattern).search(str(value)) else 0
+
+
+def register_functions(connection):
+    """在連接上註冊 SQLite 沒有內建的函式（例如 REGEXP）"""
+    connection.create_function("REGEXP", 2, sqlite_regexp, deterministic=True)
+
+
+# 查詢中的 token：字串與加引號的識別字、註解、括號、關鍵字或識別字（其他字元略過）
+_SQL_TOKEN_PATTERN = re.compile(
+    r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|`(?:[^`]|``)*`|\[[^\]]*\]|--[^\n]*|/\*.*?(?:\*/|$)|[()]|[A-Za-z_]\w*""",
+    re.DOTALL)
+
+# WITH 子句之後可以接的主要語句
+_CTE_STATEMENT_KEYWORDS = ('SELECT', 'VALUES', 'INSERT', 'REPLACE', 'UPDATE', 'DELETE')
+
+
+def statement_keyword(query):
+    """回傳查詢主要語句的第一個關鍵字（大寫）；以 WITH 開頭時回傳 CTE 列表之後的語句（例如 DELETE）"""
+    depth = 0
+    first_word = None
+    for match in _SQL_TOKEN_PATTERN.finditer(query):
+        token = match.group()
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        elif depth == 0 and (token[0].isalpha() or token[0] == '_'):
+            word = token.upper()
+            if first_word is None:
+                if word != 'WITH':
+                    return word
+                first_word = word
+            elif word in _CTE_STATEMENT_KEYWORDS:
+                return word
+    return first_word or ''
+
+
+def is_read_only_query(query):
+    """判斷查詢是否只讀取資料（SELECT、VALUES、EXPLAIN，或 CTE 之後為 SELECT/VALUES 的 WITH）"""
+    return statement_keyword(query) in ('SELECT', 'VALUES', 'EXPLAIN')
+
+
+ROWID_ALIASES = ('rowid', '_rowid_', 'oid')
+
+
+def key_column_sql(column):
+    """資料列識別欄位的 SQL 寫法（rowid 別名不能加引號）"""
+    return column if column in ROWID_ALIASES else quote_identifier(column)
+
+
+def get_type_affinity(declared_type):
+    """依 SQLite 的規則，由宣告型別判斷欄位的型別親和性"""
+    declared_type = (declared_type or "").upper()
+    if 'INT' in declared_type:
+        return 'INTEGER'
+    if 'CHAR' in declared_type or 'CLOB' in declared_type or 'TEXT' in declared_type:
+        return 'TEXT'
+    if 'BLOB' in declared_type or not declared_type:
+        return 'BLOB'
+    if 'REAL' in declared_type or 'FLOA' in declared_type or 'DOUB' in declared_type:
+        return 'REAL'
+    return 'NUMERIC'
+
+
+def coerce_value(value, declared_type):
+    """將介面上輸入的文字轉換為符合欄位型別親和性的值
+
+    非文字欄位的空字串視為 NULL；無法轉換時保留原字串，交給 SQLite 處理。
+    """
+    if not isinstance(value, str):
+        return value
+
+    affinity = get_type_affinity(declared_type)
+    if affinity == 'TEXT':
+        return value
+    if value == '':
+        return None
+
+    text = value.strip()
+    if affinity in ('INTEGER', 'NUMERIC', 'REAL'):
+        try:
+            number = int(text)
+            return float(number) if affinity == 'REAL' else number
+        except ValueError:
+            pass
+        try:
+            number = float(text)
+            if affinity != 'REAL' and number.is_integer():
+                return int(number)
+            return number
+        except ValueError:
+            return value
+    return value
+
+
+# 提交變更時的執行順序：先刪除、再更新、最後新增，
+# 避免更新或新增的主鍵與稍後才刪除的資料列衝突
+CHANGE_ACTION_ORDER = ('delete', 'update', 'insert')
+
+# executemany 每批次的資料列數，每批完成後回報一次進度
+COMMIT_BATCH_SIZE = 2000
+
+# 每條 DELETE/SELECT ... IN (...) 綁定的參數數量（需低於 SQLite 3.32 之前的 999 個參數上限）；
+# 複合主鍵的每一列佔用多個參數，實際的資料列數見 key_chunk_size
+DELETE_CHUNK_SIZE = 500
+
+
+class CommitCancelled(Exception):
+    """使用者在提交過程中取消，交易已回滾"""
+
+
+def plan_changes(changes):
+    """將變更依語句形狀分組，回傳 [(action, columns, [change, ...]), ...]
+
+    每個 change 為 {'action': 'insert'|'update'|'delete', 'key': (...), 'values': {欄位: 值}}，
+    刪除可用 'keys': [(...), ...] 一次指定多列；
+    同一表格中 action 相同且欄位列表相同的變更可以共用一條語句，交給 executemany 執行。
+    """
+    groups = {}
+    for change in changes:
+        action = change['action']
+        columns = tuple(change.get('values') or ()) if action != 'delete' else ()
+        if action != 'delete' and not columns:
+            continue
+        groups.setdefault((action, columns), []).append(change)
+
+    return [(action, columns, group)
+            for (action, columns), group in sorted(groups.items(),
+                                                   key=lambda item: CHANGE_ACTION_ORDER.index(item[0][0]))]
+
+
+def plan_row_count(plan):
+    """plan_changes 的結果實際寫入的資料列數（刪除依資料列識別值計算），即 execute_changes 回報進度的總數"""
+    return sum(sum(len(change['keys']) if 'keys' in change else 1 for change in group)
+               if action == 'delete' else len(group)
+               for action, _, group in plan)
+
+
+def key_chunk_size(key_columns):
+    """每段 IN (...) 包含的資料列數，使綁定的參數不超過 DELETE_CHUNK_SIZE"""
+    return max(1, DELETE_CHUNK_SIZE // max(1, len(key_columns)))
+
+
+# 欄位名稱看起來像時間戳記（例如 created_at、updated_time）
+TIMESTAMP_NAME_PATTERN = re.compile(r'(^|_)(date|time|timestamp|ts|at|created|updated|modified)$', re.IGNORECASE)
+
+DATE_INPUT_FORMATS = ('%Y-%m-%d', '%Y/%m/%d', '%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S')
+
+
+def is_date_like_column(column_name, declared_type):
+    """判斷欄位是否存放日期或時間"""
+    declared_type = (declared_type or "").upper()
+    if 'DATE' in declared_type or 'TIME' in declared_type:
+        return True
+    return get_type_affinity(declared_type) == 'INTEGER' and bool(TIMESTAMP_NAME_PATTERN.search(column_name))
+
+
+def classify_search_text(search_text):
+    """判斷搜尋文字是數字、日期或一般文字
+
+    回傳 dict：kind 為 'integer'、'real'、'date' 或 'text'；
+    日期另外提供 ISO 字串範圍 text_range 與 epoch 秒數範圍 epoch_range。
+    """
+    text = search_text.strip()
+
+    try:
+        return {'kind': 'integer', 'value': int(text)}
+    except ValueError:
+        pass
+
+    try:
+        value = float(text)
+        if value == value and value not in (float('inf'), float('-inf')):
+            return {'kind': 'real', 'value': value}
+    except ValueError:
+        pass
+
+    for date_format in DATE_INPUT_FORMATS:
+        try:
+            start = datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+        # 只輸入日期時比對整天，含時間時比對該分鐘/秒
+        if '%S' in date_format:
+            end = start + timedelta(seconds=1)
+        elif '%M' in date_format:
+            end = start + timedelta(minutes=1)
+        else:
+            end = start + timedelta(days=1)
+        text_format = '%Y-%m-%d %H:%M:%S' if '%H' in date_format else '%Y-%m-%d'
+        return {
+            'kind': 'date',
+            'text_range': (start.strftime(text_format), end.strftime(text_format)),
+            'epoch_range': (int(start.replace(tzinfo=timezone.utc).timestamp()),
+                            int(end.replace(tzinfo=timezone.utc).timestamp())),
+        }
+
+    return {'kind': 'text', 'value': text}
+
+
+def table_schema_rows(table_info):
+    """將快照中的 TableInfo 轉換為 PRAGMA table_info 的格式：[(cid, name, type, notnull, dflt_value, pk)]"""
+    return [(column.cid, column.name, column.type, int(column.notnull), column.default, column.pk)
+            for column in table_info.table_info]
+
+
+def table_index_list(table_info):
+    """將快照中 TableInfo 的索引轉換為 [{'name', 'unique', 'primary', 'columns': [{'name', 'seqno'}]}]"""
+    return [{
+        'name': index.name,
+        'unique': index.unique,
+        'primary': index.primary,
+        'columns': [{'name': column.name, 'seqno': column.seqno} for column in index.columns]
+    } for index in table_info.indexes]
+
+
+def build_select_query(table_name, key_columns=None):
+    """建立讀取整個表格的查詢；提供 key_columns 時會先選出資料列識別欄位"""
+    key_columns = key_columns or []
+    select_list = ", ".join([key_column_sql(column) for column in key_columns] + ["*"])
+    return f"SELECT {select_list} FROM {quote_identifier(table_name)}"
+
+
+# LIKE 的跳脫字元；搜尋文字中的 % 與 _ 視為一般字元
+LIKE_ESCAPE = '\\'
+
+# SQLite 的 LIKE 只忽略 ASCII 字母的大小寫
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# 分隔各儲存格的字元，避免搜尋文字跨欄位比對成功
+SEARCH_KEY_SEPARATOR = '\x1f'
+
+
+def escape_like(text):
+    """跳脫 LIKE 的萬用字元，搭配 ESCAPE LIKE_ESCAPE 使用"""
+    return (text.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+            .replace('%', LIKE_ESCAPE + '%').replace('_', LIKE_ESCAPE + '_'))
+
+
+def regex_search_columns(schema_info):
+    """正規表示式搜尋比對的欄位：宣告型別不含 BLOB 的欄位"""
+    return [column_info[1] for column_info in schema_info
+            if len(column_info) >= 3 and 'BLOB' not in (column_info[2] or '').upper()]
+
+
+def search_conditions(schema_info, search_text, indexed_columns=()):
+    """依搜尋文字為各欄位建立比對條件，回傳 [(欄位, 宣告型別, 比對方式, 值, 是否有索引), ...]
+
+    比對方式為 'eq'（數字輸入對數值欄位完全比對）、'range'（日期輸入對日期/時間欄位做 [lo, hi) 範圍比對）
+    或 'like'（文字欄位的子字串比對，只忽略 ASCII 大小寫）。
+    build_search_query 將條件轉為 SQL，SearchMatcher 在記憶體中以相同的規則比對。
+    """
+    search_value = classify_search_text(search_text)
+    conditions = []
+
+    for column_info in schema_info:
+        if len(column_info) < 3:
+            continue
+        column_name = column_info[1]
+        column_type = (column_info[2] or "").upper()
+        affinity = get_type_affinity(column_type)
+        is_date_column = is_date_like_column(column_name, column_type)
+
+        # INTEGER PRIMARY KEY 是 rowid 的別名，本身就有索引
+        is_indexed = column_name in indexed_columns or (len(column_info) > 5 and column_info[5] and affinity == 'INTEGER')
+
+        if search_value['kind'] in ('integer', 'real') and affinity in ('INTEGER', 'REAL', 'NUMERIC') and not is_date_column:
+            conditions.append((column_name, column_type, 'eq', (search_value['value'],), is_indexed))
+        elif search_value['kind'] == 'date' and is_date_column:
+            # 以 epoch 秒數儲存的時間戳記比對數字範圍，其他比對 ISO 文字範圍
+            date_range = search_value['epoch_range'] if affinity in ('INTEGER', 'REAL') else search_value['text_range']
+            conditions.append((column_name, column_type, 'range', tuple(date_range), is_indexed))
+
+        if affinity == 'TEXT':
+            conditions.append((column_name, column_type, 'like', (search_text,), False))
+
+    return conditions
+
+
+def build_search_query(table_name, schema_info, indexes, search_text, regex=False, key_columns=None):
+    """建立搜尋查詢，回傳 (query, params)；沒有可搜尋的欄位時回傳 (None, None)
+
+    條件見 search_conditions；LIKE 會跳脫 % 與 _，搜尋文字一律視為一般字元。
+    有索引的欄位的條件和 LIKE 放在同一個 OR 中時 SQLite 只能全表掃描，因此拆成 UNION ALL 的兩段：
+    第一段只包含有索引的條件（可用索引查詢，結果最先串流回來），第二段才全表掃描其他條件，
+    並排除第一段已回傳的資料列。
+    regex=True 時改用 REGEXP（不分大小寫）比對所有非 BLOB 欄位。
+    schema_info 與 indexes 的格式與 DBHandler.get_table_schema/get_table_indexes 相同，
+    因此也可以在背景執行緒中由自己連接讀取的快照建立（見 table_schema_rows）。
+    提供 key_columns 時，結果的前幾欄為資料列識別值。
+    """
+    if regex:
+        # 先確認正規表示式有效，錯誤時直接讓呼叫端處理
+        _compile_regexp(search_text)
+        regex_columns = regex_search_columns(schema_info)
+        if not regex_columns:
+            return None, None
+        where_clause = " OR ".join(f"{quote_identifier(column)} REGEXP ?" for column in regex_columns)
+        query = f"{build_select_query(table_name, key_columns)} WHERE {where_clause}"
+        return query, [f"(?i){search_text}"] * len(regex_columns)
+
+    # 以索引第一個欄位開頭的條件，SQLite 才能用索引查詢
+    indexed_columns = set()
+    for index_info in indexes:
+        for column in index_info['columns']:
+            if column['seqno'] == 0:
+                indexed_columns.add(column['name'])
+
+    indexed_conditions = []
+    scan_conditions = []
+    for column_name, _, kind, values, is_indexed in search_conditions(schema_info, search_text, indexed_columns):
+        quoted = quote_identifier(column_name)
+        if kind == 'eq':
+            condition = (f"{quoted} = ?", list(values))
+        elif kind == 'range':
+            condition = (f"({quoted} >= ? AND {quoted} < ?)", list(values))
+        else:
+            condition = (f"{quoted} LIKE ? ESCAPE '{LIKE_ESCAPE}'", [f"%{escape_like(values[0])}%"])
+        (indexed_conditions if is_indexed else scan_conditions).append(condition)
+
+    select_query = build_select_query(table_name, key_columns)
+    if not indexed_conditions or not scan_conditions:
+        conditions = indexed_conditions or scan_conditions
+        if not conditions:
+            return None, None
+        where_clause = " OR ".join(condition for condition, _ in conditions)
+        search_params = [param for _, params in conditions for param in params]
+        return f"{select_query} WHERE {where_clause}", search_params
+
+    indexed_clause = " OR ".join(condition for condition, _ in indexed_conditions)
+    indexed_params = [param for _, params in indexed_conditions for param in params]
+    scan_clause = " OR ".join(condition for condition, _ in scan_conditions)
+    scan_params = [param for _, params in scan_conditions for param in params]
+    # IS NOT TRUE 讓條件為 NULL（例如欄位值為 NULL）的資料列也留在第二段
+    query = (f"{select_query} WHERE {indexed_clause} "
+             f"UNION ALL {select_query} WHERE ({scan_clause}) AND ({indexed_clause}) IS NOT TRUE")
+    return query, indexed_params + scan_params + indexed_params
+
+
+def _search_cell_text(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    return str(value)
+
+
+class SearchMatcher:
+    """在記憶體中以與 build_search_query 相同的規則比對資料列
+
+    columns 為資料列中各值的 [(欄位名稱, 宣告型別)]，宣告型別為 None 的欄位不參與比對。
+    值可以是 SQLite 讀出的 Python 值，也可以是表格上顯示的文字（比對數字與日期前會依宣告型別轉換）。
+    文字比對只用到 text_columns 中的欄位；text_key() 將它們串成一個搜尋字串，
+    規則相同的搜尋（key_spec 相同）可以共用預先計算的搜尋字串，每次按鍵只需做子字串比對。
+    """
+
+    def __init__(self, columns, search_text, regex=False):
+        positions = {name: position for position, (name, _) in enumerate(columns)}
+        schema_info = [(position, name, declared_type)
+                       for position, (name, declared_type) in enumerate(columns) if declared_type is not None]
+
+        self.conditions = []
+        if regex:
+            self.pattern = _compile_regexp(f"(?i){search_text}")
+            self.needle = None
+            self.text_columns = tuple(positions[column] for column in regex_search_columns(schema_info))
+        else:
+            self.pattern = None
+            self.needle = search_text.translate(_ASCII_LOWER)
+            text_columns = []
+            for column_name, declared_type, kind, values, _ in search_conditions(schema_info, search_text):
+                if kind == 'like':
+                    text_columns.append(positions[column_name])
+                else:
+                    self.conditions.append((positions[column_name], declared_type, kind, values))
+            self.text_columns = tuple(text_columns)
+        self.key_spec = (self.text_columns, regex)
+
+    def text_key(self, values):
+        """回傳一列的搜尋字串；NULL 不參與比對（SQLite 中 NULL LIKE/REGEXP 的結果為 NULL）"""
+        cells = (values[position] for position in self.text_columns)
+        if self.pattern is not None:
+            return SEARCH_KEY_SEPARATOR.join(_search_cell_text(value) for value in cells if value is not None)
+        return SEARCH_KEY_SEPARATOR.join('' if value is None else _search_cell_text(value)
+                                         for value in cells).translate(_ASCII_LOWER)
+
+    def matches(self, values, text_key=None):
+        """判斷資料列是否符合；可傳入預先計算的 text_key"""
+        if text_key is None:
+            text_key = self.text_key(values)
+        if self.pattern is not None:
+            return any(self.pattern.search(cell) for cell in text_key.split(SEARCH_KEY_SEPARATOR))
+        if self.needle in text_key:
+            return True
+
+        for position, declared_type, kind, condition_values in self.conditions:
+            value = coerce_value(values[position], declared_type)
+            if kind == 'eq':
+                if isinstance(value, (int, float)) and value == condition_values[0]:
+                    return True
+            else:
+                low, high = condition_values
+                # SQLite 中數字一律小於文字，不同型別的值不會落在範圍內
+                value_type = str if isinstance(low, str) else (int, float)
+                if isinstance(value, value_type) and low <= value < high:
+                    return True
+        return False
+
+
+# 每個索引鍵平均對應的資料列達到總數的這個比例時，視為選擇性低的索引（例如布林或狀態欄位）
+LOW_SELECTIVITY_FRACTION = 0.1
+
+# 資料列少於此數的表格不判斷選擇性（全表掃描本來就很快）
+LOW_SELECTIVITY_MIN_ROWS = 100
+
+
+# 近似分析時每個索引抽樣的資料列數（PRAGMA analysis_limit）
+ANALYSIS_LIMIT = 1000
+
+
+class AnalyzeCancelled(Exception):
+    """進度回呼要求取消 ANALYZE"""
+
+
+def parse_index_stat(stat):
+    """解析 sqlite_stat1 的 stat 字串，例如 "10000 50 2"
+
+    第一個數字是索引的資料列數，之後第 k 個數字是前 k 個欄位相同的資料列平均數（每個鍵值的平均資料列數），
+    最後可能有 unordered、sz=N 等選項。回傳的 selectivity 是以第一個欄位等值查詢時平均符合的資料列比例
+    （越小越好）；distinct_keys 是所有索引欄位組合的估計相異值數量。
+    """
+    numbers = []
+    options = []
+    for token in (stat or '').split():
+        if not options and token.isdigit():
+            numbers.append(int(token))
+        else:
+            options.append(token)
+    if not numbers:
+        return None
+
+    row_count, rows_per_key = numbers[0], numbers[1:]
+    selectivity = rows_per_key[0] / row_count if rows_per_key and row_count else None
+    return {
+        'row_count': row_count,
+        'rows_per_key': rows_per_key,
+        'selectivity': selectivity,
+        'distinct_keys': round(row_count / rows_per_key[-1]) if rows_per_key and rows_per_key[-1] else None,
+        'low_selectivity': (selectivity is not None and row_count >= LOW_SELECTIVITY_MIN_ROWS
+                            and selectivity >= LOW_SELECTIVITY_FRACTION),
+        'options': options,
+    }
+
+
+def analyze_tables(connection, tables, analysis_limit=0, progress_callback=None):
+    """逐一表格執行 ANALYZE，更新查詢規劃器使用的 sqlite_stat1
+
+    analysis_limit 大於 0 時設定 PRAGMA analysis_limit，每個索引只抽樣約這麼多列（大型表格快得多，統計為近似值）。
+    progress_callback(已完成的表格數, 表格總數, 表格名稱) 在每個表格開始前呼叫，回傳 True 時拋出 AnalyzeCancelled；
+    每個 ANALYZE 自行提交，取消時已分析的表格保留新的統計資料。
+    """
+    connection.execute(f"PRAGMA analysis_limit = {max(0, int(analysis_limit))}")
+    for index, table_name in enumerate(tables):
+        if progress_callback and progress_callback(index, len(tables), table_name):
+            raise AnalyzeCancelled()
+        connection.execute(f"ANALYZE main.{quote_identifier(table_name)}")
+    if progress_callback:
+        progress_callback(len(tables), len(tables), None)
+
+
 class DBHandler(QObject):
     """處理 SQLite 資料庫連接和操作的類別"""
     
@@ -21,6 +517,7 @@ class DBHandler(QObject):
         super().__init__()
         self.connection = None
         self.current_database = None
+        self._schema_snapshot = None  # get_schema_snapshot 的快取
         if db_path:
             self.connect_to_database(db_path)
         
@@ -33,7 +530,9 @@ class DBHandler(QObject):
             
             # 建立資料庫連接
             self.connection = sqlite3.connect(db_path)
+            register_functions(self.connection)
             self.current_database = db_path
+            self._schema_snapshot = None
             
             # 發送連接成功的信號
             self.database_connected.emit(db_path)
@@ -50,6 +549,7 @@ class DBHandler(QObject):
             self.connection.close()
             self.connection = None
             self.current_database = None
+            self._schema_snapshot = None
             self.database_disconnected.emit()
     
     def list_tables(self):
@@ -72,13 +572,21 @@ class DBHandler(QObject):
             return []
     
     def get_table_schema(self, table_name):
-        """獲取表格結構"""
+        """獲取表格結構，格式與 PRAGMA table_info 相同：[(cid, name, type, notnull, dflt_value, pk)]
+
+        由 schema 快取讀取；不在 main 資料庫中的表格（例如暫存表格）才直接查詢。
+        """
         if not self.connection:
             return []
 
         try:
+            table_info = self.get_schema_snapshot().table(table_name)
+            if table_info is not None:
+                return table_schema_rows(table_info)
+
             cursor = self.connection.cursor()
-            cursor.execute(f"PRAGMA table_info({table_name});")
+            cursor.execute("SELECT cid, name, type, \"notnull\", dflt_value, pk FROM pragma_table_info(?)",
+                           (table_name,))
             schema = cursor.fetchall()
 
             return schema
@@ -88,41 +596,80 @@ class DBHandler(QObject):
             return []
 
     def get_table_indexes(self, table_name):
-        """獲取表格的所有索引"""
+        """獲取表格的所有索引
+
+        由 schema 快取讀取；不在 main 資料庫中的表格才直接查詢（index_list 與 index_info 在同一個查詢中取得）。
+        """
         if not self.connection:
             return []
 
         try:
-            cursor = self.connection.cursor()
+            table_info = self.get_schema_snapshot().table(table_name)
+            if table_info is not None:
+                return table_index_list(table_info)
 
-            # 獲取所有索引
-            cursor.execute(f"PRAGMA index_list({table_name});")
-            indexes = cursor.fetchall()
-
-            index_details = []
-            for index in indexes:
-                index_name = index[1]
-                is_unique = index[2]
-                is_primary = index[3]
-
-                # 獲取索引的欄位信息
-                cursor.execute(f"PRAGMA index_info({index_name});")
-                index_columns = cursor.fetchall()
+            cursor = self.connection.cursor()
+            cursor.execute("""
+                SELECT il.name, il."unique", il.origin, ii.seqno, ii.name
+                FROM pragma_index_list(?) AS il LEFT JOIN pragma_index_info(il.name) AS ii
+                ORDER BY il.seq, ii.seqno
+            """, (table_name,))
 
-                index_detail = {
+            index_details = {}
+            for index_name, is_unique, origin, seqno, column_name in cursor.fetchall():
+                index_detail = index_details.setdefault(index_name, {
                     'name': index_name,
                     'unique': bool(is_unique),
-                    'primary': bool(is_primary),
-                    'columns': [{'name': col[2], 'seqno': col[0]} for col in index_columns]
-                }
-                index_details.append(index_detail)
+                    'primary': origin == 'pk',
+                    'columns': []
+                })
+                if seqno is not None:
+                    index_detail['columns'].append({'name': column_name, 'seqno': seqno})
 
-            return index_details
+            return list(index_details.values())
 
         except Exception as e:
             print(f"獲取表格索引時發生錯誤: {e}")
             return []
 
+    def get_schema_snapshot(self):
+        """取得整個資料庫結構的不可變快照 SchemaSnapshot（見 schema.py）
+
+        快照會被快取，直到 PRAGMA schema_version 改變（本連接或其他連接修改了結構）才重新讀取；
+        schema_version 只需讀取資料庫標頭，比重新讀取整個結構便宜得多。
+        """
+        if not self.connection:
+            return None
+        schema_version = self.connection.execute("PRAGMA schema_version").fetchone()[0]
+        if self._schema_snapshot is None or self._schema_snapshot.schema_version != schema_version:
+            self._schema_snapshot = read_schema_snapshot(self.connection)
+        return self._schema_snapshot
+
+    def get_index_statistics(self, table_name):
+        """讀取表格各索引的 sqlite_stat1 統計（見 parse_index_stat），回傳 {索引名稱: 統計}
+
+        資料庫尚未執行過 ANALYZE（沒有 sqlite_stat1）時回傳空字典。
+        """
+        if not self.connection:
+            return {}
+        
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return {}
+            cursor.execute("SELECT idx, stat FROM sqlite_stat1 WHERE tbl = ? AND idx IS NOT NULL", (table_name,))
+            statistics = {}
+            for index_name, stat in cursor.fetchall():
+                parsed = parse_index_stat(stat)
+                if parsed is not None:
+                    statistics[index_name] = parsed
+            return statistics
+            
+        except Exception as e:
+            print(f"獲取索引統計時發生錯誤: {e}")
+            return {}
+
     def get_table_data(self, table_name):
         """獲取表格的所有資料"""
         if not self.connection:
@@ -167,4 +714,279 @@ class DBHandler(QObject):
                 
         except Exception as e:
             print(f"執行查詢時發生錯誤: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def open_reader_connection(self):
+        """開啟一條唯讀連接，供背景執行緒使用
+
+        每個背景工作都應使用自己的連接；check_same_thread=False 讓 UI 執行緒
+        可以對它呼叫 interrupt() 來取消正在執行的查詢。
+        """
+        if not self.current_database:
+            return None
+
+        uri = Path(os.path.abspath(self.current_database)).as_uri() + "?mode=ro"
+        connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        register_functions(connection)
+        return connection
+
+    def open_writer_connection(self):
+        """開啟一條可寫入的連接，供背景執行緒的大量寫入（例如匯入）使用
+
+        與主連接分開，寫入期間 UI 仍可讀取；主連接有未完成的交易時會等待 busy timeout。
+        """
+        if not self.current_database:
+            return None
+
+        connection = sqlite3.connect(self.current_database, timeout=30, check_same_thread=False)
+        register_functions(connection)
+        return connection
+
+    def get_row_key_columns(self, table_name):
+        """取得用來唯一識別資料列的欄位
+
+        一般表格回傳 rowid（若被同名欄位遮蔽則改用 _rowid_ 或 oid）；
+        WITHOUT ROWID 表格回傳主鍵欄位；無法識別時回傳空列表。
+        """
+        if not self.connection:
+            return []
+
+        schema_info = self.get_table_schema(table_name)
+        column_names = {column_info[1].lower() for column_info in schema_info}
+
+        cursor = self.connection.cursor()
+        for alias in ROWID_ALIASES:
+            if alias in column_names:
+                continue
+            try:
+                cursor.execute(f"SELECT {alias} FROM {quote_identifier(table_name)} LIMIT 0")
+                return [alias]
+            except sqlite3.OperationalError:
+                # WITHOUT ROWID 表格沒有 rowid
+                break
+
+        pk_columns = sorted((column_info for column_info in schema_info if column_info[5]),
+                            key=lambda column_info: column_info[5])
+        return [column_info[1] for column_info in pk_columns]
+
+    def build_select_query(self, table_name, key_columns=None):
+        """建立讀取整個表格的查詢；提供 key_columns 時會先選出資料列識別欄位"""
+        return build_select_query(table_name, key_columns)
+
+    def build_search_query(self, table_name, search_text, regex=False, key_columns=None):
+        """建立搜尋查詢，回傳 (query, params)；沒有可搜尋的欄位時回傳 (None, None)
+
+        結構由 schema 快取讀取，條件的建立方式見模組層級的 build_search_query。
+        提供 key_columns 時，結果的前幾欄為資料列識別值（見 get_row_key_columns）。
+        """
+        return build_search_query(table_name, self.get_table_schema(table_name), self.get_table_indexes(table_name),
+                                  search_text, regex=regex, key_columns=key_columns)
+
+    def insert_row(self, cursor, table_name, values):
+        """插入一筆資料；values 為 {欄位: 值}，值會依欄位型別轉換"""
+        if not values:
+            return 0
+        column_types = self.get_column_types(table_name)
+        columns = list(values)
+        sql = (f"INSERT INTO {quote_identifier(table_name)} "
+               f"({', '.join(quote_identifier(column) for column in columns)}) "
+               f"VALUES ({', '.join('?' for _ in columns)})")
+        cursor.execute(sql, [coerce_value(values[column], column_types.get(column)) for column in columns])
+        return cursor.rowcount
+
+    def update_row(self, cursor, table_name, key_columns, key, values):
+        """以資料列識別值（rowid 或主鍵）更新一筆資料，只 SET 提供的欄位"""
+        if not values:
+            return 0
+        column_types = self.get_column_types(table_name)
+        set_clause = ", ".join(f"{quote_identifier(column)} = ?" for column in values)
+        sql = (f"UPDATE {quote_identifier(table_name)} SET {set_clause} "
+               f"WHERE {self.build_key_condition(key_columns)}")
+        params = [coerce_value(value, column_types.get(column)) for column, value in values.items()]
+        cursor.execute(sql, params + list(key))
+        return cursor.rowcount
+
+    def delete_row(self, cursor, table_name, key_columns, key):
+        """以資料列識別值（rowid 或主鍵）刪除一筆資料"""
+        sql = f"DELETE FROM {quote_identifier(table_name)} WHERE {self.build_key_condition(key_columns)}"
+        cursor.execute(sql, list(key))
+        return cursor.rowcount
+
+    def apply_changes(self, table_name, key_columns, changes, progress_callback=None):
+        """在單一 BEGIN IMMEDIATE 交易中套用一批變更，回傳處理的資料列數
+
+        progress_callback(已完成數, 總數) 回傳 True 時取消並回滾，拋出 CommitCancelled。
+        發生錯誤時整個交易回滾。
+        """
+        if not self.connection:
+            raise sqlite3.OperationalError("No database connected")
+
+        try:
+            if not self.connection.in_transaction:
+                self.connection.execute("BEGIN IMMEDIATE")
+            total = self.execute_changes(table_name, key_columns, changes, progress_callback)
+            self.connection.commit()
+            return total
+        except Exception:
+            self.connection.rollback()
+            raise
+
+    def execute_changes(self, table_name, key_columns, changes, progress_callback=None):
+        """在目前的交易中執行一批變更（不提交），回傳處理的資料列數
+
+        變更先以 plan_changes 分組，每組只準備一條語句並以 executemany 分批執行，
+        刪除則以 DELETE ... IN (...) 分段執行；欄位型別只讀取一次。
+        """
+        plan = plan_changes(changes)
+        total = plan_row_count(plan)
+        if not total:
+            return 0
+
+        column_types = self.get_column_types(table_name)
+        quoted_table = quote_identifier(table_name)
+        cursor = self.connection.cursor()
+        done = 0
+        for action, columns, group in plan:
+            if action == 'delete':
+                # 以 IN (...) 分段刪除，每段一條語句
+                keys = self._change_keys(group)
+                chunk_size = key_chunk_size(key_columns)
+                for start in range(0, len(keys), chunk_size):
+                    chunk = keys[start:start + chunk_size]
+                    condition, params = self.build_keys_condition(key_columns, chunk)
+                    cursor.execute(f"DELETE FROM {quoted_table} WHERE {condition}", params)
+
+                    done += len(chunk)
+                    if progress_callback and progress_callback(done, total):
+                        raise CommitCancelled("Commit cancelled")
+                continue
+
+            if action == 'insert':
+                sql = (f"INSERT INTO {quoted_table} "
+                       f"({', '.join(quote_identifier(column) for column in columns)}) "
+                       f"VALUES ({', '.join('?' for _ in columns)})")
+            else:
+                set_clause = ", ".join(f"{quote_identifier(column)} = ?" for column in columns)
+                sql = f"UPDATE {quoted_table} SET {set_clause} WHERE {self.build_key_condition(key_columns)}"
+
+            converters = [(column, column_types.get(column)) for column in columns]
+            for start in range(0, len(group), COMMIT_BATCH_SIZE):
+                batch = group[start:start + COMMIT_BATCH_SIZE]
+                params = []
+                for change in batch:
+                    row_params = [coerce_value(change['values'][column], declared_type)
+                                  for column, declared_type in converters]
+                    if action == 'update':
+                        key = change.get('key')
+                        if key is None:
+                            raise ValueError("Cannot identify the row to update (missing rowid/primary key)")
+                        row_params.extend(key)
+                    params.append(row_params)
+                cursor.executemany(sql, params)
+
+                done += len(batch)
+                if progress_callback and progress_callback(done, total):
+                    raise CommitCancelled("Commit cancelled")
+
+        return total
+
+    def get_data_version(self):
+        """取得 PRAGMA data_version；其他連線提交變更後這個值會改變"""
+        if not self.connection:
+            return None
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def fetch_rows_by_keys(self, table_name, key_columns, keys):
+        """以資料列識別值分段批次讀取資料列，回傳 {識別值: {欄位: 值}}（不存在的資料列不在其中）"""
+        rows = {}
+        if not self.connection or not keys:
+            return rows
+        key_count = len(key_columns)
+        cursor = self.connection.cursor()
+        chunk_size = key_chunk_size(key_columns)
+        for start in range(0, len(keys), chunk_size):
+            condition, params = self.build_keys_condition(key_columns, keys[start:start + chunk_size])
+            cursor.execute(f"{self.build_select_query(table_name, key_columns)} WHERE {condition}", params)
+            columns = [description[0] for description in cursor.description][key_count:]
+            for row in cursor.fetchall():
+                rows[tuple(row[:key_count])] = dict(zip(columns, row[key_count:]))
+        return rows
+
+    def fetch_appended_rows(self, table_name, key_column, last_key, loaded_count):
+        """讀取只會附加資料列的表格中 rowid 大於 last_key 的新資料列，回傳 (columns, rows)
+
+        rows 的第一欄為 rowid。先確認 rowid <= last_key 的資料列數仍等於 loaded_count；
+        不相等（有資料列被刪除）或 key_column 不是 rowid 時回傳 None，呼叫端應重新載入整個表格。
+        兩個查詢在同一個讀取交易中執行。已載入資料列的內容變更不會被偵測。
+        """
+        if not self.connection or key_column not in ROWID_ALIASES:
+            return None
+        quoted_table = quote_identifier(table_name)
+        own_transaction = not self.connection.in_transaction
+        if own_transaction:
+            self.connection.execute("BEGIN")
+        try:
+            cursor = self.connection.cursor()
+            query = self.build_select_query(table_name, [key_column])
+            if last_key is not None:
+                cursor.execute(f"SELECT COUNT(*) FROM {quoted_table} WHERE {key_column} <= ?", (last_key,))
+                if cursor.fetchone()[0] != loaded_count:
+                    return None
+                cursor.execute(f"{query} WHERE {key_column} > ? ORDER BY {key_column}", (last_key,))
+            elif loaded_count:
+                return None
+            else:
+                cursor.execute(f"{query} ORDER BY {key_column}")
+            columns = [description[0] for description in cursor.description]
+            return columns, cursor.fetchall()
+        finally:
+            if own_transaction:
+                self.connection.rollback()
+
+    def create_savepoint(self, name):
+        """建立 SAVEPOINT；沒有進行中的交易時先開始一個，確保 RELEASE 不會直接提交"""
+        if not self.connection.in_transaction:
+            self.connection.execute("BEGIN IMMEDIATE")
+        self.connection.execute(f"SAVEPOINT {quote_identifier(name)}")
+
+    def rollback_to_savepoint(self, name):
+        """復原到 SAVEPOINT 建立時的狀態並移除該 SAVEPOINT（外層交易保持開啟）"""
+        self.connection.execute(f"ROLLBACK TO {quote_identifier(name)}")
+        self.connection.execute(f"RELEASE {quote_identifier(name)}")
+
+    @staticmethod
+    def _change_keys(changes):
+        """取出刪除變更中所有資料列的識別值"""
+        keys = []
+        for change in changes:
+            change_keys = change['keys'] if 'keys' in change else [change.get('key')]
+            if any(key is None for key in change_keys):
+                raise ValueError("Cannot identify the row to delete (missing rowid/primary key)")
+            keys.extend(change_keys)
+        return keys
+
+    def build_keys_condition(self, key_columns, keys):
+        """建立比對多個資料列識別值的條件，回傳 (condition, params)
+
+        單一識別欄位使用 rowid IN (?, ...)；複合主鍵使用 row value：(a, b) IN (VALUES (?, ?), ...)。
+        """
+        if not key_columns:
+            raise ValueError("Table has no row identity (rowid or primary key)")
+        params = [value for key in keys for value in key]
+        if len(key_columns) == 1:
+            placeholders = ", ".join("?" for _ in keys)
+            return f"{key_column_sql(key_columns[0])} IN ({placeholders})", params
+        row_placeholder = "(" + ", ".join("?" for _ in key_columns) + ")"
+        columns = ", ".join(key_column_sql(column) for column in key_columns)
+        values = ", ".join(row_placeholder for _ in keys)
+        return f"({columns}) IN (VALUES {values})", params
+
+    def build_key_condition(self, key_columns):
+        """建立以資料列識別值比對的 WHERE 條件，例如 rowid = ?"""
+        if not key_columns:
+            raise ValueError("Table has no row identity (rowid or primary key)")
+        return " AND ".join(f"{key_column_sql(column)} = ?" for column in key_columns)
+
+    def get_column_types(self, table_name):
+        """取得 {欄位名稱: 宣告型別}"""
+        return {column_info[1]: column_info[2] for column_info in self.get_table_schema(table_name)}
@@ -3,10 +3,17 @@
 SQLite Explorer - Dialogs
 """
 
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QPushButton, QLineEdit, QFileDialog, QMessageBox, QInputDialog, QLabel, QFormLayout, QTableView, QHeaderView, QFrame, QWidget, QScrollArea, QTextEdit, QSpinBox, QDoubleSpinBox, QCheckBox, QGroupBox, QGridLayout
-from PyQt5.QtGui import QFont, QStandardItemModel, QStandardItem
-from PyQt5.QtCore import Qt, QTimer, QEvent
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QPushButton, QLineEdit, QFileDialog, QMessageBox, QInputDialog, QLabel, QFormLayout, QTableView, QHeaderView, QFrame, QWidget, QScrollArea, QTextEdit, QSpinBox, QDoubleSpinBox, QCheckBox, QGroupBox, QGridLayout, QTreeWidget, QTreeWidgetItem, QComboBox, QTableWidget, QTableWidgetItem, QListWidgetItem
+from PyQt5.QtGui import QFont, QStandardItemModel, QStandardItem, QColor
+from PyQt5.QtCore import Qt, QTimer, QEvent, pyqtSignal
 from config import ConfigManager
+from changes import KEEP_THEIRS, OVERWRITE, MERGE, coerce_pasted_rows, detect_header, map_pasted_columns
+from importers import (DELIMITERS, JSONL_EXTENSIONS, TYPE_SAMPLE_ROWS, import_delimited, import_jsonl, infer_column_types,
+                       read_sample_rows, sniff_delimited_file, sniff_jsonl_file, split_header)
+from exporters import DUMP_COMPRESSIONS, DUMP_ROWS_PER_INSERT, available_dump_compressions
+from transfer import IF_EXISTS_APPEND, IF_EXISTS_FAIL, IF_EXISTS_REPLACE
+from db_handler import ANALYSIS_LIMIT
+from workers import GlobalSearchWorker
 import os
 
 class DeleteConfirmDialog(QDialog):
@@ -822,3 +829,891 @@ class DataEditDialog(QDialog):
             changes.append(row_data)
             
         return changes
+
+
+class GlobalSearchDialog(QDialog):
+    """在資料庫所有表格中搜尋同一個值"""
+
+    # 使用者雙擊結果中的表格時發出（表格名稱、搜尋文字）
+    table_requested = pyqtSignal(str, str)
+
+    def __init__(self, parent, db_handler):
+        super().__init__(parent)
+        self.db_handler = db_handler
+        self.worker = None
+        self.matched_tables = 0
+        self.searched_tables = 0
+
+        self.setWindowTitle("Search All Tables")
+        self.setMinimumSize(600, 450)
+        self.resize(800, 600)
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        """設置對話框 UI"""
+        layout = QVBoxLayout(self)
+        layout.setSpacing(8)
+        layout.setContentsMargins(16, 16, 16, 16)
+
+        # 搜尋列
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Value to find in every table (ID, email, date...)")
+        self.search_input.returnPressed.connect(self.start_search)
+
+        self.search_btn = QPushButton("Search")
+        self.search_btn.clicked.connect(self.start_search)
+        self.search_btn.setDefault(True)
+
+        self.cancel_btn = QPushButton("Stop")
+        self.cancel_btn.clicked.connect(self.cancel_search)
+        self.cancel_btn.setEnabled(False)
+
+        search_layout.addWidget(self.search_input)
+        search_layout.addWidget(self.search_btn)
+        search_layout.addWidget(self.cancel_btn)
+        layout.addLayout(search_layout)
+
+        # 結果樹狀結構：表格 → 符合的資料列
+        self.results_tree = QTreeWidget()
+        self.results_tree.setHeaderLabel("Matches")
+        self.results_tree.setAlternatingRowColors(True)
+        self.results_tree.itemDoubleClicked.connect(self.on_result_double_clicked)
+        layout.addWidget(self.results_tree)
+
+        # 狀態列
+        self.status_label = QLabel("Enter a value and press Search")
+        self.status_label.setStyleSheet("""
+            QLabel {
+                color: #666666;
+                font-size: 12px;
+                padding: 4px 0px;
+            }
+        """)
+        layout.addWidget(self.status_label)
+
+    def start_search(self):
+        """對所有表格開始平行搜尋；各表格的查詢在背景執行緒中建立"""
+        search_text = self.search_input.text().strip()
+        if not search_text or not self.db_handler:
+            return
+
+        self.cancel_search()
+        self.results_tree.clear()
+        self.matched_tables = 0
+        self.searched_tables = 0
+
+        # 以對話框為 parent，對話框關閉前會先等待搜尋結束（見 cancel_search）
+        self.worker = GlobalSearchWorker(self.db_handler, search_text, parent=self)
+        self.worker.search_started.connect(self.on_search_started)
+        self.worker.table_matched.connect(self.on_table_matched)
+        self.worker.progress.connect(self.on_progress)
+        self.worker.search_finished.connect(self.on_search_finished)
+        self.worker.finished.connect(self.on_worker_finished)
+        self.worker.start()
+
+        self.cancel_btn.setEnabled(True)
+        self.status_label.setText("Searching...")
+
+    def cancel_search(self):
+        """停止目前的搜尋"""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.wait()
+            self.worker = None
+        self.cancel_btn.setEnabled(False)
+
+    def on_worker_finished(self):
+        """執行緒結束後釋放 worker"""
+        worker = self.sender()
+        if worker is self.worker:
+            self.worker = None
+        worker.deleteLater()
+
+    def on_search_started(self, total):
+        """查詢建立完成，開始搜尋"""
+        if self.sender() is not self.worker:
+            return
+        self.searched_tables = total
+        if total:
+            self.status_label.setText(f"Searching {total} tables...")
+        else:
+            self.status_label.setText("No searchable columns found")
+
+    def on_table_matched(self, table_name, columns, rows, timed_out):
+        """將單一表格的搜尋結果加入樹狀結構"""
+        if self.sender() is not self.worker:
+            return
+
+        # 達到每個表格的資料列上限時，實際符合的資料列可能更多
+        row_limit = self.worker.row_limit
+        if len(rows) >= row_limit:
+            label = f"📋 {table_name} ({row_limit}+ rows, showing the first {row_limit})"
+        else:
+            label = f"📋 {table_name} ({len(rows)} row{'s' if len(rows) != 1 else ''})"
+        if timed_out:
+            label += " ⏱ time limit reached"
+        table_item = QTreeWidgetItem([label])
+        table_item.setData(0, Qt.UserRole, {'type': 'table', 'name': table_name})
+
+        for row in rows:
+            row_text = ", ".join(f"{column}={value}" for column, value in zip(columns, row))
+            row_item = QTreeWidgetItem([row_text[:300]])
+            row_item.setData(0, Qt.UserRole, {'type': 'row', 'table': table_name})
+            table_item.addChild(row_item)
+
+        self.results_tree.addTopLevelItem(table_item)
+        self.matched_tables += 1
+
+    def on_progress(self, done, total):
+        """更新搜尋進度"""
+        if self.sender() is not self.worker:
+            return
+        self.status_label.setText(f"Searched {done}/{total} tables, {self.matched_tables} with matches")
+
+    def on_search_finished(self, cancelled):
+        """搜尋完成"""
+        if self.sender() is not self.worker:
+            return
+        self.cancel_btn.setEnabled(False)
+        if not cancelled and self.searched_tables:
+            self.status_label.setText(f"Done: {self.matched_tables} table(s) with matches")
+
+    def on_result_double_clicked(self, item):
+        """雙擊結果時在主視窗開啟該表格並套用相同的搜尋"""
+        data = item.data(0, Qt.UserRole)
+        if data:
+            table_name = data.get('name') or data.get('table')
+            self.table_requested.emit(table_name, self.search_input.text().strip())
+
+    def closeEvent(self, event):
+        self.cancel_search()
+        super().closeEvent(event)
+
+    def reject(self):
+        self.cancel_search()
+        super().reject()
+
+
+class ConflictDialog(QDialog):
+    """提交前發現資料列已被其他連線修改時，讓使用者逐列選擇處理方式"""
+
+    RESOLUTION_LABELS = [
+        (MERGE, "Merge (write only my edited columns)"),
+        (OVERWRITE, "Overwrite (write my whole row)"),
+        (KEEP_THEIRS, "Keep theirs (discard my change)"),
+    ]
+
+    def __init__(self, parent, conflicts):
+        super().__init__(parent)
+        self.conflicts = conflicts
+        self.combos = []
+
+        self.setWindowTitle("Commit Conflicts")
+        self.setMinimumSize(640, 400)
+        self.resize(820, 520)
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        """設置對話框 UI"""
+        layout = QVBoxLayout(self)
+        layout.setSpacing(8)
+        layout.setContentsMargins(16, 16, 16, 16)
+
+        message = QLabel(f"{len(self.conflicts)} row(s) were changed in the database since they were loaded. "
+                         "Choose how to commit each of them.")
+        message.setWordWrap(True)
+        layout.addWidget(message)
+
+        # 一次套用到所有資料列
+        all_layout = QHBoxLayout()
+        all_layout.addWidget(QLabel("Apply to all:"))
+        self.all_combo = self.create_resolution_combo()
+        self.all_combo.insertItem(0, "", None)
+        self.all_combo.setCurrentIndex(0)
+        self.all_combo.currentIndexChanged.connect(self.on_apply_to_all)
+        all_layout.addWidget(self.all_combo)
+        all_layout.addStretch()
+        layout.addLayout(all_layout)
+
+        # 衝突列表：資料列 → 欄位的原始值、資料庫目前的值、自己的值
+        self.conflict_tree = QTreeWidget()
+        self.conflict_tree.setColumnCount(4)
+        self.conflict_tree.setHeaderLabels(["Row / Column", "Loaded", "In database", "Mine"])
+        self.conflict_tree.setAlternatingRowColors(True)
+        self.conflict_tree.header().setSectionResizeMode(QHeaderView.Interactive)
+        layout.addWidget(self.conflict_tree)
+
+        for conflict in self.conflicts:
+            key_text = ", ".join(str(value) for value in conflict['key'])
+            action = "Delete" if conflict['action'] == 'delete' else "Update"
+            row_item = QTreeWidgetItem([f"{action} row ({key_text})"])
+            self.conflict_tree.addTopLevelItem(row_item)
+
+            combo = self.create_resolution_combo()
+            if conflict['current'] is None:
+                # 資料列已被刪除，只能放棄變更
+                row_item.setText(2, "(deleted)")
+                combo.setCurrentIndex(combo.findData(KEEP_THEIRS))
+                combo.setEnabled(False)
+            elif conflict['overlap'] or conflict['action'] == 'delete':
+                combo.setCurrentIndex(combo.findData(KEEP_THEIRS))
+            self.conflict_tree.setItemWidget(row_item, 3, combo)
+            self.combos.append((conflict['key'], combo))
+
+            columns = list(conflict['their_columns'])
+            columns += [column for column in conflict['ours'] if column not in columns]
+            for column in columns:
+                current = conflict['current'] or {}
+                child = QTreeWidgetItem([
+                    column,
+                    self.format_value(conflict['original'].get(column)),
+                    self.format_value(current.get(column)),
+                    self.format_value(conflict['ours'].get(column, conflict['original'].get(column))),
+                ])
+                row_item.addChild(child)
+            row_item.setExpanded(True)
+
+        self.conflict_tree.resizeColumnToContents(0)
+
+        # 按鈕
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.reject)
+        self.commit_btn = QPushButton("Commit")
+        self.commit_btn.setDefault(True)
+        self.commit_btn.clicked.connect(self.accept)
+        button_layout.addWidget(self.cancel_btn)
+        button_layout.addWidget(self.commit_btn)
+        layout.addLayout(button_layout)
+
+    def create_resolution_combo(self):
+        combo = QComboBox()
+        for resolution, label in self.RESOLUTION_LABELS:
+            combo.addItem(label, resolution)
+        return combo
+
+    def format_value(self, value):
+        return "NULL" if value is None else str(value)
+
+    def on_apply_to_all(self, index):
+        resolution = self.all_combo.itemData(index)
+        if resolution is None:
+            return
+        for _, combo in self.combos:
+            if combo.isEnabled():
+                combo.setCurrentIndex(combo.findData(resolution))
+
+    def get_resolutions(self):
+        """回傳 {資料列識別值: KEEP_THEIRS | OVERWRITE | MERGE}"""
+        return {key: combo.currentData() for key, combo in self.combos}
+
+
+class PastePreviewDialog(QDialog):
+    """預覽從剪貼簿貼上的資料：選擇新增或覆寫、是否有標題列，並標示不符合欄位型別的值"""
+
+    APPEND = 'append'
+    OVERWRITE = 'overwrite'
+
+    # 預覽表格最多顯示的資料列數
+    PREVIEW_ROWS = 200
+
+    MISMATCH_COLOR = QColor(255, 205, 210)
+
+    def __init__(self, parent, rows, append_columns, overwrite_columns, column_types, overwrite_row_count=0):
+        super().__init__(parent)
+        self.rows = rows
+        self.append_columns = append_columns
+        self.overwrite_columns = overwrite_columns
+        self.column_types = column_types
+        self.overwrite_row_count = overwrite_row_count
+        self.targets = []
+        self.values_rows = []
+
+        self.setWindowTitle("Paste Rows")
+        self.setMinimumSize(640, 400)
+        self.resize(860, 540)
+
+        self.setup_ui()
+        self.update_preview()
+
+    def setup_ui(self):
+        """設置對話框 UI"""
+        layout = QVBoxLayout(self)
+        layout.setSpacing(8)
+        layout.setContentsMargins(16, 16, 16, 16)
+
+        options_layout = QHBoxLayout()
+        options_layout.addWidget(QLabel("Paste as:"))
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItem("New rows", self.APPEND)
+        if self.overwrite_row_count:
+            self.mode_combo.addItem(f"Overwrite from the current cell ({self.overwrite_row_count} row(s))",
+                                    self.OVERWRITE)
+        self.mode_combo.currentIndexChanged.connect(self.update_preview)
+        options_layout.addWidget(self.mode_combo)
+
+        self.header_checkbox = QCheckBox("First row is a header")
+        self.header_checkbox.setChecked(detect_header(self.rows, list(self.column_types)))
+        self.header_checkbox.toggled.connect(self.update_preview)
+        options_layout.addWidget(self.header_checkbox)
+        options_layout.addStretch()
+        layout.addLayout(options_layout)
+
+        self.summary_label = QLabel()
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+        self.preview_model = QStandardItemModel()
+        self.preview_view = QTableView()
+        self.preview_view.setModel(self.preview_model)
+        self.preview_view.setEditTriggers(QTableView.NoEditTriggers)
+        self.preview_view.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        layout.addWidget(self.preview_view)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.reject)
+        self.paste_btn = QPushButton("Paste")
+        self.paste_btn.setDefault(True)
+        self.paste_btn.clicked.connect(self.accept)
+        button_layout.addWidget(self.cancel_btn)
+        button_layout.addWidget(self.paste_btn)
+        layout.addLayout(button_layout)
+
+    def get_mode(self):
+        return self.mode_combo.currentData()
+
+    def update_preview(self):
+        """依目前的選項重新對應欄位、轉換型別並更新預覽"""
+        has_header = self.header_checkbox.isChecked()
+        if has_header:
+            columns = list(self.column_types)
+        elif self.get_mode() == self.OVERWRITE:
+            columns = self.overwrite_columns
+        else:
+            columns = self.append_columns
+        self.targets, rows = map_pasted_columns(self.rows, columns, has_header)
+        self.values_rows, mismatches = coerce_pasted_rows(rows, self.targets, self.column_types)
+
+        mapped = [column for column in self.targets if column is not None]
+        parts = [f"{len(rows)} row(s) × {len(mapped)} column(s)"]
+        ignored = len(self.targets) - len(mapped)
+        if ignored:
+            parts.append(f"{ignored} pasted column(s) have no matching table column and will be ignored")
+        if mismatches:
+            parts.append(f"{len(mismatches)} value(s) do not match the column type (highlighted)")
+        if self.get_mode() == self.OVERWRITE and len(rows) > 1 and len(rows) > self.overwrite_row_count:
+            parts.append(f"only the first {self.overwrite_row_count} row(s) fit below the current cell")
+        self.summary_label.setText("; ".join(parts) + ".")
+        self.paste_btn.setEnabled(bool(rows and mapped))
+
+        # 預覽只顯示前面的資料列
+        mismatch_cells = set(mismatches)
+        self.preview_model.clear()
+        self.preview_model.setHorizontalHeaderLabels(mapped)
+        for index, values in enumerate(self.values_rows[:self.PREVIEW_ROWS]):
+            items = []
+            for column in mapped:
+                value = values.get(column)
+                item = QStandardItem("" if value is None else str(value))
+                if (index, column) in mismatch_cells:
+                    item.setBackground(self.MISMATCH_COLOR)
+                items.append(item)
+            self.preview_model.appendRow(items)
+
+    def get_paste(self):
+        """回傳 (APPEND | OVERWRITE, [{欄位: 值}])"""
+        return self.get_mode(), self.values_rows
+
+
+class ImportDialog(QDialog):
+    """CSV/TSV 與 JSON Lines 匯入精靈：選擇目標表格，並設定每個檔案欄位寫入的欄位與型別
+
+    目標表格可以是新表格（依樣本推斷欄位型別），或既有的表格（依欄位名稱對應）。
+    CSV/TSV 可選擇分隔字元與標題列；JSON Lines 可選擇展開巢狀物件或保留為 JSON 文字。
+    """
+
+    COLUMN_TYPES = ['INTEGER', 'REAL', 'TEXT', 'NUMERIC', 'BLOB']
+    SKIP = "(skip)"
+
+    def __init__(self, parent, path, tables, get_table_columns):
+        super().__init__(parent)
+        self.path = path
+        self.tables = tables
+        self.get_table_columns = get_table_columns  # 表格名稱 → [(欄位, 宣告型別)]
+        self.is_jsonl = os.path.splitext(path)[1].lower() in JSONL_EXTENSIONS
+        self.source_columns = []
+        self.sample_rows = []
+        self.inferred_types = []
+
+        self.setWindowTitle("Import JSON Lines" if self.is_jsonl else "Import CSV")
+        self.setMinimumSize(680, 480)
+        self.resize(860, 600)
+
+        self.setup_ui()
+        self.load_file()
+
+    def setup_ui(self):
+        """設置對話框 UI"""
+        layout = QVBoxLayout(self)
+        layout.setSpacing(8)
+        layout.setContentsMargins(16, 16, 16, 16)
+
+        file_label = QLabel(f"File: {self.path}")
+        file_label.setWordWrap(True)
+        layout.addWidget(file_label)
+
+        format_layout = QHBoxLayout()
+        self.delimiter_combo = QComboBox()
+        for delimiter, label in DELIMITERS.items():
+            self.delimiter_combo.addItem(label, delimiter)
+        self.header_checkbox = QCheckBox("First row is a header")
+        self.flatten_checkbox = QCheckBox("Flatten nested objects into columns (a.b); "
+                                          "otherwise keep them as JSON text for json_extract")
+        self.flatten_checkbox.setChecked(True)
+        if self.is_jsonl:
+            format_layout.addWidget(self.flatten_checkbox)
+        else:
+            format_layout.addWidget(QLabel("Delimiter:"))
+            format_layout.addWidget(self.delimiter_combo)
+            format_layout.addWidget(self.header_checkbox)
+        format_layout.addStretch()
+        layout.addLayout(format_layout)
+
+        # 輸入新的名稱建立新表格，或選擇既有的表格
+        table_layout = QHBoxLayout()
+        table_layout.addWidget(QLabel("Table:"))
+        self.table_combo = QComboBox()
+        self.table_combo.setEditable(True)
+        self.table_combo.addItems(self.tables)
+        self.table_combo.setEditText(os.path.splitext(os.path.basename(self.path))[0])
+        self.table_combo.setMinimumWidth(240)
+        table_layout.addWidget(self.table_combo)
+        self.table_kind_label = QLabel()
+        self.table_kind_label.setStyleSheet("color: #666666;")
+        table_layout.addWidget(self.table_kind_label)
+        table_layout.addStretch()
+        layout.addLayout(table_layout)
+
+        self.column_table = QTableWidget(0, 4)
+        self.column_table.setHorizontalHeaderLabels(["File column", "Sample", "Table column", "Type"])
+        self.column_table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.column_table.horizontalHeader().setStretchLastSection(True)
+        self.column_table.verticalHeader().setVisible(False)
+        layout.addWidget(self.column_table)
+
+        self.relaxed_checkbox = QCheckBox("Fast load (synchronous=OFF and an in-memory journal while importing)")
+        self.relaxed_checkbox.setToolTip("Much faster for large files; a crash or power loss during the import "
+                                         "can corrupt the database")
+        layout.addWidget(self.relaxed_checkbox)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.reject)
+        self.import_btn = QPushButton("Import")
+        self.import_btn.setDefault(True)
+        self.import_btn.clicked.connect(self.on_import_clicked)
+        button_layout.addWidget(self.cancel_btn)
+        button_layout.addWidget(self.import_btn)
+        layout.addLayout(button_layout)
+
+    def load_file(self):
+        """分析檔案格式，並依結果設定選項"""
+        if self.is_jsonl:
+            self.source_columns, self.sample_rows, self.inferred_types = sniff_jsonl_file(self.path)
+            self.flatten_checkbox.toggled.connect(self.reload_sample)
+        else:
+            delimiter, has_header, self.source_columns, self.sample_rows = sniff_delimited_file(self.path)
+            self.inferred_types = infer_column_types(self.sample_rows, len(self.source_columns))
+            index = self.delimiter_combo.findData(delimiter)
+            self.delimiter_combo.setCurrentIndex(index if index >= 0 else 0)
+            self.header_checkbox.setChecked(has_header)
+            self.delimiter_combo.currentIndexChanged.connect(self.reload_sample)
+            self.header_checkbox.toggled.connect(self.reload_sample)
+
+        self.table_combo.currentTextChanged.connect(self.update_column_table)
+        self.update_column_table()
+
+    def reload_sample(self):
+        """分隔字元、標題列或展開設定改變時重新讀取樣本"""
+        if self.is_jsonl:
+            self.source_columns, self.sample_rows, self.inferred_types = sniff_jsonl_file(
+                self.path, self.flatten_checkbox.isChecked())
+        else:
+            rows = read_sample_rows(self.path, self.delimiter_combo.currentData(), TYPE_SAMPLE_ROWS + 1)
+            self.source_columns, self.sample_rows = split_header(rows, self.header_checkbox.isChecked())
+            self.inferred_types = infer_column_types(self.sample_rows, len(self.source_columns))
+        self.update_column_table()
+
+    def target_table(self):
+        return self.table_combo.currentText().strip()
+
+    def is_new_table(self):
+        return self.target_table() not in self.tables
+
+    def update_column_table(self):
+        """依目標表格重新建立欄位對應"""
+        new_table = self.is_new_table()
+        self.table_kind_label.setText("(new table)" if new_table else "(existing table)")
+        table_columns = [] if new_table else self.get_table_columns(self.target_table())
+        lookup = {name.lower(): name for name, _ in table_columns}
+        column_types = dict(table_columns)
+
+        self.column_table.setRowCount(len(self.source_columns))
+        for row, source_column in enumerate(self.source_columns):
+            source_item = QTableWidgetItem(source_column)
+            source_item.setFlags(source_item.flags() & ~Qt.ItemIsEditable)
+            self.column_table.setItem(row, 0, source_item)
+            sample = next((sample_row[row] for sample_row in self.sample_rows
+                           if row < len(sample_row) and sample_row[row]), "")
+            sample_item = QTableWidgetItem(sample)
+            sample_item.setFlags(sample_item.flags() & ~Qt.ItemIsEditable)
+            self.column_table.setItem(row, 1, sample_item)
+
+            target_combo = QComboBox()
+            type_combo = QComboBox()
+            type_combo.addItems(self.COLUMN_TYPES)
+            if new_table:
+                # 新表格：欄位名稱可以修改，型別由樣本推斷
+                target_combo.setEditable(True)
+                target_combo.addItem(self.SKIP)
+                target_combo.setEditText(source_column)
+                type_combo.setCurrentText(self.inferred_types[row])
+            else:
+                # 既有表格：依名稱對應，沒有標題列時依位置對應
+                target_combo.addItem(self.SKIP)
+                target_combo.addItems([name for name, _ in table_columns])
+                if self.is_jsonl or self.header_checkbox.isChecked():
+                    target = lookup.get(source_column.lower())
+                else:
+                    target = table_columns[row][0] if row < len(table_columns) else None
+                target_combo.setCurrentText(target or self.SKIP)
+                type_combo.setEnabled(False)
+                target_combo.currentTextChanged.connect(
+                    lambda name, combo=type_combo: combo.setCurrentText(column_types.get(name) or 'TEXT'))
+                type_combo.setCurrentText(column_types.get(target) or 'TEXT')
+            self.column_table.setCellWidget(row, 2, target_combo)
+            self.column_table.setCellWidget(row, 3, type_combo)
+        self.column_table.resizeColumnsToContents()
+
+    def get_mapping(self):
+        """回傳 [(檔案欄位索引, 表格欄位, 宣告型別)]，略過的欄位不包含在內"""
+        mapping = []
+        for row in range(self.column_table.rowCount()):
+            target = self.column_table.cellWidget(row, 2).currentText().strip()
+            if target and target != self.SKIP:
+                mapping.append((row, target, self.column_table.cellWidget(row, 3).currentText()))
+        return mapping
+
+    def on_import_clicked(self):
+        """檢查設定後關閉對話框"""
+        mapping = self.get_mapping()
+        targets = [target.lower() for _, target, _ in mapping]
+        if not self.target_table():
+            QMessageBox.warning(self, "Import", "Please enter a table name.")
+        elif not mapping:
+            QMessageBox.warning(self, "Import", "Please choose at least one column to import.")
+        elif len(set(targets)) != len(targets):
+            QMessageBox.warning(self, "Import", "Each table column can only be imported once.")
+        else:
+            self.accept()
+
+    def get_import_function(self):
+        return import_jsonl if self.is_jsonl else import_delimited
+
+    def get_import_options(self):
+        """回傳 get_import_function() 所需的參數"""
+        mapping = self.get_mapping()
+        options = {
+            'path': self.path,
+            'table_name': self.target_table(),
+            'target_columns': [target for _, target, _ in mapping],
+            'target_types': [column_type for _, _, column_type in mapping],
+            'create_table': self.is_new_table(),
+            'relaxed': self.relaxed_checkbox.isChecked(),
+        }
+        if self.is_jsonl:
+            options['source_keys'] = [self.source_columns[index] for index, _, _ in mapping]
+            options['flatten'] = self.flatten_checkbox.isChecked()
+        else:
+            options['source_indexes'] = [index for index, _, _ in mapping]
+            options['delimiter'] = self.delimiter_combo.currentData()
+            options['has_header'] = self.header_checkbox.isChecked()
+        return options
+
+
+class DumpDialog(QDialog):
+    """SQL dump 設定：選擇表格、只有結構或包含資料、每個 INSERT 的列數與壓縮格式"""
+
+    def __init__(self, parent, tables):
+        super().__init__(parent)
+        self.tables = tables
+
+        self.setWindowTitle("Dump SQL")
+        self.setMinimumSize(420, 460)
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        """設置對話框 UI"""
+        layout = QVBoxLayout(self)
+        layout.setSpacing(8)
+        layout.setContentsMargins(16, 16, 16, 16)
+
+        layout.addWidget(QLabel("Tables:"))
+        self.table_list = QListWidget()
+        for table_name in self.tables:
+            item = QListWidgetItem(table_name)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+            self.table_list.addItem(item)
+        self.table_list.itemChanged.connect(self.update_state)
+        layout.addWidget(self.table_list)
+
+        select_layout = QHBoxLayout()
+        select_all_btn = QPushButton("Select All")
+        select_all_btn.clicked.connect(lambda: self.set_all_checked(True))
+        select_none_btn = QPushButton("Select None")
+        select_none_btn.clicked.connect(lambda: self.set_all_checked(False))
+        select_layout.addWidget(select_all_btn)
+        select_layout.addWidget(select_none_btn)
+        select_layout.addStretch()
+        layout.addLayout(select_layout)
+
+        self.views_label = QLabel("Views are included only when all tables are selected.")
+        self.views_label.setStyleSheet("color: #666666;")
+        layout.addWidget(self.views_label)
+
+        form_layout = QFormLayout()
+        self.schema_only_checkbox = QCheckBox("Schema only (no data)")
+        self.schema_only_checkbox.toggled.connect(self.update_state)
+        form_layout.addRow(self.schema_only_checkbox)
+
+        self.rows_per_insert_spin = QSpinBox()
+        self.rows_per_insert_spin.setRange(1, 10000)
+        self.rows_per_insert_spin.setValue(DUMP_ROWS_PER_INSERT)
+        self.rows_per_insert_spin.setToolTip("Multi-row INSERT statements replay much faster; "
+                                             "1 writes one statement per row like the sqlite3 .dump command")
+        form_layout.addRow("Rows per INSERT:", self.rows_per_insert_spin)
+
+        self.compression_combo = QComboBox()
+        self.compression_combo.addItem("None", None)
+        for compression in available_dump_compressions():
+            self.compression_combo.addItem(compression, compression)
+        form_layout.addRow("Compression:", self.compression_combo)
+        layout.addLayout(form_layout)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.reject)
+        self.dump_btn = QPushButton("Dump...")
+        self.dump_btn.setDefault(True)
+        self.dump_btn.clicked.connect(self.accept)
+        button_layout.addWidget(self.cancel_btn)
+        button_layout.addWidget(self.dump_btn)
+        layout.addLayout(button_layout)
+
+        self.update_state()
+
+    def set_all_checked(self, checked):
+        for row in range(self.table_list.count()):
+            self.table_list.item(row).setCheckState(Qt.Checked if checked else Qt.Unchecked)
+
+    def get_selected_tables(self):
+        return [self.table_list.item(row).text() for row in range(self.table_list.count())
+                if self.table_list.item(row).checkState() == Qt.Checked]
+
+    def update_state(self):
+        self.rows_per_insert_spin.setEnabled(not self.schema_only_checkbox.isChecked())
+        self.dump_btn.setEnabled(bool(self.get_selected_tables()) or not self.tables)
+
+    def get_extension(self):
+        """輸出檔案的副檔名，例如 .sql.gz"""
+        return ".sql" + DUMP_COMPRESSIONS.get(self.compression_combo.currentData(), "")
+
+    def get_dump_options(self):
+        """回傳 dump_sql() 所需的參數；選擇所有表格時 dump 整個資料庫（含檢視）"""
+        selected = self.get_selected_tables()
+        return {
+            'tables': None if len(selected) == len(self.tables) else selected,
+            'schema_only': self.schema_only_checkbox.isChecked(),
+            'rows_per_insert': self.rows_per_insert_spin.value(),
+            'compression': self.compression_combo.currentData(),
+        }
+
+
+class AnalyzeDialog(QDialog):
+    """ANALYZE 設定：選擇表格，以及是否只抽樣部分資料列（PRAGMA analysis_limit）"""
+
+    def __init__(self, parent, tables):
+        super().__init__(parent)
+        self.tables = tables
+
+        self.setWindowTitle("Analyze")
+        self.setMinimumSize(380, 400)
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        """設置對話框 UI"""
+        layout = QVBoxLayout(self)
+        layout.setSpacing(8)
+        layout.setContentsMargins(16, 16, 16, 16)
+
+        layout.addWidget(QLabel("Update the query planner statistics (sqlite_stat1) of these tables:"))
+        self.table_list = QListWidget()
+        for table_name in self.tables:
+            item = QListWidgetItem(table_name)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+            self.table_list.addItem(item)
+        self.table_list.itemChanged.connect(self.update_state)
+        layout.addWidget(self.table_list)
+
+        select_layout = QHBoxLayout()
+        select_all_btn = QPushButton("Select All")
+        select_all_btn.clicked.connect(lambda: self.set_all_checked(True))
+        select_none_btn = QPushButton("Select None")
+        select_none_btn.clicked.connect(lambda: self.set_all_checked(False))
+        select_layout.addWidget(select_all_btn)
+        select_layout.addWidget(select_none_btn)
+        select_layout.addStretch()
+        layout.addLayout(select_layout)
+
+        form_layout = QFormLayout()
+        self.approximate_checkbox = QCheckBox("Approximate (sample rows per index)")
+        self.approximate_checkbox.setToolTip("Sets PRAGMA analysis_limit; much faster on large tables")
+        self.approximate_checkbox.toggled.connect(self.update_state)
+        form_layout.addRow(self.approximate_checkbox)
+
+        self.analysis_limit_spin = QSpinBox()
+        self.analysis_limit_spin.setRange(100, 1000000)
+        self.analysis_limit_spin.setSingleStep(100)
+        self.analysis_limit_spin.setValue(ANALYSIS_LIMIT)
+        form_layout.addRow("Rows per index:", self.analysis_limit_spin)
+        layout.addLayout(form_layout)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.reject)
+        self.analyze_btn = QPushButton("Analyze")
+        self.analyze_btn.setDefault(True)
+        self.analyze_btn.clicked.connect(self.accept)
+        button_layout.addWidget(self.cancel_btn)
+        button_layout.addWidget(self.analyze_btn)
+        layout.addLayout(button_layout)
+
+        self.update_state()
+
+    def set_all_checked(self, checked):
+        for row in range(self.table_list.count()):
+            self.table_list.item(row).setCheckState(Qt.Checked if checked else Qt.Unchecked)
+
+    def get_selected_tables(self):
+        return [self.table_list.item(row).text() for row in range(self.table_list.count())
+                if self.table_list.item(row).checkState() == Qt.Checked]
+
+    def update_state(self):
+        self.analysis_limit_spin.setEnabled(self.approximate_checkbox.isChecked())
+        self.analyze_btn.setEnabled(bool(self.get_selected_tables()))
+
+    def get_analysis_limit(self):
+        """PRAGMA analysis_limit 的值；0 表示分析所有資料列"""
+        return self.analysis_limit_spin.value() if self.approximate_checkbox.isChecked() else 0
+
+
+class CopyTableDialog(QDialog):
+    """複製表格到另一個已儲存的連接：選擇目標資料庫、表格名稱、篩選條件與已存在時的處理方式"""
+
+    IF_EXISTS_OPTIONS = [
+        ("Fail", IF_EXISTS_FAIL),
+        ("Append rows", IF_EXISTS_APPEND),
+        ("Drop and recreate", IF_EXISTS_REPLACE),
+    ]
+
+    def __init__(self, parent, table_name, connections):
+        super().__init__(parent)
+        self.table_name = table_name
+        self.connections = connections  # {連接名稱: 資料庫路徑}
+
+        self.setWindowTitle(f"Copy Table {table_name}")
+        self.setMinimumWidth(480)
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        """設置對話框 UI"""
+        layout = QVBoxLayout(self)
+        layout.setSpacing(8)
+        layout.setContentsMargins(16, 16, 16, 16)
+
+        form_layout = QFormLayout()
+        self.connection_combo = QComboBox()
+        for name, path in self.connections.items():
+            self.connection_combo.addItem(f"{name} ({path})", path)
+        form_layout.addRow("Target connection:", self.connection_combo)
+
+        self.table_input = QLineEdit(self.table_name)
+        form_layout.addRow("Target table:", self.table_input)
+
+        self.where_input = QLineEdit()
+        self.where_input.setPlaceholderText("optional, e.g. created_at >= '2024-01-01'")
+        form_layout.addRow("WHERE:", self.where_input)
+
+        self.if_exists_combo = QComboBox()
+        for label, value in self.IF_EXISTS_OPTIONS:
+            self.if_exists_combo.addItem(label, value)
+        form_layout.addRow("If the table exists:", self.if_exists_combo)
+
+        self.indexes_checkbox = QCheckBox("Create the source indexes after loading")
+        self.indexes_checkbox.setChecked(True)
+        form_layout.addRow(self.indexes_checkbox)
+        layout.addLayout(form_layout)
+
+        note_label = QLabel("Rows are copied inside SQLite with INSERT ... SELECT; triggers are not copied.")
+        note_label.setWordWrap(True)
+        note_label.setStyleSheet("color: #666666;")
+        layout.addWidget(note_label)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.reject)
+        self.copy_btn = QPushButton("Copy")
+        self.copy_btn.setDefault(True)
+        self.copy_btn.clicked.connect(self.on_copy_clicked)
+        button_layout.addWidget(self.cancel_btn)
+        button_layout.addWidget(self.copy_btn)
+        layout.addLayout(button_layout)
+
+    def on_copy_clicked(self):
+        if not self.table_input.text().strip():
+            QMessageBox.warning(self, "Copy Table", "Please enter a target table name.")
+            return
+        self.accept()
+
+    def get_target_path(self):
+        return self.connection_combo.currentData()
+
+    def get_target_name(self):
+        """目標連接的名稱"""
+        return list(self.connections)[self.connection_combo.currentIndex()]
+
+    def get_copy_options(self, source_path):
+        """回傳 copy_table() 所需的參數（不含目標連接）"""
+        return {
+            'source_path': source_path,
+            'source_table': self.table_name,
+            'target_table': self.table_input.text().strip(),
+            'where': self.where_input.text().strip() or None,
+            'if_exists': self.if_exists_combo.currentData(),
+            'create_indexes': self.indexes_checkbox.isChecked(),
+        }
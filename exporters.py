@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Exporters
+將查詢結果直接由 cursor 串流寫入檔案，不經過表格模型；也可將整個資料庫 dump 為 SQL
+"""
+
+import csv
+import gzip
+import importlib.util
+import itertools
+import json
+import os
+import sqlite3
+import sys
+from contextlib import contextmanager
+
+from db_handler import get_type_affinity, quote_identifier
+
+# 每次 fetchmany 取出的資料列數，每批寫完回報一次進度
+EXPORT_BATCH_SIZE = 5000
+
+# Parquet/Arrow 匯出時每個 row group（record batch）的資料列數
+ROW_GROUP_SIZE = 65536
+
+# 欄位型別親和性對應的 Arrow 型別名稱；NUMERIC 與 BLOB 親和性的欄位由資料推斷（見 build_arrow_schema）
+ARROW_TYPE_NAMES = {
+    'INTEGER': 'int64',
+    'REAL': 'float64',
+    'TEXT': 'string',
+}
+
+# 寫入檔案時的緩衝區大小
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+class ExportCancelled(Exception):
+    """進度回呼要求取消匯出"""
+
+
+class RowsCursor:
+    """以 cursor 介面（description、fetchmany）提供記憶體中的資料列，匯出函式可直接使用"""
+
+    def __init__(self, columns, rows):
+        self.description = [(column, None, None, None, None, None, None) for column in columns]
+        self._rows = iter(rows)
+
+    def fetchmany(self, size):
+        return list(itertools.islice(self._rows, size))
+
+
+def _blob_to_text(row):
+    """BLOB 以十六進位文字輸出"""
+    if bytes not in map(type, row):
+        return row
+    return [value.hex() if isinstance(value, bytes) else value for value in row]
+
+
+@contextmanager
+def _temporary_output(path):
+    """先寫入暫存檔，成功後才取代 path；取消或失敗時刪除暫存檔，不留下不完整的檔案"""
+    temp_path = f"{path}.part"
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _fetch_batches(cursor, batch_size, progress_callback):
+    """逐批取出資料列；每批交給呼叫端寫入後回報進度，要求取消時拋出 ExportCancelled"""
+    total = 0
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+        total += len(rows)
+        if progress_callback and progress_callback(total):
+            raise ExportCancelled()
+
+
+def export_delimited(cursor, path, delimiter=',', header=True, batch_size=EXPORT_BATCH_SIZE,
+                     progress_callback=None, column_types=None):
+    """將 cursor 的結果逐批寫入 CSV/TSV 檔案，回傳寫入的資料列數
+
+    記憶體用量只與 batch_size 有關。progress_callback(已寫入列數) 回傳 True 時取消，
+    並拋出 ExportCancelled。CSV 只有文字，不需要 column_types。
+    """
+    total = 0
+    with _temporary_output(path) as temp_path:
+        with open(temp_path, 'w', newline='', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as output:
+            writer = csv.writer(output, delimiter=delimiter)
+            if header:
+                writer.writerow([description[0] for description in cursor.description])
+            for rows in _fetch_batches(cursor, batch_size, progress_callback):
+                writer.writerows(map(_blob_to_text, rows))
+                total += len(rows)
+    return total
+
+
+def export_tsv(cursor, path, **kwargs):
+    return export_delimited(cursor, path, delimiter='\t', **kwargs)
+
+
+def export_jsonl(cursor, path, batch_size=EXPORT_BATCH_SIZE, progress_callback=None, column_types=None):
+    """將 cursor 的結果寫入 JSON Lines 檔案（每列一個物件），回傳寫入的資料列數
+
+    JSON 沒有二進位型別，BLOB 以十六進位文字輸出；其他值保留 SQLite 的型別。
+    """
+    columns = [description[0] for description in cursor.description]
+    encoder = json.JSONEncoder(ensure_ascii=False, check_circular=False)
+    total = 0
+    with _temporary_output(path) as temp_path:
+        with open(temp_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as output:
+            for rows in _fetch_batches(cursor, batch_size, progress_callback):
+                output.writelines(f"{encoder.encode(dict(zip(columns, _blob_to_text(row))))}\n" for row in rows)
+                total += len(rows)
+    return total
+
+
+def is_pyarrow_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def _import_pyarrow():
+    """延遲載入 pyarrow（選用套件，只有 Parquet/Arrow 匯出需要）"""
+    try:
+        import pyarrow
+    except ImportError:
+        raise RuntimeError("Parquet and Arrow export require pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+
+def _infer_arrow_type(pa, values):
+    """依第一批的值決定型別：只有整數為 int64，整數與小數為 float64，只有 BLOB 為 binary，
+    其他（文字或混合了文字、BLOB 的欄位）為 string；全部為 NULL 時為 string
+    """
+    value_types = {type(value) for value in values if value is not None}
+    if not value_types:
+        return pa.string()
+    if value_types <= {int}:
+        return pa.int64()
+    if value_types <= {int, float}:
+        return pa.float64()
+    if value_types == {bytes}:
+        return pa.binary()
+    return pa.string()
+
+
+def build_arrow_schema(pa, columns, first_batch, column_types=None):
+    """依欄位的型別親和性（PRAGMA table_info）建立 Arrow schema
+
+    沒有宣告型別的欄位（查詢結果、BLOB 親和性）由第一批的值推斷。
+    NUMERIC 親和性（例如 DECIMAL、DATETIME）的欄位也由資料推斷：可能存放 ISO 日期等無法轉為數字的文字，
+    此時使用 string；只有數字時使用 float64，因為之後的批次可能出現小數。
+    """
+    column_types = column_types or {}
+    fields = []
+    for index, column in enumerate(columns):
+        affinity = get_type_affinity(column_types[column]) if column in column_types else None
+        if affinity in ARROW_TYPE_NAMES:
+            arrow_type = getattr(pa, ARROW_TYPE_NAMES[affinity])()
+        else:
+            arrow_type = _infer_arrow_type(pa, [row[index] for row in first_batch])
+            if affinity == 'NUMERIC' and pa.types.is_integer(arrow_type):
+                arrow_type = pa.float64()
+        fields.append(pa.field(column, arrow_type))
+    return pa.schema(fields)
+
+
+def _coerce_for_arrow(pa, values, arrow_type, column):
+    """SQLite 允許欄位存放不同型別的值；無法直接轉換時逐值調整為欄位的型別"""
+    if pa.types.is_string(arrow_type):
+        return [value.hex() if isinstance(value, bytes) else (None if value is None else str(value))
+                for value in values]
+    if pa.types.is_binary(arrow_type):
+        return [value if value is None or isinstance(value, bytes) else str(value).encode('utf-8')
+                for value in values]
+    converted = []
+    for value in values:
+        if value is None or isinstance(value, (int, float)) and not isinstance(value, bool):
+            if pa.types.is_integer(arrow_type) and isinstance(value, float):
+                if not value.is_integer():
+                    raise ValueError(f"Column '{column}' contains the non-integer value {value!r}")
+                value = int(value)
+            converted.append(value)
+            continue
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Column '{column}' contains the non-numeric value {value!r}; "
+                             "export it as CSV or JSON instead") from None
+        converted.append(int(number) if pa.types.is_integer(arrow_type) and number.is_integer() else number)
+    return converted
+
+
+def _record_batch(pa, schema, rows):
+    """將一批資料列（tuple 列表）轉換為 Arrow record batch"""
+    arrays = []
+    for field, values in zip(schema, zip(*rows)):
+        try:
+            arrays.append(pa.array(values, type=field.type))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, OverflowError):
+            arrays.append(pa.array(_coerce_for_arrow(pa, values, field.type, field.name), type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _export_columnar(cursor, path, open_writer, batch_size, progress_callback, column_types):
+    """逐批把資料列轉為 record batch 並寫出；同時只保留一批資料在記憶體中"""
+    pa = _import_pyarrow()
+    columns = [description[0] for description in cursor.description]
+    total = 0
+    with _temporary_output(path) as temp_path:
+        writer = None
+        try:
+            for rows in _fetch_batches(cursor, batch_size, progress_callback):
+                if writer is None:
+                    schema = build_arrow_schema(pa, columns, rows, column_types)
+                    writer = open_writer(pa, temp_path, schema)
+                writer.write_batch(_record_batch(pa, schema, rows))
+                total += len(rows)
+            if writer is None:
+                # 沒有資料列時仍寫出只有 schema 的檔案
+                writer = open_writer(pa, temp_path, build_arrow_schema(pa, columns, [], column_types))
+        finally:
+            if writer is not None:
+                writer.close()
+    return total
+
+
+def export_parquet(cursor, path, compression='zstd', batch_size=ROW_GROUP_SIZE, progress_callback=None,
+                   column_types=None):
+    """將 cursor 的結果寫入 Parquet 檔案，每批資料列為一個 row group，回傳寫入的資料列數
+
+    欄位型別依 column_types（{欄位: 宣告型別}）的型別親和性決定，未提供時由資料推斷。
+    """
+    def open_writer(pa, temp_path, schema):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(temp_path, schema, compression=compression)
+
+    return _export_columnar(cursor, path, open_writer, batch_size, progress_callback, column_types)
+
+
+def export_arrow(cursor, path, batch_size=ROW_GROUP_SIZE, progress_callback=None, column_types=None):
+    """將 cursor 的結果寫入 Arrow IPC 檔案（Feather v2），每批資料列為一個 record batch"""
+    def open_writer(pa, temp_path, schema):
+        return pa.ipc.new_file(temp_path, schema)
+
+    return _export_columnar(cursor, path, open_writer, batch_size, progress_callback, column_types)
+
+
+# 檔案對話框的篩選器 → (副檔名, 匯出函式)
+EXPORT_FORMATS = {
+    "CSV (*.csv)": ('.csv', export_delimited),
+    "TSV (*.tsv)": ('.tsv', export_tsv),
+    "JSON Lines (*.jsonl)": ('.jsonl', export_jsonl),
+    "Parquet (*.parquet)": ('.parquet', export_parquet),
+    "Arrow IPC (*.arrow)": ('.arrow', export_arrow),
+}
+
+# 需要選用套件的格式
+_PYARROW_FORMATS = {"Parquet (*.parquet)", "Arrow IPC (*.arrow)"}
+
+
+def available_export_formats():
+    """目前環境可用的匯出格式（未安裝 pyarrow 時不提供 Parquet/Arrow）"""
+    pyarrow_available = is_pyarrow_available()
+    return {name: export_format for name, export_format in EXPORT_FORMATS.items()
+            if pyarrow_available or name not in _PYARROW_FORMATS}
+
+
+# SQL dump 預設每個 INSERT 語句包含的資料列數（1 時與 iterdump() 相同，每列一個語句）
+DUMP_ROWS_PER_INSERT = 500
+
+# SQL dump 可選擇的壓縮格式 → 副檔名
+DUMP_COMPRESSIONS = {
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+
+def is_zstd_available():
+    """Python 3.14 內建 compression.zstd，較早的版本需要 zstandard 套件"""
+    return sys.version_info >= (3, 14) or importlib.util.find_spec('zstandard') is not None
+
+
+def available_dump_compressions():
+    """目前環境可用的 SQL dump 壓縮格式"""
+    return [name for name in DUMP_COMPRESSIONS if name != 'zstd' or is_zstd_available()]
+
+
+def _open_dump_output(path, compression=None):
+    """以文字模式開啟 dump 的輸出檔案，依 compression 壓縮"""
+    if compression is None:
+        return open(path, 'w', encoding='utf-8', newline='\n', buffering=WRITE_BUFFER_SIZE)
+    if compression == 'gzip':
+        return gzip.open(path, 'wt', compresslevel=6, encoding='utf-8', newline='\n')
+    if compression == 'zstd':
+        try:
+            from compression import zstd
+            return zstd.open(path, 'wt', level=3, encoding='utf-8', newline='\n')
+        except ImportError:
+            pass
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstd compression requires the zstandard package (pip install zstandard)") from None
+        return zstandard.open(path, 'wt', cctx=zstandard.ZstdCompressor(level=3), encoding='utf-8', newline='\n')
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def _sql_literal(value):
+    """將值轉為 SQL 常值；REAL 使用 repr() 以保留完整精度"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if value != value:
+            return 'NULL'
+        if value in (float('inf'), float('-inf')):
+            return '1e999' if value > 0 else '-1e999'
+        return repr(value)
+    return "X'" + bytes(value).hex() + "'"
+
+
+def _sql_values(row):
+    return "(" + ",".join(map(_sql_literal, row)) + ")"
+
+
+def _dump_objects(connection, tables):
+    """讀取要 dump 的物件，回傳 (表格, 索引, 檢視, 觸發程序)，各為 [(名稱, SQL)]
+
+    tables 為 None 時包含整個資料庫（含檢視）；否則只包含這些表格與它們的索引、觸發程序。
+    虛擬表格的影子表格（shadow table）由 CREATE VIRTUAL TABLE 自動建立，不另外 dump。
+    """
+    try:
+        shadow_tables = {row[0] for row in connection.execute(
+            "SELECT name FROM pragma_table_list WHERE schema = 'main' AND type = 'shadow'")}
+    except sqlite3.OperationalError:
+        # SQLite 3.37 之前沒有 table_list
+        shadow_tables = set()
+
+    selected = set(tables) if tables is not None else None
+    objects = {'table': [], 'index': [], 'view': [], 'trigger': []}
+    for object_type, name, table_name, sql in connection.execute(
+            "SELECT type, name, tbl_name, sql FROM sqlite_master WHERE sql IS NOT NULL ORDER BY rowid"):
+        if object_type not in objects or name.startswith('sqlite_') or name in shadow_tables:
+            continue
+        if selected is not None and (object_type == 'view' or table_name not in selected):
+            continue
+        objects[object_type].append((name, sql))
+    return objects['table'], objects['index'], objects['view'], objects['trigger']
+
+
+def list_dump_tables(connection):
+    """可以 dump 的表格名稱（不含 sqlite_ 內部表格與虛擬表格的影子表格）"""
+    return [name for name, _ in _dump_objects(connection, None)[0]]
+
+
+def dump_sql(connection, path, tables=None, schema_only=False, rows_per_insert=DUMP_ROWS_PER_INSERT,
+             compression=None, batch_size=EXPORT_BATCH_SIZE, progress_callback=None):
+    """將資料庫（或 tables 中的表格）dump 為 SQL 文字檔，回傳寫入的資料列數
+
+    與 Connection.iterdump() 的輸出相容，但資料以每個語句 rows_per_insert 列的多列 INSERT 寫出，
+    重新執行時快得多；schema_only=True 時只寫出 CREATE 語句。compression 為 None、'gzip' 或 'zstd'。
+    所有內容在同一個讀取交易中讀出，是一致的快照。索引與觸發程序在資料之後建立，
+    避免重新執行時逐列維護索引或觸發。
+    progress_callback(表格序號, 表格名稱, 該表格已寫入的列數) 回傳 True 時取消，並拋出 ExportCancelled。
+    """
+    rows_per_insert = max(1, rows_per_insert)
+    # 每批包含整數個 INSERT 語句
+    batch_size = max(rows_per_insert, batch_size // rows_per_insert * rows_per_insert)
+    own_transaction = not connection.in_transaction
+    if own_transaction:
+        connection.execute("BEGIN")
+    total = 0
+    try:
+        table_objects, indexes, views, triggers = _dump_objects(connection, tables)
+        with _temporary_output(path) as temp_path:
+            with _open_dump_output(temp_path, compression) as output:
+                output.write("PRAGMA foreign_keys=OFF;\nBEGIN TRANSACTION;\n")
+                for index, (table_name, sql) in enumerate(table_objects):
+                    output.write(f"{sql};\n")
+                    if schema_only:
+                        continue
+                    if progress_callback and progress_callback(index, table_name, 0):
+                        raise ExportCancelled()
+                    total += _dump_table_rows(connection, output, table_name, rows_per_insert, batch_size,
+                                              lambda rows, index=index, table_name=table_name:
+                                              progress_callback and progress_callback(index, table_name, rows))
+                if not schema_only:
+                    _dump_sequences(connection, output, [table_name for table_name, _ in table_objects])
+                for _, sql in indexes + views + triggers:
+                    output.write(f"{sql};\n")
+                output.write("COMMIT;\n")
+    finally:
+        if own_transaction:
+            connection.rollback()
+    return total
+
+
+def _dump_table_rows(connection, output, table_name, rows_per_insert, batch_size, progress_callback):
+    """以多列 INSERT 寫出表格的資料，回傳寫入的資料列數
+
+    明確列出欄位名稱並略過產生欄位（generated column），這些欄位不能直接寫入。
+    """
+    columns = [row[0] for row in connection.execute(
+        "SELECT name FROM pragma_table_xinfo(?) WHERE hidden = 0", (table_name,))]
+    column_list = ", ".join(quote_identifier(column) for column in columns)
+    prefix = f"INSERT INTO {quote_identifier(table_name)}({column_list}) VALUES"
+    cursor = connection.execute(f"SELECT {column_list} FROM {quote_identifier(table_name)}")
+    total = 0
+    for rows in _fetch_batches(cursor, batch_size, progress_callback):
+        values = list(map(_sql_values, rows))
+        output.write("".join(f"{prefix}{','.join(values[start:start + rows_per_insert])};\n"
+                             for start in range(0, len(values), rows_per_insert)))
+        total += len(rows)
+    return total
+
+
+def _dump_sequences(connection, output, table_names):
+    """寫出 AUTOINCREMENT 的計數器；插入資料時 SQLite 已自動建立，先刪除再寫入原本的值"""
+    if not table_names or not connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_sequence'").fetchone():
+        return
+    placeholders = ", ".join("?" for _ in table_names)
+    rows = connection.execute(f"SELECT name, seq FROM sqlite_sequence WHERE name IN ({placeholders})",
+                              table_names).fetchall()
+    if rows:
+        names = ",".join(_sql_literal(name) for name, _ in rows)
+        output.write(f"DELETE FROM sqlite_sequence WHERE name IN ({names});\n")
+        output.write("".join(f"INSERT INTO sqlite_sequence(name, seq) VALUES{_sql_values(row)};\n" for row in rows))
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Importers
+由檔案（CSV/TSV、JSON Lines）串流讀取資料列並以 executemany 批次寫入表格
+"""
+
+import csv
+import json
+import os
+import time
+
+from db_handler import get_type_affinity, quote_identifier
+
+# 每次 executemany 寫入的資料列數，每批完成後回報一次進度
+IMPORT_BATCH_SIZE = 50000
+
+# 推斷欄位型別時讀取的樣本資料列數
+TYPE_SAMPLE_ROWS = 1000
+
+# 分析檔案格式時讀取的位元組數
+SNIFF_BYTES = 64 * 1024
+
+# 視為 JSON Lines（每行一個 JSON 物件）的副檔名
+JSONL_EXTENSIONS = ('.jsonl', '.ndjson', '.json')
+
+# 匯入精靈中可選擇的分隔字元
+DELIMITERS = {',': "Comma", '\t': "Tab", ';': "Semicolon", '|': "Pipe"}
+
+# 讀取 CSV 時允許的最大欄位長度（預設 128KB 對長文字欄位太小）
+csv.field_size_limit(64 * 1024 * 1024)
+
+
+class ImportCancelled(Exception):
+    """進度回呼要求取消匯入"""
+
+
+def _open_text(path):
+    # utf-8-sig 會略過 Excel 輸出的 BOM
+    return open(path, 'r', newline='', encoding='utf-8-sig')
+
+
+def sniff_delimited_file(path, sample_rows=TYPE_SAMPLE_ROWS):
+    """分析 CSV/TSV 檔案，回傳 (分隔字元, 是否有標題列, 欄位名稱, 樣本資料列)
+
+    樣本資料列不含標題列；沒有標題列時欄位名稱為 column1、column2…
+    """
+    with _open_text(path) as f:
+        sample = f.read(SNIFF_BYTES)
+    if os.path.splitext(path)[1].lower() in ('.tsv', '.tab'):
+        delimiter = '\t'
+    else:
+        try:
+            delimiter = csv.Sniffer().sniff(sample, delimiters=''.join(DELIMITERS)).delimiter
+        except csv.Error:
+            delimiter = '\t' if '\t' in sample.split('\n', 1)[0] else ','
+
+    rows = read_sample_rows(path, delimiter, sample_rows + 1)
+    has_header = looks_like_header(rows[0]) if rows else False
+    return (delimiter, has_header) + split_header(rows, has_header)
+
+
+def looks_like_header(row):
+    """第一列的值都不是空白、不是數字且不重複時，視為標題列"""
+    names = [cell.strip() for cell in row]
+    return (bool(names) and all(names) and len(set(names)) == len(names)
+            and not any(_is_real(name) for name in names))
+
+
+def read_sample_rows(path, delimiter, count):
+    """讀取檔案開頭的 count 列（用於預覽與型別推斷）"""
+    rows = []
+    with _open_text(path) as f:
+        for row in csv.reader(f, delimiter=delimiter):
+            rows.append(row)
+            if len(rows) >= count:
+                break
+    return rows
+
+
+def split_header(rows, has_header):
+    """分出欄位名稱與資料列，回傳 (欄位名稱, 資料列)"""
+    width = max((len(row) for row in rows), default=0)
+    if has_header and rows:
+        names = [name.strip() or f"column{index + 1}" for index, name in enumerate(rows[0])]
+        names += [f"column{index + 1}" for index in range(len(names), width)]
+        return names, rows[1:]
+    return [f"column{index + 1}" for index in range(width)], rows
+
+
+def _is_integer(text):
+    try:
+        int(text)
+        return True
+    except ValueError:
+        return False
+
+
+def _is_real(text):
+    try:
+        float(text)
+        return True
+    except ValueError:
+        return False
+
+
+def infer_column_types(rows, column_count):
+    """由樣本資料列推斷每一欄的宣告型別：INTEGER、REAL 或 TEXT；空白值不影響推斷"""
+    types = []
+    for index in range(column_count):
+        values = [row[index].strip() for row in rows if index < len(row) and row[index].strip()]
+        if values and all(map(_is_integer, values)):
+            # 以 0 開頭的數字（郵遞區號、編號）當成文字，避免遺失前導零
+            if any(len(value.lstrip('+-')) > 1 and value.lstrip('+-').startswith('0') for value in values):
+                types.append('TEXT')
+            else:
+                types.append('INTEGER')
+        elif values and all(map(_is_real, values)):
+            types.append('REAL')
+        else:
+            types.append('TEXT')
+    return types
+
+
+def build_create_table_sql(table_name, columns, column_types):
+    """建立新表格的 CREATE TABLE 語句"""
+    definitions = ", ".join(f"{quote_identifier(column)} {column_type}"
+                            for column, column_type in zip(columns, column_types))
+    return f"CREATE TABLE {quote_identifier(table_name)} ({definitions})"
+
+
+def _run_import(connection, table_name, target_columns, target_types, rows, create_table=False, relaxed=False,
+                batch_size=IMPORT_BATCH_SIZE, progress_callback=None):
+    """在同一個交易中以 executemany 逐批寫入 rows（可迭代的資料列），回傳寫入的資料列數
+
+    取消或失敗時全部回滾（包括 create_table 建立的表格）。
+    relaxed=True 時寫入期間使用 synchronous=OFF 與記憶體中的回滾日誌，結束後恢復原設定。
+    progress_callback(已匯入列數, 每秒列數) 回傳 True 時取消，並拋出 ImportCancelled。
+    """
+    previous_pragmas = None
+    if relaxed:
+        previous_pragmas = (connection.execute("PRAGMA synchronous").fetchone()[0],
+                            connection.execute("PRAGMA journal_mode").fetchone()[0])
+        connection.execute("PRAGMA synchronous = OFF")
+        if previous_pragmas[1].lower() != 'wal':
+            # WAL 模式切換需要獨佔連接，且本身已足夠快，維持不變
+            connection.execute("PRAGMA journal_mode = MEMORY")
+
+    placeholders = ", ".join("?" for _ in target_columns)
+    insert_sql = (f"INSERT INTO {quote_identifier(table_name)} "
+                  f"({', '.join(quote_identifier(column) for column in target_columns)}) VALUES ({placeholders})")
+
+    total = 0
+    started = time.monotonic()
+    try:
+        connection.execute("BEGIN IMMEDIATE")
+        if create_table:
+            connection.execute(build_create_table_sql(table_name, target_columns, target_types))
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                connection.executemany(insert_sql, batch)
+                total += len(batch)
+                batch = []
+                if progress_callback and progress_callback(total, total / max(time.monotonic() - started, 1e-6)):
+                    raise ImportCancelled()
+        if batch:
+            connection.executemany(insert_sql, batch)
+            total += len(batch)
+        connection.commit()
+        if progress_callback:
+            progress_callback(total, total / max(time.monotonic() - started, 1e-6))
+    except BaseException:
+        connection.rollback()
+        raise
+    finally:
+        if previous_pragmas:
+            connection.execute(f"PRAGMA synchronous = {int(previous_pragmas[0])}")
+            if previous_pragmas[1].lower() != 'wal':
+                connection.execute(f"PRAGMA journal_mode = {previous_pragmas[1]}")
+    return total
+
+
+def import_delimited(connection, path, table_name, source_indexes, target_columns, target_types,
+                     delimiter=',', has_header=True, **kwargs):
+    """將 CSV/TSV 檔案逐批匯入表格，回傳匯入的資料列數
+
+    source_indexes[i] 為寫入 target_columns[i] 的檔案欄位索引；target_types 為目標欄位的宣告型別。
+    值以文字寫入，由 SQLite 依欄位的型別親和性轉換；非文字欄位的空白值寫入 NULL。
+    其他參數（create_table、relaxed、batch_size、progress_callback）見 _run_import。
+    """
+    # (檔案欄位索引, 空白值是否寫入 NULL)
+    sources = [(index, get_type_affinity(column_type) != 'TEXT')
+               for index, column_type in zip(source_indexes, target_types)]
+    width = max(source_indexes) + 1 if source_indexes else 0
+
+    def read_rows(f):
+        reader = csv.reader(f, delimiter=delimiter)
+        if has_header:
+            next(reader, None)
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < width:
+                row = row + [''] * (width - len(row))
+            yield [None if null_if_empty and row[index] == '' else row[index] for index, null_if_empty in sources]
+
+    with _open_text(path) as f:
+        return _run_import(connection, table_name, target_columns, target_types, read_rows(f), **kwargs)
+
+
+def flatten_record(record, separator='.', prefix=''):
+    """將巢狀物件展開為單層，鍵以 separator 連接（例如 user.id）；陣列保持原樣"""
+    flat = {}
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            flat.update(flatten_record(value, separator, f"{name}{separator}"))
+        else:
+            flat[name] = value
+    return flat
+
+
+def _json_cell(value):
+    """物件與陣列存為 JSON 文字（可用 json_extract 查詢），布林值存為 0/1"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _json_type(values):
+    """由樣本中的 Python 值推斷宣告型別"""
+    kinds = {type(value) for value in values if value is not None}
+    if kinds and kinds <= {int, bool}:
+        return 'INTEGER'
+    if kinds and kinds <= {int, float}:
+        return 'REAL'
+    return 'TEXT'
+
+
+def _iter_json_records(f, flatten):
+    """逐行解析 JSON Lines，略過空白行；每一行必須是 JSON 物件"""
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}") from None
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {line_number} is not a JSON object")
+        yield flatten_record(record) if flatten else record
+
+
+def sniff_jsonl_file(path, flatten=True, sample_rows=TYPE_SAMPLE_ROWS):
+    """讀取 JSON Lines 檔案開頭的樣本，回傳 (欄位名稱, 樣本資料列, 推斷的宣告型別)
+
+    欄位依第一次出現的順序排列；只出現在樣本之後的鍵不會被匯入。
+    """
+    records = []
+    with _open_text(path) as f:
+        for record in _iter_json_records(f, flatten):
+            records.append(record)
+            if len(records) >= sample_rows:
+                break
+
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    rows = [[_json_cell(record.get(column)) for column in columns] for record in records]
+    types = [_json_type(record.get(column) for record in records) for column in columns]
+    return columns, [["" if value is None else str(value) for value in row] for row in rows], types
+
+
+def import_jsonl(connection, path, table_name, source_keys, target_columns, target_types, flatten=True, **kwargs):
+    """將 JSON Lines 檔案逐行解析並批次匯入表格，回傳匯入的資料列數
+
+    source_keys[i] 為寫入 target_columns[i] 的鍵；flatten=True 時巢狀物件展開為 a.b 形式的鍵，
+    否則巢狀的物件與陣列以 JSON 文字存入對應的欄位。缺少的鍵寫入 NULL。
+    其他參數見 _run_import。
+    """
+    def read_rows(f):
+        for record in _iter_json_records(f, flatten):
+            yield [_json_cell(record.get(key)) for key in source_keys]
+
+    with _open_text(path) as f:
+        return _run_import(connection, table_name, target_columns, target_types, read_rows(f), **kwargs)
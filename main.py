@@ -2,12 +2,26 @@
 import sys
 import os
 import re
-from PyQt5.QtWidgets import QApplication, QMainWindow, QListWidget, QTableView, QWidget, QHBoxLayout, QVBoxLayout, QTextEdit, QPushButton, QDialog, QTreeWidget, QTreeWidgetItem, QHeaderView, QSplitter, QStackedWidget, QStatusBar, QLabel, QFrame, QListWidgetItem, QToolBar, QAction, QSizePolicy, QMessageBox, QLineEdit, QCheckBox, QAbstractItemView
+from bisect import bisect_left
+from PyQt5.QtWidgets import QApplication, QMainWindow, QListWidget, QTableView, QWidget, QHBoxLayout, QVBoxLayout, QTextEdit, QPushButton, QDialog, QTreeWidget, QTreeWidgetItem, QHeaderView, QSplitter, QStackedWidget, QStatusBar, QLabel, QFrame, QListWidgetItem, QToolBar, QAction, QSizePolicy, QMessageBox, QLineEdit, QCheckBox, QAbstractItemView, QProgressDialog, QFileDialog, QMenu
 from PyQt5.QtCore import Qt, QTimer, QSize
-from PyQt5.QtGui import QStandardItemModel, QStandardItem, QFont, QColor, QIcon, QSyntaxHighlighter, QTextCharFormat
-from db_handler import DBHandler
+from PyQt5.QtGui import QStandardItemModel, QStandardItem, QFont, QColor, QIcon, QSyntaxHighlighter, QTextCharFormat, QKeySequence
+from db_handler import (DBHandler, CommitCancelled, ROWID_ALIASES, classify_search_text, coerce_value,
+                        is_read_only_query, plan_changes, plan_row_count, quote_identifier)
 from config import ConfigManager
-from dialogs import AddConnectionDialog, RecordEditDialog
+from dialogs import (AddConnectionDialog, RecordEditDialog, GlobalSearchDialog, ConflictDialog, PastePreviewDialog,
+                     ImportDialog, DumpDialog, CopyTableDialog, AnalyzeDialog)
+from workers import (QueryWorker, ExportWorker, DumpWorker, ImportWorker, BackupWorker, CopyTableWorker,
+                     AnalyzeWorker)
+from exporters import available_export_formats, list_dump_tables
+from backup import snapshot_path
+from models import TableFilterProxyModel, CLIENT_FILTER_MAX_ROWS, ROW_KEY_ROLE
+from changes import (ChangeTracker, EditJournal, find_conflicts, overwrite_values, parse_pasted_text, rebase_changes,
+                     resolve_conflicts)
+from watcher import DatabaseWatcher
+
+# 要寫入的資料列數達到此值時，提交過程顯示進度條
+COMMIT_PROGRESS_THRESHOLD = 5000
 
 class SQLSyntaxHighlighter(QSyntaxHighlighter):
     """簡單的 SQL 語法高亮器"""
@@ -121,12 +135,43 @@ class MainWindow(QMainWindow):
         # 編輯狀態管理
         self.is_editing = False
         self.current_table_name = None
-        self.pending_changes = []  # 存放待提交的變更
+        self.table_load_count = 0  # 每次成功載入表格資料時遞增，用來判斷是否已經重新載入過
+        self.change_tracker = ChangeTracker()  # 未提交的變更（只記錄被修改的儲存格）
+        self.edit_journal = EditJournal()  # 復原/重做記錄
+        self.journal_suspended = False  # 套用復原/重做或對話框編輯時不重複記錄
+        # 即時模式：每個操作立即在 SAVEPOINT 中寫入資料庫，復原時 ROLLBACK TO
+        self.live_edit = False
+        self.savepoint_counter = 0
+        self.live_inserted_rows = set()  # 即時模式下已寫入交易的新增資料列（回滾時從模型移除）
+        # 載入資料時的 PRAGMA data_version，提交時用來判斷是否有其他連線寫入
+        self.snapshot_data_version = None
         
         # 搜尋延時計時器
         self.search_timer = QTimer()
         self.search_timer.setSingleShot(True)
         self.search_timer.timeout.connect(self.perform_delayed_search)
+        self.search_worker = None
+        self.query_worker = None
+        self.export_worker = None
+        self.export_progress_dialog = None
+        self.import_worker = None
+        self.import_progress_dialog = None
+        self.backup_worker = None
+        self.backup_progress_dialog = None
+        self.copy_worker = None
+        self.copy_progress_dialog = None
+        self.analyze_worker = None
+        self.analyze_progress_dialog = None
+        # 目前表格的資料列識別欄位（rowid 或主鍵）
+        self.current_key_columns = []
+        # 目前模型是否包含整個表格（搜尋結果只是部分資料）
+        self.table_fully_loaded = False
+        # 已載入的最大 rowid（只會附加資料列的表格只需讀取之後的資料列）
+        self.loaded_last_key = None
+        # 偵測其他程式對資料庫的寫入
+        self.database_watcher = None
+        # 執行中的背景工作（保留參考直到執行緒結束，避免被回收）
+        self.background_workers = set()
         
         # 欄位寬度記錄（像素值）
         self.column_widths = {}
@@ -183,7 +228,7 @@ class MainWindow(QMainWindow):
     def update_toolbar_state(self):
         """更新工具列按鈕狀態"""
         has_table = self.current_table_name is not None
-        has_changes = len(self.pending_changes) > 0
+        has_changes = self.change_tracker.has_changes() or self.has_open_transaction()
         has_selection = False
         
         # 檢查是否有選中的記錄
@@ -192,11 +237,25 @@ class MainWindow(QMainWindow):
         
         # 基本功能按鈕
         self.add_row_btn.setEnabled(has_table)
+        self.paste_rows_btn.setEnabled(has_table)
         self.delete_row_btn.setEnabled(has_table and has_selection)
+        has_search = hasattr(self, 'search_input') and bool(self.search_input.text().strip())
+        self.delete_matching_btn.setEnabled(has_table and has_search and hasattr(self, 'table_proxy')
+                                            and self.table_proxy.rowCount() > 0)
+        
+        is_connected = bool(self.db_handler and self.db_handler.connection)
+        self.export_btn.setEnabled(is_connected)
+        self.import_btn.setEnabled(is_connected)
+        self.export_table_action.setEnabled(has_table)
+        self.export_filtered_action.setEnabled(has_table and has_search)
         
         # Commit/Rollback 按鈕
         self.commit_btn.setEnabled(has_changes)
         self.rollback_btn.setEnabled(has_changes)
+        
+        # Undo/Redo 按鈕
+        self.undo_btn.setEnabled(self.edit_journal.can_undo())
+        self.redo_btn.setEnabled(self.edit_journal.can_redo())
 
     def load_last_database(self):
         """載入上次打開的資料庫"""
@@ -206,6 +265,21 @@ class MainWindow(QMainWindow):
         else:
             self.load_tables()
 
+    def get_record_form_schema(self, table_name):
+        """取得記錄編輯對話框所需的 (欄位列表, {欄位名稱: {'type': 宣告型別}})
+
+        由 DBHandler 的 schema 快取讀取，不需要對表格執行查詢；欄位與 SELECT * 相同（包含產生欄位）。
+        """
+        table_info = self.db_handler.get_schema_snapshot().table(table_name)
+        if table_info is None:
+            # 不在 main 資料庫中的表格（例如暫存表格）
+            cursor = self.db_handler.connection.execute(f"SELECT * FROM {quote_identifier(table_name)} LIMIT 0")
+            columns = [description[0] for description in cursor.description]
+            return columns, {name: {'type': column_type}
+                             for name, column_type in self.db_handler.get_column_types(table_name).items()}
+        return ([column.name for column in table_info.select_columns],
+                {name: {'type': column_type} for name, column_type in table_info.column_types.items()})
+
     def open_edit_dialog(self):
         """打開編輯選中記錄的對話框"""
         if not self.current_table_name or not self.db_handler:
@@ -218,23 +292,12 @@ class MainWindow(QMainWindow):
             return
         
         try:
-            # 獲取表格結構和 schema 信息
-            cursor = self.db_handler.connection.cursor()
-            cursor.execute(f"SELECT * FROM {self.current_table_name}")
-            columns = [description[0] for description in cursor.description]
-            
-            # 獲取表格 schema
-            table_schema = {}
-            schema_info = self.db_handler.get_table_schema(self.current_table_name)
-            for column_info in schema_info:
-                if len(column_info) >= 3:
-                    column_name = column_info[1]
-                    column_type = column_info[2]
-                    table_schema[column_name] = {'type': column_type}
+            # 由 schema 快取取得欄位與型別
+            columns, table_schema = self.get_record_form_schema(self.current_table_name)
             
             # 獲取選中行的資料
-            row_index = selected_rows[0].row()
-            model = self.table_view.model()
+            row_index = self.table_proxy.mapToSource(selected_rows[0]).row()
+            model = self.table_model
             row_data = {}
             
             for col in range(model.columnCount()):
@@ -247,26 +310,11 @@ class MainWindow(QMainWindow):
             dialog = RecordEditDialog(self, self.current_table_name, columns, row_data, table_schema)
             
             if dialog.exec_() == dialog.Accepted:
-                # 用戶保存了變更，更新到 pending_changes
+                # 用戶保存了變更，記錄到 change_tracker
                 form_data = dialog.get_form_data()
                 
-                # 記錄變更
-                self.pending_changes.append({
-                    'action': 'update',
-                    'row': row_index,
-                    'old_data': row_data.copy(),
-                    'new_data': form_data.copy()
-                })
-                
-                # 更新表格顯示
-                for col, (column_name, new_value) in enumerate(form_data.items()):
-                    if column_name in row_data:
-                        item = model.item(row_index, col)
-                        if item:
-                            item.setText(str(new_value))
-                
-                # 標記修改過的行
-                self.highlight_modified_row(row_index)
+                # 更新表格顯示並記錄變更
+                self.apply_row_edit(row_index, row_data, form_data)
                 
                 self.update_toolbar_state()
                 
@@ -282,23 +330,12 @@ class MainWindow(QMainWindow):
             return
             
         try:
-            # 獲取表格結構和 schema 信息
-            cursor = self.db_handler.connection.cursor()
-            cursor.execute(f"SELECT * FROM {self.current_table_name}")
-            columns = [description[0] for description in cursor.description]
-            
-            # 獲取表格 schema
-            table_schema = {}
-            schema_info = self.db_handler.get_table_schema(self.current_table_name)
-            for column_info in schema_info:
-                if len(column_info) >= 3:
-                    column_name = column_info[1]
-                    column_type = column_info[2]
-                    table_schema[column_name] = {'type': column_type}
+            # 由 schema 快取取得欄位與型別
+            columns, table_schema = self.get_record_form_schema(self.current_table_name)
             
             # 獲取雙擊行的資料
-            row_index = index.row()
-            model = self.table_view.model()
+            row_index = self.table_proxy.mapToSource(index).row()
+            model = self.table_model
             row_data = {}
             
             for col in range(model.columnCount()):
@@ -311,26 +348,11 @@ class MainWindow(QMainWindow):
             dialog = RecordEditDialog(self, self.current_table_name, columns, row_data, table_schema)
             
             if dialog.exec_() == dialog.Accepted:
-                # 用戶保存了變更，更新到 pending_changes
+                # 用戶保存了變更，記錄到 change_tracker
                 form_data = dialog.get_form_data()
                 
-                # 記錄變更
-                self.pending_changes.append({
-                    'action': 'update',
-                    'row': row_index,
-                    'old_data': row_data.copy(),
-                    'new_data': form_data.copy()
-                })
-                
-                # 更新表格顯示
-                for col, (column_name, new_value) in enumerate(form_data.items()):
-                    if column_name in row_data:
-                        item = model.item(row_index, col)
-                        if item:
-                            item.setText(str(new_value))
-                
-                # 標記修改過的行
-                self.highlight_modified_row(row_index)
+                # 更新表格顯示並記錄變更
+                self.apply_row_edit(row_index, row_data, form_data)
                 
                 # 更新工具列狀態
                 self.update_toolbar_state()
@@ -338,9 +360,34 @@ class MainWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to open edit dialog:\n{str(e)}")
 
+    @property
+    def pending_changes(self):
+        """待提交的變更列表（由 change_tracker 產生）"""
+        return self.change_tracker.to_changes()
+
+    def has_open_transaction(self):
+        """主連接上是否有未提交的交易（即時模式寫入的變更，交易期間持有寫入鎖）"""
+        return bool(self.db_handler and self.db_handler.connection
+                    and self.db_handler.connection.in_transaction)
+
+    def resolve_pending_changes(self):
+        """替換目前的資料模型前，讓使用者提交或放棄未提交的變更；取消時回傳 False"""
+        if not self.change_tracker.has_changes() and not self.has_open_transaction():
+            return True
+        reply = QMessageBox.question(self, 'Unsaved Changes',
+                                   'You have unsaved changes. Do you want to commit them first?',
+                                   QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel,
+                                   QMessageBox.Cancel)
+        if reply == QMessageBox.Yes:
+            self.commit_changes()
+        elif reply == QMessageBox.No:
+            self.rollback_changes(confirm=False)
+        return (reply != QMessageBox.Cancel and not self.change_tracker.has_changes()
+                and not self.has_open_transaction())
+
     def toggle_edit_mode(self):
         """切換編輯模式"""
-        if self.pending_changes:
+        if self.change_tracker.has_changes() or self.has_open_transaction():
             reply = QMessageBox.question(self, 'Unsaved Changes',
                                        'You have unsaved changes. Do you want to commit them before switching modes?',
                                        QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel,
@@ -373,19 +420,8 @@ class MainWindow(QMainWindow):
             return
             
         try:
-            # 獲取表格結構和 schema 信息
-            cursor = self.db_handler.connection.cursor()
-            cursor.execute(f"SELECT * FROM {self.current_table_name}")
-            columns = [description[0] for description in cursor.description]
-            
-            # 獲取表格 schema
-            table_schema = {}
-            schema_info = self.db_handler.get_table_schema(self.current_table_name)
-            for column_info in schema_info:
-                if len(column_info) >= 3:
-                    column_name = column_info[1]
-                    column_type = column_info[2]
-                    table_schema[column_name] = {'type': column_type}
+            # 由 schema 快取取得欄位與型別
+            columns, table_schema = self.get_record_form_schema(self.current_table_name)
             
             # 打開新增對話框
             dialog = RecordEditDialog(self, self.current_table_name, columns, None, table_schema)
@@ -395,7 +431,7 @@ class MainWindow(QMainWindow):
                 form_data = dialog.get_form_data()
                 
                 # 在表格模型中插入新行
-                model = self.table_view.model()
+                model = self.table_model
                 row_count = model.rowCount()
                 model.insertRow(row_count)
                 
@@ -405,89 +441,259 @@ class MainWindow(QMainWindow):
                     model.setItem(row_count, col_index, item)
                 
                 # 記錄變更
-                self.pending_changes.append({
-                    'action': 'insert',
-                    'row': row_count,
-                    'data': form_data.copy()
-                })
+                self.change_tracker.mark_inserted(row_count, form_data.copy())
                 
                 # 標記新增的行
-                self.highlight_modified_row(row_count)
+                self.refresh_row_highlight(row_count)
                 
+                self.record_edit({'kind': 'insert', 'rows': {row_count: form_data.copy()}})
                 self.update_toolbar_state()
                 
                 # 選中新行
-                index = model.index(row_count, 0)
+                index = self.table_proxy.mapFromSource(model.index(row_count, 0))
                 self.table_view.setCurrentIndex(index)
                 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to add new record:\n{str(e)}")
 
     def delete_selected_row(self):
-        """刪除選中的行"""
+        """刪除選中的行（支援多選），整批記錄為一筆變更"""
         if not self.current_table_name:
             return
             
-        current_index = self.table_view.currentIndex()
-        if not current_index.isValid():
-            from PyQt5.QtWidgets import QMessageBox
+        # 收集所有選中的行（對應回來源模型的列號）
+        rows = self.get_selected_source_rows()
+        if not rows:
+            current_index = self.table_view.currentIndex()
+            if current_index.isValid():
+                rows = [self.table_proxy.mapToSource(current_index).row()]
+        if not rows:
             QMessageBox.warning(self, "No Selection", "Please select a row to delete.")
             return
             
-        from PyQt5.QtWidgets import QMessageBox
-        reply = QMessageBox.question(self, 'Delete Row',
-                                   'Are you sure you want to delete the selected row?',
+        if len(rows) == 1:
+            message = 'Are you sure you want to delete the selected row?'
+        else:
+            message = f'Are you sure you want to delete the {len(rows)} selected rows?'
+        reply = QMessageBox.question(self, 'Delete Row', message,
                                    QMessageBox.Yes | QMessageBox.No,
                                    QMessageBox.No)
         if reply == QMessageBox.Yes:
-            row = current_index.row()
-            model = self.table_view.model()
+            self.mark_rows_deleted(rows)
+
+    def delete_matching_rows(self):
+        """刪除目前搜尋結果中的所有資料列"""
+        if not self.current_table_name or not self.search_input.text().strip():
+            return
+        if self.search_worker and self.search_worker.isRunning():
+            QMessageBox.warning(self, "Search Running", "Please wait for the search to finish.")
+            return
             
-            # 獲取要刪除的行數據
-            row_data = {}
-            for col in range(model.columnCount()):
-                header = model.headerData(col, Qt.Horizontal, Qt.DisplayRole)
-                item = model.item(row, col)
-                value = item.text() if item else None
-                row_data[header] = value
-            
-            # 記錄變更
-            self.pending_changes.append({
-                'action': 'delete',
-                'row': row,
-                'data': row_data
-            })
-            
-            # 從模型中移除行
-            model.removeRow(row)
-            self.update_toolbar_state()
+        proxy = self.table_proxy
+        rows = [proxy.mapToSource(proxy.index(proxy_row, 0)).row() for proxy_row in range(proxy.rowCount())]
+        if not rows:
+            return
+            
+        reply = QMessageBox.question(self, 'Delete Matching Rows',
+                                   f'Are you sure you want to delete all {len(rows)} rows matching the current search?',
+                                   QMessageBox.Yes | QMessageBox.No,
+                                   QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            self.mark_rows_deleted(rows)
 
-    def commit_changes(self):
-        """提交所有變更到資料庫"""
-        if not self.pending_changes or not self.current_table_name:
+    def get_selected_source_rows(self):
+        """取得選中的行在來源模型中的列號"""
+        selection_model = self.table_view.selectionModel()
+        if not selection_model:
+            return []
+        rows = {self.table_proxy.mapToSource(index).row() for index in selection_model.selectedRows()}
+        return sorted(rows)
+
+    def mark_rows_deleted(self, rows):
+        """將資料列標記為刪除：從畫面隱藏，並記錄為一筆刪除變更
+
+        資料列留在來源模型中直到提交或回滾，因此其他變更記錄的列號不受影響。
+        尚未提交的新增資料列直接取消其新增記錄。
+        """
+        rows = sorted(set(rows))
+        row_keys = {}
+        for row in rows:
+            key = self.get_row_key(row)
+            if key is not None:
+                row_keys[row] = key
+        
+        # 被刪除的行不再需要新增或更新
+        dropped = self.change_tracker.take_rows(rows)
+        self.change_tracker.mark_deleted(row_keys)
+        
+        self.table_proxy.hide_rows(rows)
+        self.record_edit({'kind': 'delete', 'rows': rows, 'keys': row_keys, 'dropped': dropped})
+        self.update_toolbar_state()
+
+    def paste_from_clipboard(self):
+        """從剪貼簿貼上 TSV/CSV：預覽後新增為資料列，或從目前的儲存格開始覆寫
+
+        剪貼簿文字只解析一次，並依欄位的型別親和性轉換；結果記錄在 change_tracker，
+        提交時與其他變更一起批次寫入，整次貼上也是一個可復原的操作。
+        """
+        if not self.current_table_name or not self.db_handler:
+            return
+        rows = parse_pasted_text(QApplication.clipboard().text())
+        if not rows:
+            QMessageBox.information(self, "Paste", "The clipboard does not contain any rows.")
             return
             
         try:
-            # 開始資料庫事務
-            cursor = self.db_handler.connection.cursor()
+            column_types = self.db_handler.get_column_types(self.current_table_name)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to read the table columns:\n{str(e)}")
+            return
+        
+        current_index = self.table_view.currentIndex()
+        start_column = current_index.column() if current_index.isValid() else 0
+        target_rows = self.get_paste_target_rows(len(rows))
+        
+        dialog = PastePreviewDialog(self, rows,
+                                    self.get_visible_columns(0), self.get_visible_columns(start_column),
+                                    column_types, len(target_rows))
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        mode, values_rows = dialog.get_paste()
+        if not values_rows:
+            return
+            
+        if mode == PastePreviewDialog.OVERWRITE:
+            # 只貼上一列時填入所有選取的資料列，否則一列對一列，目前儲存格以下放不下的部分略過
+            if len(values_rows) == 1:
+                values_rows = values_rows * len(target_rows)
+            self.paste_overwrite_rows(target_rows, values_rows)
+        else:
+            self.paste_new_rows(values_rows)
+
+    def get_visible_columns(self, start_column):
+        """從 start_column 開始，依序取得畫面上未隱藏的欄位名稱"""
+        model = self.table_model
+        return [model.headerData(col, Qt.Horizontal, Qt.DisplayRole)
+                for col in range(start_column, model.columnCount())
+                if not self.table_view.isColumnHidden(col)]
+
+    def get_paste_target_rows(self, count):
+        """覆寫時的目標資料列（來源模型的列號，依畫面順序）
+
+        只有一列資料且選取了多列時，目標為所有選取的列；否則從第一個選取的列（或目前的列）往下取 count 列。
+        """
+        proxy = self.table_proxy
+        selection_model = self.table_view.selectionModel()
+        proxy_rows = sorted({index.row() for index in selection_model.selectedRows()}) if selection_model else []
+        if not proxy_rows and self.table_view.currentIndex().isValid():
+            proxy_rows = [self.table_view.currentIndex().row()]
+        if not proxy_rows:
+            return []
+        if count > 1 or len(proxy_rows) == 1:
+            proxy_rows = range(proxy_rows[0], min(proxy_rows[0] + count, proxy.rowCount()))
+        return [proxy.mapToSource(proxy.index(proxy_row, 0)).row() for proxy_row in proxy_rows]
+
+    def format_cell_text(self, value):
+        """表格中顯示的儲存格文字"""
+        return str(value) if value is not None else ""
+
+    def paste_new_rows(self, values_rows):
+        """將貼上的資料新增為資料列，記錄為一個新增操作"""
+        model = self.table_model
+        columns = [model.headerData(col, Qt.Horizontal, Qt.DisplayRole) for col in range(model.columnCount())]
+        inserted = {}
+        for values in values_rows:
+            row = model.rowCount()
+            data = {column: self.format_cell_text(values.get(column)) for column in columns}
+            # 先記錄再加入模型，代理模型第一次繪製時就會顯示新增的背景色
+            self.change_tracker.mark_inserted(row, data)
+            inserted[row] = data
+            model.appendRow([QStandardItem(data[column]) for column in columns])
+        
+        self.record_edit({'kind': 'insert', 'rows': inserted})
+        self.update_toolbar_state()
+        
+        first_index = self.table_proxy.mapFromSource(model.index(min(inserted), 0))
+        if first_index.isValid():
+            self.table_view.scrollTo(first_index)
+            self.table_view.setCurrentIndex(first_index)
+
+    def paste_overwrite_rows(self, target_rows, values_rows):
+        """以貼上的資料覆寫既有的資料列，所有列的更新記錄為一個操作"""
+        entries = []
+        for row, values in zip(target_rows, values_rows):
+            current = self.get_row_texts(row)
+            changed = {column: self.format_cell_text(value) for column, value in values.items()
+                       if column in current and self.format_cell_text(value) != current[column]}
+            if not changed:
+                continue
+            self.set_row_texts(row, changed)
+            entries.append({'kind': 'update', 'row': row,
+                            'before': {column: current[column] for column in changed}, 'after': changed})
+        
+        if entries:
+            self.record_edit({'kind': 'batch', 'entries': entries})
+        self.update_toolbar_state()
+
+    def commit_changes(self):
+        """提交所有變更到資料庫
+
+        變更會依語句形狀分組，在同一個交易中以 executemany 批次執行；
+        變更數量較多時顯示可取消的進度條。
+        """
+        if self.live_edit:
+            self.commit_live_changes()
+            return
+        if not self.change_tracker.has_changes() or not self.current_table_name:
+            return
             
+        progress_dialog = None
+        try:
+            # 將 pending_changes 轉換為資料庫變更
+            column_types = self.db_handler.get_column_types(self.current_table_name)
+            changes = []
             for change in self.pending_changes:
                 if change['action'] == 'insert':
-                    # 處理插入操作
-                    self.execute_insert(cursor, change)
+                    db_change = self.build_insert_change(change)
                 elif change['action'] == 'delete':
-                    # 處理刪除操作
-                    self.execute_delete(cursor, change)
+                    db_change = self.build_delete_change(change)
                 elif change['action'] == 'update':
-                    # 處理更新操作
-                    self.execute_update(cursor, change)
+                    db_change = self.build_update_change(change, column_types)
+                else:
+                    db_change = None
+                if db_change:
+                    changes.append(db_change)
+            
+            # 取得寫入鎖後檢查其他連線在載入後是否修改過要提交的資料列；之後在同一個交易中寫入
+            changes = self.check_commit_conflicts(changes)
+            if changes is None:
+                return
             
-            # 提交事務
-            self.db_handler.connection.commit()
+            # 進度以資料列計算（一筆刪除變更可包含很多列），與 execute_changes 回報的數值一致
+            progress_callback = None
+            total_rows = plan_row_count(plan_changes(changes))
+            if total_rows >= COMMIT_PROGRESS_THRESHOLD:
+                progress_dialog = QProgressDialog("Committing changes...", "Cancel", 0, total_rows, self)
+                progress_dialog.setWindowTitle("Commit")
+                progress_dialog.setWindowModality(Qt.WindowModal)
+                progress_dialog.setMinimumDuration(0)
+                
+                def progress_callback(done, total):
+                    progress_dialog.setValue(done)
+                    QApplication.processEvents()
+                    return progress_dialog.wasCanceled()
+            
+            # 在單一交易中套用（失敗或取消時自動回滾）
+            self.db_handler.apply_changes(self.current_table_name, self.current_key_columns,
+                                          changes, progress_callback)
+            
+            if progress_dialog:
+                progress_dialog.close()
+                progress_dialog = None
             
             # 清空變更記錄
-            change_count = len(self.pending_changes)
-            self.pending_changes.clear()
+            change_count = len(self.change_tracker)
+            self.change_tracker.clear()
             
             # 清除所有背景色標記
             self.clear_all_highlights()
@@ -497,54 +703,138 @@ class MainWindow(QMainWindow):
             
             self.update_toolbar_state()
             
-            from PyQt5.QtWidgets import QMessageBox
             QMessageBox.information(self, "Success", f"Changes committed successfully!\n{change_count} changes applied.")
             
+        except CommitCancelled:
+            QMessageBox.information(self, "Commit Cancelled", "Commit cancelled. No changes were written.")
         except Exception as e:
-            # 回滾事務
-            self.db_handler.connection.rollback()
-            from PyQt5.QtWidgets import QMessageBox
             QMessageBox.critical(self, "Commit Failed", f"Failed to commit changes:\n{str(e)}")
-
-    def rollback_changes(self):
-        """回滾所有未提交的變更"""
-        if not self.pending_changes:
+        finally:
+            if progress_dialog:
+                progress_dialog.close()
+            # 檢查後還沒開始寫入就失敗時，釋放 check_commit_conflicts 取得的寫入鎖
+            connection = self.db_handler.connection
+            if connection is not None and connection.in_transaction:
+                connection.rollback()
+
+    def check_commit_conflicts(self, changes):
+        """樂觀並行檢查：取得寫入鎖後回傳要提交的變更，使用者取消時回傳 None
+
+        先以 BEGIN IMMEDIATE 取得寫入鎖，再比較 PRAGMA data_version 並重新讀取要更新或刪除的資料列，
+        因此檢查之後到寫入之前其他連線無法再修改資料；回傳時交易仍開啟，由呼叫端在同一個交易中寫入。
+        發現衝突時先回滾釋放寫入鎖再顯示對話框，避免使用者選擇期間阻擋其他連線；
+        對話框關閉後以剛才讀到的資料列為新的快照，重新取得寫入鎖再檢查，直到沒有新的衝突。
+        """
+        connection = self.db_handler.connection
+        checked_version = self.snapshot_data_version
+        while True:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                data_version = self.db_handler.get_data_version()
+                if checked_version is None or data_version == checked_version:
+                    return changes
+                
+                keys = []
+                for change in changes:
+                    if change['action'] == 'update':
+                        keys.append(change['key'])
+                    elif change['action'] == 'delete':
+                        keys.extend(change['keys'])
+                current_rows = self.db_handler.fetch_rows_by_keys(self.current_table_name, self.current_key_columns, keys)
+                
+                conflicts = find_conflicts(changes, current_rows)
+                if not conflicts:
+                    return changes
+            except Exception:
+                connection.rollback()
+                raise
+            connection.rollback()
+            
+            dialog = ConflictDialog(self, conflicts)
+            if dialog.exec_() != QDialog.Accepted:
+                return None
+            changes = rebase_changes(resolve_conflicts(changes, conflicts, dialog.get_resolutions()), current_rows)
+            checked_version = data_version
+
+    def commit_live_changes(self):
+        """即時模式：變更已寫入交易中，提交交易即可"""
+        connection = self.db_handler.connection if self.db_handler else None
+        if not connection:
             return
-            
-        from PyQt5.QtWidgets import QMessageBox
-        reply = QMessageBox.question(self, 'Rollback Changes',
-                                   f'Are you sure you want to discard {len(self.pending_changes)} unsaved changes?',
-                                   QMessageBox.Yes | QMessageBox.No,
-                                   QMessageBox.No)
-        if reply == QMessageBox.Yes:
-            self.pending_changes.clear()
-            
-            # 清除所有背景色標記
+        try:
+            change_count = len(self.change_tracker)
+            connection.commit()
+            self.change_tracker.clear()
+            self.edit_journal.clear()
             self.clear_all_highlights()
-            
-            # 重新載入原始資料
             if self.current_table_name:
                 self.load_table_data(self.current_table_name)
-            
             self.update_toolbar_state()
+            QMessageBox.information(self, "Success", f"Changes committed successfully!\n{change_count} changes applied.")
+        except Exception as e:
+            QMessageBox.critical(self, "Commit Failed", f"Failed to commit changes:\n{str(e)}")
 
-    def execute_insert(self, cursor, change):
-        """執行插入操作"""
-        if not self.current_table_name:
+    def rollback_changes(self, confirm=True):
+        """回滾所有未提交的變更"""
+        live_transaction = self.has_open_transaction()
+        if not self.change_tracker.has_changes() and not live_transaction:
             return
             
-        # 獲取表格結構，確定所有欄位
-        schema = self.db_handler.get_table_schema(self.current_table_name)
-        if not schema:
+        reply = QMessageBox.Yes
+        if confirm:
+            reply = QMessageBox.question(self, 'Rollback Changes',
+                                       f'Are you sure you want to discard {len(self.change_tracker)} unsaved changes?',
+                                       QMessageBox.Yes | QMessageBox.No,
+                                       QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            # 即時模式的變更已寫入交易中，回滾交易後資料庫回到載入時的內容
+            if live_transaction:
+                self.db_handler.connection.rollback()
+            self.revert_model_changes()
+            self.update_toolbar_state()
+
+    def revert_model_changes(self):
+        """在模型上還原所有未提交的變更，只處理受影響的資料列，不重新載入表格
+
+        更新或標記刪除的資料列還原為載入時的文字並重新顯示；編輯時新增的資料列
+        （不在 original_data 中，或是即時模式寫入交易的新增，包含已復原而只是被隱藏的）從模型移除。
+        """
+        model = self.table_model
+        tracker = self.change_tracker
+        if model is None:
+            tracker.clear()
+            self.edit_journal.clear()
             return
-            
+        
+        added_rows = {row for row in range(model.rowCount())
+                      if row not in self.original_data or row in self.live_inserted_rows}
+        deleted_rows = tracker.deleted_rows()
+        for row in set(tracker.dirty_rows()) | set(deleted_rows):
+            if row not in added_rows:
+                self.set_row_texts(row, self.get_original_texts(row))
+        tracker.clear()
+        self.edit_journal.clear()
+        self.live_inserted_rows.clear()
+        self.table_proxy.show_rows(set(deleted_rows) - added_rows)
+        
+        if added_rows:
+            removed = sorted(added_rows)
+            for row in reversed(removed):
+                model.removeRow(row)
+            # 被移除的資料列之後的列號前移
+            self.original_data = {row - bisect_left(removed, row): data
+                                  for row, data in self.original_data.items() if row not in added_rows}
+        
+        # 清除所有背景色標記
+        self.clear_all_highlights()
+
+    def build_insert_change(self, change):
+        """由新增的資料列建立插入變更"""
         # 從模型獲取新增行的資料
-        model = self.table_view.model()
+        model = self.table_model
         row = change['row']
         
-        columns = []
-        values = []
-        placeholders = []
+        values = {}
         
         # 收集非空的欄位和值
         for col in range(model.columnCount()):
@@ -554,77 +844,46 @@ class MainWindow(QMainWindow):
             
             # 只插入非空值，讓 SQLite 處理預設值和 NULL
             if value:
-                columns.append(column_name)
-                values.append(value)
-                placeholders.append('?')
-        
-        if columns:
-            # 構建 INSERT SQL
-            sql = f"INSERT INTO {self.current_table_name} ({', '.join(columns)}) VALUES ({', '.join(placeholders)})"
-            cursor.execute(sql, values)
-
-    def execute_delete(self, cursor, change):
-        """執行刪除操作"""
-        if not self.current_table_name:
-            return
-            
-        # 獲取要刪除的行數據
-        row_data = change['data']
-        
-        # 構建 WHERE 條件
-        where_conditions = []
-        where_values = []
-        
-        # 使用所有非 NULL 欄位作為條件
-        for column, value in row_data.items():
-            if value is not None and str(value).strip():
-                where_conditions.append(f"{column} = ?")
-                where_values.append(value)
-        
-        if where_conditions:
-            # 構建 DELETE SQL
-            sql = f"DELETE FROM {self.current_table_name} WHERE {' AND '.join(where_conditions)}"
-            cursor.execute(sql, where_values)
-
-    def execute_update(self, cursor, change):
-        """執行更新操作"""
-        if not self.current_table_name:
-            return
-            
-        # 獲取變更的資料
-        old_data = change.get('old_data', {})
-        new_data = change.get('new_data', {})
-        
-        if not old_data or not new_data:
-            return
-            
-        # 構建 SET 條件（只更新變更的欄位）
-        set_conditions = []
-        set_values = []
-        
-        for column, new_value in new_data.items():
-            if column in old_data and old_data[column] != new_value:
-                set_conditions.append(f"{column} = ?")
-                set_values.append(new_value)
-        
-        if not set_conditions:
-            return  # 沒有變更
-            
-        # 構建 WHERE 條件（使用原始資料）
-        where_conditions = []
-        where_values = []
-        
-        # 使用所有原始欄位作為條件
-        for column, value in old_data.items():
-            if value is not None and str(value).strip():
-                where_conditions.append(f"{column} = ?")
-                where_values.append(value)
-        
-        if where_conditions:
-            # 構建 UPDATE SQL
-            sql = f"UPDATE {self.current_table_name} SET {', '.join(set_conditions)} WHERE {' AND '.join(where_conditions)}"
-            all_values = set_values + where_values
-            cursor.execute(sql, all_values)
+                values[column_name] = value
+        
+        if not values:
+            return None
+        return {'action': 'insert', 'values': values}
+
+    def build_delete_change(self, change):
+        """建立刪除變更（以 rowid 或主鍵定位資料列，可一次包含多列）"""
+        keys = change.get('keys')
+        if not keys or any(key is None for key in keys):
+            raise ValueError("Cannot identify the rows to delete (missing rowid/primary key)")
+        
+        # 附上開始編輯時的快照，提交時檢查是否已被其他連線修改
+        originals = {}
+        for row in change.get('rows', []):
+            key = self.get_row_key(row)
+            if key is not None:
+                originals[key] = self.original_data.get(row)
+        
+        return {'action': 'delete', 'keys': keys, 'originals': originals}
+
+    def build_update_change(self, change, column_types):
+        """建立更新變更（以 rowid 或主鍵定位資料列），只包含有變更的欄位"""
+        changed_values = change.get('values')
+        if not changed_values:
+            return None  # 沒有變更
+            
+        key = change.get('key')
+        if key is None:
+            raise ValueError("Cannot identify the row to update (missing rowid/primary key)")
+        
+        original = self.original_data.get(change.get('row'))
+        row_values = overwrite_values(original, changed_values, column_types)
+        return {
+            'action': 'update',
+            'key': key,
+            'values': changed_values,
+            'row_values': row_values,
+            'original': original
+        }
 
     def restore_window_geometry(self):
         """恢復視窗幾何"""
@@ -753,12 +1012,33 @@ class MainWindow(QMainWindow):
 
                 parent_item.addChild(columns_item)
 
-            # 顯示索引統計信息（如果可用）
-            if index_stats.get('page_count', 0) > 0:
-                stats_text = f"📈 Statistics: {index_stats['page_count']} pages"
-                stats_item = QTreeWidgetItem([stats_text])
-                stats_item.setData(0, Qt.UserRole, {'type': 'index_stats', 'stats': index_stats})
+            # 顯示 ANALYZE 產生的統計（sqlite_stat1）
+            stat = index_stats.get('stat')
+            if stat:
+                stats_item = QTreeWidgetItem([f"📈 Statistics: {self.get_index_statistics_text(stat)}"])
+                stats_item.setData(0, Qt.UserRole, {'type': 'index_stats', 'stats': stat})
                 stats_item.setForeground(0, QColor(155, 89, 182))  # 紫色
+
+                # 前 k 個欄位相同的平均資料列數
+                column_names = [col['name'] or '<expression>' for col in index_info['columns']]
+                for position, rows_per_key in enumerate(stat['rows_per_key'][:len(column_names)]):
+                    prefix_item = QTreeWidgetItem(
+                        [f"  └─ ({', '.join(column_names[:position + 1])}): ~{rows_per_key:,} rows per key"])
+                    prefix_item.setForeground(0, QColor(189, 195, 199))  # 淺灰色
+                    stats_item.addChild(prefix_item)
+                parent_item.addChild(stats_item)
+
+                if stat['low_selectivity']:
+                    warning_item = QTreeWidgetItem([
+                        f"⚠️ Low selectivity: each {column_names[0] if column_names else 'key'} value matches "
+                        f"~{stat['selectivity']:.0%} of the rows"])
+                    warning_item.setToolTip(0, "Lookups through this index read a large part of the table; "
+                                               "the query planner may prefer a full scan")
+                    warning_item.setForeground(0, QColor(230, 126, 34))  # 橘色
+                    parent_item.addChild(warning_item)
+            else:
+                stats_item = QTreeWidgetItem(["📈 Statistics: not analyzed (Export ▸ Analyze...)"])
+                stats_item.setForeground(0, QColor(149, 165, 166))  # 灰色
                 parent_item.addChild(stats_item)
 
             # 添加索引類型和屬性信息
@@ -791,43 +1071,29 @@ class MainWindow(QMainWindow):
         return ", ".join(properties)
 
     def get_index_statistics(self, table_name, index_name):
-        """獲取索引統計信息"""
+        """獲取索引統計信息：索引是否存在，以及 ANALYZE 產生的 sqlite_stat1 統計（未分析時為 None）"""
         try:
             cursor = self.db_handler.connection.cursor()
 
             # 檢查索引是否存在且有效
             cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name=?", (index_name,))
-            exists = cursor.fetchone()
-            is_active = exists is not None
-
-            stats = {
-                'is_active': is_active,
-                'page_count': 0,
-                'entry_count': 0
-            }
+            is_active = cursor.fetchone() is not None
 
-            if is_active:
-                # 嘗試獲取索引統計信息
-                try:
-                    # 獲取索引頁面數量（如果可用）
-                    cursor.execute("SELECT * FROM sqlite_stat1 WHERE idx=?", (index_name,))
-                    stat_info = cursor.fetchone()
-                    if stat_info:
-                        # sqlite_stat1 格式: tbl,idx,stat
-                        # stat 包含條目數量和頁面信息
-                        stat_parts = stat_info[2].split()
-                        if stat_parts:
-                            stats['entry_count'] = int(stat_parts[0])
-                            if len(stat_parts) > 1:
-                                stats['page_count'] = int(stat_parts[1])
-                except:
-                    pass  # sqlite_stat1 可能不存在或不可用
-
-            return stats
+            stat = self.db_handler.get_index_statistics(table_name).get(index_name) if is_active else None
+            return {'is_active': is_active, 'stat': stat}
 
         except Exception as e:
             print(f"Error getting index statistics: {e}")
-            return {'is_active': False, 'page_count': 0, 'entry_count': 0}
+            return {'is_active': False, 'stat': None}
+
+    def get_index_statistics_text(self, stat):
+        """索引統計的摘要，例如 10,000 rows, ~5,000 distinct keys, 0.02% of rows per key"""
+        parts = [f"{stat['row_count']:,} rows"]
+        if stat['distinct_keys'] is not None:
+            parts.append(f"~{stat['distinct_keys']:,} distinct keys")
+        if stat['selectivity'] is not None:
+            parts.append(f"{stat['selectivity']:.2%} of rows per key")
+        return ", ".join(parts)
 
     def setup_sidebar(self):
         """設置側邊欄導航"""
@@ -1094,6 +1360,9 @@ class MainWindow(QMainWindow):
 
     def connect_to_database(self, db_path):
         """連接到指定的資料庫"""
+        # 未提交的變更屬於目前的資料庫，切換前先處理
+        if not self.resolve_pending_changes():
+            return
         try:
             # 關閉舊連接
             if self.db_handler:
@@ -1112,6 +1381,9 @@ class MainWindow(QMainWindow):
             # 自動載入第一個表格的內容
             self.auto_load_first_table()
             
+            # 監看其他程式的寫入
+            self.start_database_watcher()
+            
             # 更新狀態列
             self.update_status_bar()
             
@@ -1226,6 +1498,10 @@ class MainWindow(QMainWindow):
         self.data_schema_tree = QTreeWidget()
         self.data_schema_tree.setHeaderLabel("Database Schema")
         self.data_schema_tree.itemClicked.connect(self.on_data_schema_item_clicked)
+        self.data_schema_tree.itemExpanded.connect(self.on_schema_item_expanded)
+        self.data_schema_tree.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.data_schema_tree.customContextMenuRequested.connect(
+            lambda pos: self.show_schema_context_menu(self.data_schema_tree, pos))
         
         # 設置樹狀結構樣式
         font = QFont()
@@ -1258,8 +1534,14 @@ class MainWindow(QMainWindow):
         self.data_toolbar = self.create_data_toolbar()
         right_layout.addWidget(self.data_toolbar)
         
-        # 資料顯示區域
+        # 資料顯示區域（透過代理模型顯示，可在記憶體中過濾與排序）
+        self.table_model = QStandardItemModel()
+        self.table_proxy = TableFilterProxyModel(self)
+        self.table_proxy.set_change_tracker(self.change_tracker)
+        self.table_proxy.setSourceModel(self.table_model)
         self.table_view = QTableView()
+        self.table_view.setModel(self.table_proxy)
+        self.table_view.selectionModel().selectionChanged.connect(self.on_selection_changed)
         self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.table_view.setAlternatingRowColors(True)
         self.table_view.setSortingEnabled(True)
@@ -1271,6 +1553,23 @@ class MainWindow(QMainWindow):
         # 連接雙擊事件來觸發編輯
         self.table_view.doubleClicked.connect(self.on_table_double_clicked)
         
+        # 復原/重做快捷鍵（只在表格有焦點時作用，不影響查詢編輯器）
+        undo_action = QAction("Undo", self.table_view)
+        undo_action.setShortcut(QKeySequence.Undo)
+        undo_action.setShortcutContext(Qt.WidgetShortcut)
+        undo_action.triggered.connect(self.undo_edit)
+        redo_action = QAction("Redo", self.table_view)
+        redo_action.setShortcuts([QKeySequence.Redo, QKeySequence("Ctrl+Shift+Z")])
+        redo_action.setShortcutContext(Qt.WidgetShortcut)
+        redo_action.triggered.connect(self.redo_edit)
+        paste_action = QAction("Paste", self.table_view)
+        paste_action.setShortcut(QKeySequence.Paste)
+        paste_action.setShortcutContext(Qt.WidgetShortcut)
+        paste_action.triggered.connect(self.paste_from_clipboard)
+        self.table_view.addAction(undo_action)
+        self.table_view.addAction(redo_action)
+        self.table_view.addAction(paste_action)
+        
         # 連接欄位寬度變化事件
         self.table_view.horizontalHeader().sectionResized.connect(self.on_column_resized)
         
@@ -1389,12 +1688,69 @@ class MainWindow(QMainWindow):
         self.add_row_btn.setEnabled(False)
         self.add_row_btn.setMinimumHeight(28)
         
+        # 從剪貼簿貼上 TSV/CSV
+        self.paste_rows_btn = QPushButton("Paste")
+        self.paste_rows_btn.setToolTip("Paste rows copied from a spreadsheet (TSV/CSV) as new rows "
+                                       "or over the selected rows (Ctrl+V)")
+        self.paste_rows_btn.clicked.connect(self.paste_from_clipboard)
+        self.paste_rows_btn.setEnabled(False)
+        self.paste_rows_btn.setMinimumHeight(28)
+        
         # 刪除記錄按鈕
         self.delete_row_btn = QPushButton("Delete")
         self.delete_row_btn.clicked.connect(self.delete_selected_row)
         self.delete_row_btn.setEnabled(False)
         self.delete_row_btn.setMinimumHeight(28)
         
+        # 刪除所有符合搜尋條件的記錄
+        self.delete_matching_btn = QPushButton("Delete Matching")
+        self.delete_matching_btn.setToolTip("Delete all rows matching the current search")
+        self.delete_matching_btn.clicked.connect(self.delete_matching_rows)
+        self.delete_matching_btn.setEnabled(False)
+        self.delete_matching_btn.setMinimumHeight(28)
+        
+        
+        # 匯出按鈕：整個表格或目前的搜尋結果
+        self.export_btn = QPushButton("Export")
+        self.export_btn.setToolTip("Export the table or the current search results to a file, dump the database as SQL, "
+                                   "or back it up")
+        self.export_btn.setEnabled(False)
+        self.export_btn.setMinimumHeight(28)
+        export_menu = QMenu(self.export_btn)
+        self.export_table_action = export_menu.addAction("Export Table...", lambda: self.export_table(filtered=False))
+        self.export_filtered_action = export_menu.addAction("Export Search Results...",
+                                                            lambda: self.export_table(filtered=True))
+        export_menu.addSeparator()
+        export_menu.addAction("Dump SQL...", self.dump_database)
+        export_menu.addAction("Backup Database...", self.backup_database)
+        export_menu.addAction("Analyze...", self.analyze_database)
+        self.export_btn.setMenu(export_menu)
+        
+        # 匯入按鈕：由 CSV/TSV 檔案建立或附加到表格
+        self.import_btn = QPushButton("Import")
+        self.import_btn.setToolTip("Import a CSV/TSV or JSON Lines file into a new or existing table")
+        self.import_btn.clicked.connect(self.import_file)
+        self.import_btn.setEnabled(False)
+        self.import_btn.setMinimumHeight(28)
+        
+        # Undo/Redo 按鈕
+        self.undo_btn = QPushButton("Undo")
+        self.undo_btn.setToolTip("Undo the last edit (Ctrl+Z)")
+        self.undo_btn.clicked.connect(self.undo_edit)
+        self.undo_btn.setEnabled(False)
+        self.undo_btn.setMinimumHeight(28)
+        
+        self.redo_btn = QPushButton("Redo")
+        self.redo_btn.setToolTip("Redo the last undone edit (Ctrl+Shift+Z)")
+        self.redo_btn.clicked.connect(self.redo_edit)
+        self.redo_btn.setEnabled(False)
+        self.redo_btn.setMinimumHeight(28)
+        
+        # 即時模式：每個操作立即寫入資料庫（SAVEPOINT），Commit 時才提交
+        self.live_checkbox = QCheckBox("Live")
+        self.live_checkbox.setToolTip("Apply each edit to the database immediately inside a savepoint; "
+                                      "Undo rolls back to it, Commit makes the changes permanent")
+        self.live_checkbox.toggled.connect(self.set_live_edit)
         
         # Commit 按鈕
         self.commit_btn = QPushButton("Commit")
@@ -1493,13 +1849,27 @@ class MainWindow(QMainWindow):
         
         # 應用樣式
         self.add_row_btn.setStyleSheet(normal_button_style)
+        self.paste_rows_btn.setStyleSheet(normal_button_style)
         self.delete_row_btn.setStyleSheet(normal_button_style)
+        self.delete_matching_btn.setStyleSheet(normal_button_style)
+        self.export_btn.setStyleSheet(normal_button_style)
+        self.import_btn.setStyleSheet(normal_button_style)
+        self.undo_btn.setStyleSheet(normal_button_style)
+        self.redo_btn.setStyleSheet(normal_button_style)
         self.commit_btn.setStyleSheet(primary_button_style)
         self.rollback_btn.setStyleSheet(secondary_button_style)
         
         # 添加到佈局
         toolbar_layout.addWidget(self.add_row_btn)
+        toolbar_layout.addWidget(self.paste_rows_btn)
         toolbar_layout.addWidget(self.delete_row_btn)
+        toolbar_layout.addWidget(self.delete_matching_btn)
+        toolbar_layout.addSpacing(16)
+        toolbar_layout.addWidget(self.export_btn)
+        toolbar_layout.addWidget(self.import_btn)
+        toolbar_layout.addWidget(self.undo_btn)
+        toolbar_layout.addWidget(self.redo_btn)
+        toolbar_layout.addWidget(self.live_checkbox)
         toolbar_layout.addSpacing(16)
         toolbar_layout.addWidget(self.commit_btn)
         toolbar_layout.addWidget(self.rollback_btn)
@@ -1511,7 +1881,7 @@ class MainWindow(QMainWindow):
         toolbar_layout.addWidget(search_label)
         
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Search in text fields...")
+        self.search_input.setPlaceholderText("Search text, numbers or dates...")
         self.search_input.setMinimumWidth(200)
         self.search_input.setMaximumWidth(250)
         self.search_input.setMinimumHeight(26)
@@ -1530,11 +1900,41 @@ class MainWindow(QMainWindow):
         """)
         toolbar_layout.addWidget(self.search_input)
         
+        # 正規表示式模式
+        self.regex_checkbox = QCheckBox(".*")
+        self.regex_checkbox.setToolTip("Regular expression search (REGEXP)")
+        self.regex_checkbox.toggled.connect(lambda _: self.on_search_text_changed(self.search_input.text()))
+        toolbar_layout.addWidget(self.regex_checkbox)
+        
+        # 全資料庫搜尋按鈕
+        self.global_search_btn = QPushButton("All Tables")
+        self.global_search_btn.setToolTip("Search every table in the database")
+        self.global_search_btn.clicked.connect(self.open_global_search)
+        self.global_search_btn.setMinimumHeight(28)
+        self.global_search_btn.setStyleSheet(normal_button_style)
+        toolbar_layout.addWidget(self.global_search_btn)
+        
         # 工具列無背景色
         toolbar_widget.setStyleSheet("")
         
         return toolbar_widget
 
+    def open_global_search(self):
+        """打開全資料庫搜尋對話框"""
+        if not self.db_handler:
+            return
+
+        dialog = GlobalSearchDialog(self, self.db_handler)
+        dialog.table_requested.connect(self.on_global_search_table_requested)
+        dialog.search_input.setText(self.search_input.text().strip())
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        dialog.show()
+
+    def on_global_search_table_requested(self, table_name, search_text):
+        """從全資料庫搜尋結果開啟表格，並套用相同的搜尋文字"""
+        self.load_table_data(table_name)
+        self.search_input.setText(search_text)
+
     def on_search_text_changed(self, text):
         """處理搜尋文字變更，加入延時機制"""
         # 每次文字變更時，先停止之前的計時器
@@ -1543,6 +1943,12 @@ class MainWindow(QMainWindow):
         # 儲存搜尋文字
         self.pending_search_text = text.strip()
         
+        # 表格已完整載入時直接在記憶體中過濾，不需要延時
+        if self.can_filter_in_memory():
+            self.cancel_running_search()
+            self.apply_client_filter(self.pending_search_text)
+            return
+        
         # 無論輸入或刪除都使用延時機制
         if len(self.pending_search_text) >= 3:
             # 0.5秒後執行搜尋
@@ -1553,70 +1959,140 @@ class MainWindow(QMainWindow):
     
     def perform_delayed_search(self):
         """延時計時器觸發的搜尋執行"""
+        # 新的搜尋文字到達時，先中斷仍在執行的舊搜尋
+        self.cancel_running_search()
+        
+        # 搜尋結果會替換資料模型，未提交的變更需要先處理
+        if not self.resolve_pending_changes():
+            return
+
         if hasattr(self, 'pending_search_text'):
-            if len(self.pending_search_text) >= 3:
+            if self.is_searchable_text(self.pending_search_text):
                 self.perform_search(self.pending_search_text)
             else:
                 # 如果少於3個字元，恢復原始資料
                 if self.current_table_name:
                     self.load_table_data(self.current_table_name)
 
+    def can_filter_in_memory(self):
+        """表格已完整載入且筆數不大時，搜尋改在記憶體中過濾"""
+        return (self.table_fully_loaded and
+                self.table_model.rowCount() <= CLIENT_FILTER_MAX_ROWS)
+
+    def is_regex_search(self):
+        return hasattr(self, 'regex_checkbox') and self.regex_checkbox.isChecked()
+
+    def apply_client_filter(self, search_text):
+        """在已載入的模型上套用過濾，保留捲動位置與選取"""
+        try:
+            self.table_proxy.set_search_text(search_text, regex=self.is_regex_search())
+        except re.error as e:
+            self.show_search_status(f"Invalid regular expression: {e}")
+            return
+        if search_text:
+            self.show_search_status(f"Filter: {self.table_proxy.rowCount()} of {self.table_model.rowCount()} rows")
+        else:
+            self.update_status_bar()
+        self.update_toolbar_state()
+
+    def is_searchable_text(self, search_text):
+        """文字至少 3 個字元才搜尋；數字、日期與正規表示式不受長度限制（例如 ID 42）"""
+        if len(search_text) >= 3 or (search_text and self.is_regex_search()):
+            return True
+        return bool(search_text) and classify_search_text(search_text)['kind'] != 'text'
+
     def perform_search(self, search_text):
-        """執行搜尋功能"""
+        """執行搜尋功能（在背景執行緒中串流結果）"""
         if not self.current_table_name or not self.db_handler:
             return
-            
+
+        self.cancel_running_search()
+
         try:
-            # 獲取表格結構，找出 TEXT 和 VARCHAR 欄位
-            schema_info = self.db_handler.get_table_schema(self.current_table_name)
-            text_columns = []
-            
-            for column_info in schema_info:
-                if len(column_info) >= 3:
-                    column_name = column_info[1]
-                    column_type = column_info[2].upper()
-                    if 'TEXT' in column_type or 'VARCHAR' in column_type or 'CHAR' in column_type:
-                        text_columns.append(column_name)
-            
-            if not text_columns:
-                # 沒有文字欄位可搜尋
-                return
-                
-            # 建立搜尋查詢
-            cursor = self.db_handler.connection.cursor()
-            
-            # 構建 WHERE 條件，搜尋所有文字欄位
-            where_conditions = []
-            search_params = []
-            
-            for column in text_columns:
-                where_conditions.append(f"{column} LIKE ?")
-                search_params.append(f"%{search_text}%")
-            
-            # 組合查詢
-            where_clause = " OR ".join(where_conditions)
-            query = f"SELECT * FROM {self.current_table_name} WHERE {where_clause}"
-            
-            cursor.execute(query, search_params)
-            data = cursor.fetchall()
-            
-            # 獲取欄位名稱
-            columns = [description[0] for description in cursor.description]
-            
-            # 顯示搜尋結果 - 只更新資料模型，不調整欄位寬度
-            if data is not None and columns is not None:
-                self.update_table_model_only(data, columns)
-                
-                # 更新狀態列顯示搜尋結果數量
-                result_count = len(data)
-                if hasattr(self, 'status_bar'):
-                    self.db_path_label.setText(f"Database: {self.current_db_path} | Search results: {result_count} rows")
-                    
-        except Exception as e:
-            print(f"Search error: {e}")
-            # 發生錯誤時恢復原始資料
-            if self.current_table_name:
-                self.load_table_data(self.current_table_name)
+            query, search_params = self.db_handler.build_search_query(
+                self.current_table_name, search_text, regex=self.is_regex_search(),
+                key_columns=self.current_key_columns)
+        except re.error as e:
+            self.show_search_status(f"Invalid regular expression: {e}")
+            return
+        if not query:
+            # 沒有可搜尋的欄位
+            return
+
+        self.search_match_count = 0
+        self.snapshot_data_version = self.db_handler.get_data_version()
+        self.search_worker = QueryWorker(self.db_handler, query, search_params)
+        self.search_worker.columns_ready.connect(self.on_search_columns_ready)
+        self.search_worker.rows_found.connect(self.on_search_rows_found)
+        self.search_worker.query_failed.connect(self.on_search_failed)
+        self.search_worker.query_finished.connect(self.on_search_finished)
+        self.start_background_worker(self.search_worker)
+
+    def start_background_worker(self, worker):
+        """啟動背景工作，並在結束前保留其參考"""
+        self.background_workers.add(worker)
+        worker.finished.connect(lambda: self.background_workers.discard(worker))
+        worker.finished.connect(worker.deleteLater)
+        worker.start()
+
+    def cancel_running_search(self):
+        """中斷目前正在背景執行的搜尋"""
+        worker = self.search_worker
+        if worker is not None:
+            worker.cancel()
+            self.search_worker = None
+
+    def on_search_columns_ready(self, columns):
+        """搜尋開始回傳結果時，建立空的資料模型"""
+        if self.sender() is not self.search_worker:
+            return
+        self.table_fully_loaded = False
+        self.table_proxy.set_search_text('')
+        # 前幾欄為資料列識別值，不顯示
+        self.update_table_model_only([], columns[len(self.current_key_columns):])
+        self.show_search_status("Searching: 0 matches so far")
+
+    def on_search_rows_found(self, rows):
+        """將搜尋到的資料列逐批加入模型"""
+        if self.sender() is not self.search_worker:
+            return
+
+        model = self.table_model
+        key_count = len(self.current_key_columns)
+        columns = [model.headerData(col, Qt.Horizontal, Qt.DisplayRole) for col in range(model.columnCount())]
+        for row in rows:
+            row_data = row[key_count:]
+            items = [QStandardItem(str(cell_data) if cell_data is not None else "")
+                     for cell_data in row_data]
+            if key_count and items:
+                items[0].setData(tuple(row[:key_count]), ROW_KEY_ROLE)
+            self.original_data[model.rowCount()] = dict(zip(columns, row_data))
+            model.appendRow(items)
+
+        self.search_match_count += len(rows)
+        self.show_search_status(f"Searching: {self.search_match_count} matches so far")
+
+    def on_search_failed(self, message):
+        """搜尋發生錯誤時恢復原始資料"""
+        if self.sender() is not self.search_worker:
+            return
+        print(f"Search error: {message}")
+        self.search_worker = None
+        if self.current_table_name:
+            self.load_table_data(self.current_table_name)
+
+    def on_search_finished(self, total, cancelled):
+        """搜尋完成，更新狀態列顯示搜尋結果數量"""
+        if self.sender() is not self.search_worker or cancelled:
+            return
+        self.search_worker = None
+        self.show_search_status(f"Search results: {total} rows")
+        self.update_toolbar_state()
+
+    def show_search_status(self, text):
+        """在狀態列顯示搜尋進度"""
+        if hasattr(self, 'status_bar'):
+            self.db_path_label.setText(f"Database: {self.current_db_path} | {text}")
 
     def setup_query_page(self):
         """設置查詢編輯器頁面"""
@@ -1632,6 +2108,10 @@ class MainWindow(QMainWindow):
         self.query_schema_tree = QTreeWidget()
         self.query_schema_tree.setHeaderLabel("Database Schema")
         self.query_schema_tree.itemDoubleClicked.connect(self.on_query_schema_item_double_clicked)
+        self.query_schema_tree.itemExpanded.connect(self.on_schema_item_expanded)
+        self.query_schema_tree.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.query_schema_tree.customContextMenuRequested.connect(
+            lambda pos: self.show_schema_context_menu(self.query_schema_tree, pos))
         # 移除固定寬度限制，改用 splitter 控制
         
         # 設置樹狀結構樣式
@@ -1655,7 +2135,7 @@ class MainWindow(QMainWindow):
         
         # SQL 編輯器區域
         self.query_editor = QTextEdit()
-        self.query_editor.setPlaceholderText("Enter your SQL query here...\nTip: Double-click table names in the sidebar to insert them into your query.")
+        self.query_editor.setPlaceholderText("Enter your SQL query here...\nTip: Double-click table names in the sidebar to insert them into your query.\nREGEXP is available, e.g. WHERE email REGEXP '^admin@'")
         self.query_editor.setMinimumHeight(150)
         
         # 設置編輯器字體
@@ -1701,7 +2181,26 @@ class MainWindow(QMainWindow):
         """
         self.execute_button.setStyleSheet(execute_button_style)
         
+        # 取消按鈕（查詢在背景執行時可用）
+        self.cancel_query_button = QPushButton("Cancel")
+        self.cancel_query_button.clicked.connect(self.cancel_running_query)
+        self.cancel_query_button.setEnabled(False)
+        self.cancel_query_button.setMinimumHeight(35)
+        
+        # 查詢狀態
+        self.query_status_label = QLabel("")
+        self.query_status_label.setStyleSheet("color: #666666; font-size: 12px;")
+        
+        # 匯出查詢結果（重新執行查詢並直接寫入檔案）
+        self.export_query_button = QPushButton("Export...")
+        self.export_query_button.setToolTip("Run the query again and stream its results to a file")
+        self.export_query_button.clicked.connect(self.export_query_results)
+        self.export_query_button.setMinimumHeight(35)
+        
+        button_layout.addWidget(self.query_status_label)
         button_layout.addStretch()
+        button_layout.addWidget(self.export_query_button)
+        button_layout.addWidget(self.cancel_query_button)
         button_layout.addWidget(self.execute_button)
         
         # 結果顯示區域
@@ -1758,235 +2257,159 @@ class MainWindow(QMainWindow):
 
     def load_data_schema_tree(self):
         """載入資料庫 schema 到 Data tab 的樹狀結構"""
-        self.data_schema_tree.clear()
+        self.populate_schema_tree(self.data_schema_tree)
+
+    def load_query_schema_tree(self):
+        """載入資料庫 schema 到 Query tab 的樹狀結構"""
+        self.populate_schema_tree(self.query_schema_tree)
+
+    def populate_schema_tree(self, tree):
+        """建立 schema 樹狀結構的表格節點
+
+        連線時只掃描 sqlite_master 取得表格列表；每個表格先放一個暫時的子節點，
+        欄位與索引在節點第一次展開時才載入（見 on_schema_item_expanded）。
+        """
+        tree.clear()
 
         if not self.db_handler:
             # 顯示無連接狀態
             no_conn_item = QTreeWidgetItem(["No database connected"])
             no_conn_item.setForeground(0, QColor(150, 150, 150))
-            self.data_schema_tree.addTopLevelItem(no_conn_item)
+            tree.addTopLevelItem(no_conn_item)
             return
 
-        tables = self.db_handler.list_tables()
-
-        for table_name in tables:
+        table_items = []
+        for table_name in self.db_handler.list_tables():
             # 創建表格節點
             table_item = QTreeWidgetItem([f"📋 {table_name}"])
             table_item.setData(0, Qt.UserRole, {'type': 'table', 'name': table_name})
             table_item.setForeground(0, QColor(44, 62, 80))  # 深灰色表格名稱
+            self.add_placeholder_child(table_item)
+            table_items.append(table_item)
+        tree.addTopLevelItems(table_items)
+
+    def add_placeholder_child(self, item):
+        """加入暫時的子節點，讓節點顯示展開箭頭；展開時替換為實際內容"""
+        placeholder = QTreeWidgetItem(["Loading..."])
+        placeholder.setData(0, Qt.UserRole, {'type': 'placeholder'})
+        placeholder.setForeground(0, QColor(150, 150, 150))
+        item.addChild(placeholder)
+
+    def on_schema_item_expanded(self, item):
+        """節點第一次展開時，以表格的欄位與索引（或索引的詳細資訊）取代暫時的子節點"""
+        if item.childCount() != 1:
+            return
+        placeholder_data = item.child(0).data(0, Qt.UserRole)
+        if not placeholder_data or placeholder_data.get('type') != 'placeholder':
+            return
+        item.takeChild(0)
+
+        data = item.data(0, Qt.UserRole) or {}
+        if data.get('type') == 'table':
+            self.add_table_children(item, data['name'])
+        elif data.get('type') == 'index':
+            self.add_index_status_details(item, data['table'], data)
 
-            # 獲取表格結構資訊
+    def add_table_children(self, table_item, table_name):
+        """加入表格的欄位與索引節點；索引的詳細資訊同樣在展開時才載入"""
+        # 獲取表格結構資訊
+        try:
+            columns_info = self.db_handler.get_table_schema(table_name)
+            if columns_info:
+                for column in columns_info:
+                    column_name = column[1] if len(column) > 1 else str(column[0])
+                    column_type = column[2] if len(column) > 2 else ""
+
+                    # 獲取類型對應的顏色和圖示
+                    color, icon = self.get_type_color_and_icon(column_type)
+
+                    # 建立欄位顯示文字
+                    column_text = f"{icon} {column_name}" if column_type else f"❓ {column_name}"
+                    if column_type:
+                        column_text += f" ({column_type})"
+
+                    column_item = QTreeWidgetItem([column_text])
+                    column_item.setData(0, Qt.UserRole, {
+                        'type': 'column',
+                        'table': table_name,
+                        'name': column_name,
+                        'data_type': column_type
+                    })
+                    column_item.setForeground(0, color)
+                    table_item.addChild(column_item)
+
+            # 獲取並顯示索引資訊
             try:
-                columns_info = self.db_handler.get_table_schema(table_name)
-                if columns_info:
-                    for column in columns_info:
-                        column_name = column[1] if len(column) > 1 else str(column[0])
-                        column_type = column[2] if len(column) > 2 else ""
-
-                        # 獲取類型對應的顏色和圖示
-                        color, icon = self.get_type_color_and_icon(column_type)
-
-                        # 建立欄位顯示文字
-                        column_text = f"{icon} {column_name}" if column_type else f"❓ {column_name}"
-                        if column_type:
-                            column_text += f" ({column_type})"
-
-                        column_item = QTreeWidgetItem([column_text])
-                        column_item.setData(0, Qt.UserRole, {
-                            'type': 'column',
-                            'table': table_name,
-                            'name': column_name,
-                            'data_type': column_type
-                        })
-                        column_item.setForeground(0, color)
-                        table_item.addChild(column_item)
-
-                # 獲取並顯示索引資訊
-                try:
-                    indexes_info = self.db_handler.get_table_indexes(table_name)
-                    if indexes_info:
-                        # 創建索引父節點
-                        indexes_parent = QTreeWidgetItem(["🔗 Indexes"])
-                        indexes_parent.setData(0, Qt.UserRole, {'type': 'indexes_group', 'table': table_name})
-                        indexes_parent.setForeground(0, QColor(52, 73, 94))  # 深藍色
-
-                        for index_info in indexes_info:
-                            index_name = index_info['name']
-                            is_unique = index_info['unique']
-                            is_primary = index_info['primary']
-                            columns = index_info['columns']
-
-                            # 建立索引顯示文字
-                            index_icon = "🔑" if is_primary else ("🔒" if is_unique else "🔗")
-                            index_text = f"{index_icon} {index_name}"
-
-                            # 添加索引類型信息
-                            type_info = []
-                            if is_primary:
-                                type_info.append("PRIMARY")
-                            if is_unique:
-                                type_info.append("UNIQUE")
-
-                            if type_info:
-                                index_text += f" ({', '.join(type_info)})"
-
-                            # 添加欄位信息
-                            if columns:
-                                column_names = [col['name'] for col in columns]
-                                index_text += f" on ({', '.join(column_names)})"
-
-                            index_item = QTreeWidgetItem([index_text])
-                            index_item.setData(0, Qt.UserRole, {
+                indexes_info = self.db_handler.get_table_indexes(table_name)
+                index_statistics = self.db_handler.get_index_statistics(table_name)
+                if indexes_info:
+                    # 創建索引父節點
+                    indexes_parent = QTreeWidgetItem(["🔗 Indexes"])
+                    indexes_parent.setData(0, Qt.UserRole, {'type': 'indexes_group', 'table': table_name})
+                    indexes_parent.setForeground(0, QColor(52, 73, 94))  # 深藍色
+
+                    for index_info in indexes_info:
+                        index_name = index_info['name']
+                        is_unique = index_info['unique']
+                        is_primary = index_info['primary']
+                        columns = index_info['columns']
+
+                        # 建立索引顯示文字
+                        index_icon = "🔑" if is_primary else ("🔒" if is_unique else "🔗")
+                        index_text = f"{index_icon} {index_name}"
+
+                        # 添加索引類型信息
+                        type_info = []
+                        if is_primary:
+                            type_info.append("PRIMARY")
+                        if is_unique:
+                            type_info.append("UNIQUE")
+
+                        if type_info:
+                            index_text += f" ({', '.join(type_info)})"
+
+                        # 添加欄位信息
+                        if columns:
+                            column_names = [col['name'] for col in columns]
+                            index_text += f" on ({', '.join(column_names)})"
+
+                        index_item = QTreeWidgetItem([index_text])
+                        index_item.setData(0, Qt.UserRole, {
                             'type': 'index',
                             'table': table_name,
                             'name': index_name,
                             'unique': is_unique,
                             'primary': is_primary,
                             'columns': columns
-                            })
-                            # 根據索引類型設置顏色
-                            if is_primary:
-                                index_item.setForeground(0, QColor(52, 152, 219))  # 藍色
-                            elif is_unique:
-                                index_item.setForeground(0, QColor(155, 89, 182))  # 紫色
-                            else:
-                                index_item.setForeground(0, QColor(46, 204, 113))  # 綠色
-                            # 添加索引詳細狀態信息
-                            self.add_index_status_details(index_item, table_name, index_info)
-                            indexes_parent.addChild(index_item)
-                            table_item.addChild(indexes_parent)
-
-                except Exception as e:
-                    error_item = QTreeWidgetItem([f"❌ Error loading indexes: {str(e)}"])
-                    error_item.setForeground(0, QColor(231, 76, 60))
-                    table_item.addChild(error_item)
-
-            except Exception as e:
-                error_item = QTreeWidgetItem([f"❌ Error loading columns: {str(e)}"])
-                error_item.setForeground(0, QColor(231, 76, 60))
-                table_item.addChild(error_item)
-
-            self.data_schema_tree.addTopLevelItem(table_item)
-
-        # 展開所有項目
-        self.data_schema_tree.expandAll()
-
-    def load_query_schema_tree(self):
-        """載入資料庫 schema 到 Query tab 的樹狀結構"""
-        self.query_schema_tree.clear()
-        
-        if not self.db_handler:
-            # 顯示無連接狀態
-            no_conn_item = QTreeWidgetItem(["No database connected"])
-            no_conn_item.setForeground(0, QColor(150, 150, 150))
-            self.query_schema_tree.addTopLevelItem(no_conn_item)
-            return
-            
-        tables = self.db_handler.list_tables()
-        
-        for table_name in tables:
-            # 創建表格節點
-            table_item = QTreeWidgetItem([f"📋 {table_name}"])
-            table_item.setData(0, Qt.UserRole, {'type': 'table', 'name': table_name})
-            table_item.setForeground(0, QColor(44, 62, 80))  # 深灰色表格名稱
-            
-            # 獲取表格結構資訊
-            try:
-                columns_info = self.db_handler.get_table_schema(table_name)
-                if columns_info:
-                    for column in columns_info:
-                        column_name = column[1] if len(column) > 1 else str(column[0])
-                        column_type = column[2] if len(column) > 2 else ""
-                        
-                        # 獲取類型對應的顏色和圖示
-                        color, icon = self.get_type_color_and_icon(column_type)
-                        
-                        # 建立欄位顯示文字
-                        column_text = f"{icon} {column_name}" if column_type else f"❓ {column_name}"
-                        if column_type:
-                            column_text += f" ({column_type})"
-                        
-                        column_item = QTreeWidgetItem([column_text])
-                        column_item.setData(0, Qt.UserRole, {
-                            'type': 'column', 
-                            'table': table_name, 
-                            'name': column_name,
-                            'data_type': column_type
                         })
-                        column_item.setForeground(0, color)
-                        table_item.addChild(column_item)
-
-                # 獲取並顯示索引資訊
-                try:
-                    indexes_info = self.db_handler.get_table_indexes(table_name)
-                    if indexes_info:
-                        # 創建索引父節點
-                        indexes_parent = QTreeWidgetItem(["🔗 Indexes"])
-                        indexes_parent.setData(0, Qt.UserRole, {'type': 'indexes_group', 'table': table_name})
-                        indexes_parent.setForeground(0, QColor(52, 73, 94))  # 深藍色
-
-                        for index_info in indexes_info:
-                            index_name = index_info['name']
-                            is_unique = index_info['unique']
-                            is_primary = index_info['primary']
-                            columns = index_info['columns']
-
-                            # 建立索引顯示文字
-                            index_icon = "🔑" if is_primary else ("🔒" if is_unique else "🔗")
-                            index_text = f"{index_icon} {index_name}"
-
-                            # 添加索引類型信息
-                            type_info = []
-                            if is_primary:
-                                type_info.append("PRIMARY")
-                            if is_unique:
-                                type_info.append("UNIQUE")
-
-                            if type_info:
-                                index_text += f" ({', '.join(type_info)})"
-
-                            # 添加欄位信息
-                            if columns:
-                                column_names = [col['name'] for col in columns]
-                                index_text += f" on ({', '.join(column_names)})"
-
-                            index_item = QTreeWidgetItem([index_text])
-                            index_item.setData(0, Qt.UserRole, {
-                                'type': 'index',
-                                'table': table_name,
-                                'name': index_name,
-                                'unique': is_unique,
-                                'primary': is_primary,
-                                'columns': columns
-                            })
-
-                             # 根據索引類型設置顏色
-                            if is_primary:
-                                index_item.setForeground(0, QColor(52, 152, 219))  # 藍色
-                            elif is_unique:
-                                index_item.setForeground(0, QColor(155, 89, 182))  # 紫色
-                            else:
-                                index_item.setForeground(0, QColor(46, 204, 113))  # 綠色
-                                                        # 添加索引詳細狀態信息
-                            self.add_index_status_details(index_item, table_name, index_info)
-                            indexes_parent.addChild(index_item)
-
-                        table_item.addChild(indexes_parent)
-
-                except Exception as e:
-                    error_item = QTreeWidgetItem([f"❌ Error loading indexes: {str(e)}"])
-                    error_item.setForeground(0, QColor(231, 76, 60))
-                    table_item.addChild(error_item)
+                        # 根據索引類型設置顏色
+                        if is_primary:
+                            index_item.setForeground(0, QColor(52, 152, 219))  # 藍色
+                        elif is_unique:
+                            index_item.setForeground(0, QColor(155, 89, 182))  # 紫色
+                        else:
+                            index_item.setForeground(0, QColor(46, 204, 113))  # 綠色
+                        # ANALYZE 統計顯示選擇性低的索引以橘色標示
+                        stat = index_statistics.get(index_name)
+                        if stat and stat['low_selectivity']:
+                            index_item.setText(0, f"{index_text} ⚠️")
+                            index_item.setToolTip(0, f"Low selectivity: each key matches "
+                                                     f"~{stat['selectivity']:.0%} of the rows")
+                            index_item.setForeground(0, QColor(230, 126, 34))  # 橘色
+                        # 索引詳細狀態信息（需要額外查詢）在展開索引時才載入
+                        self.add_placeholder_child(index_item)
+                        indexes_parent.addChild(index_item)
+                    table_item.addChild(indexes_parent)
 
             except Exception as e:
-                error_item = QTreeWidgetItem([f"❌ Error loading columns: {str(e)}"])
+                error_item = QTreeWidgetItem([f"❌ Error loading indexes: {str(e)}"])
                 error_item.setForeground(0, QColor(231, 76, 60))
                 table_item.addChild(error_item)
 
-            self.query_schema_tree.addTopLevelItem(table_item)
-        
-        # 展開所有項目
-        self.query_schema_tree.expandAll()
+        except Exception as e:
+            error_item = QTreeWidgetItem([f"❌ Error loading columns: {str(e)}"])
+            error_item.setForeground(0, QColor(231, 76, 60))
+            table_item.addChild(error_item)
 
     def on_data_schema_item_clicked(self, item):
         """處理 Data tab 樹狀結構項目點擊"""
@@ -2002,6 +2425,166 @@ class MainWindow(QMainWindow):
             table_name = data.get('name')
             self.load_table_data(table_name)
 
+    def show_schema_context_menu(self, tree, pos):
+        """schema 樹狀結構的右鍵選單（表格節點）"""
+        item = tree.itemAt(pos)
+        data = item.data(0, Qt.UserRole) if item else None
+        if not data or data.get('type') != 'table':
+            return
+        table_name = data.get('name')
+        menu = QMenu(tree)
+        menu.addAction("Copy Table To...", lambda: self.copy_table_to(table_name))
+        menu.addAction("Analyze", lambda: self.analyze_database([table_name]))
+        append_only_action = menu.addAction("Append-Only (Load Only New Rows on Refresh)")
+        append_only_action.setCheckable(True)
+        append_only_action.setChecked(self.config_manager.is_append_only_table(self.current_db_path, table_name))
+        append_only_action.toggled.connect(
+            lambda checked: self.config_manager.set_append_only_table(self.current_db_path, table_name, checked))
+        menu.exec_(tree.viewport().mapToGlobal(pos))
+
+    def copy_table_to(self, table_name):
+        """將表格（或符合條件的資料列）複製到另一個已儲存的連接
+
+        目標資料庫 ATTACH 來源後以 INSERT ... SELECT 在背景複製，資料列不經過 Python；
+        只會複製已提交的資料。
+        """
+        if not self.db_handler or not self.current_db_path:
+            return
+        if self.copy_worker is not None:
+            QMessageBox.warning(self, "Copy Running", "Please wait for the current copy to finish.")
+            return
+        
+        current_path = os.path.abspath(self.current_db_path)
+        connections = {name: path for name, path in self.config_manager.get_all_connections().items()
+                       if os.path.abspath(path) != current_path}
+        if not connections:
+            QMessageBox.information(self, "Copy Table",
+                                    "Add another saved connection first; tables are copied into saved connections.")
+            return
+        
+        dialog = CopyTableDialog(self, table_name, connections)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        
+        self.copy_worker = CopyTableWorker(dialog.get_target_path(), dialog.get_copy_options(self.current_db_path),
+                                           dialog.get_target_name())
+        self.copy_worker.copy_failed.connect(self.on_copy_failed)
+        self.copy_worker.copy_finished.connect(self.on_copy_finished)
+        
+        # 單一 INSERT ... SELECT 沒有進度，只顯示忙碌狀態
+        self.copy_progress_dialog = QProgressDialog(
+            f"Copying {table_name} to {self.copy_worker.target_name}...", "Cancel", 0, 0, self)
+        self.copy_progress_dialog.setWindowTitle("Copy Table")
+        self.copy_progress_dialog.setMinimumDuration(0)
+        self.copy_progress_dialog.canceled.connect(self.copy_worker.cancel)
+        self.copy_progress_dialog.show()
+        
+        self.start_background_worker(self.copy_worker)
+
+    def on_copy_failed(self, message):
+        QMessageBox.critical(self, "Copy Failed", f"Failed to copy the table (nothing was changed):\n{message}")
+
+    def on_copy_finished(self, total, cancelled):
+        worker, self.copy_worker = self.copy_worker, None
+        if self.copy_progress_dialog:
+            self.copy_progress_dialog.canceled.disconnect()
+            self.copy_progress_dialog.close()
+            self.copy_progress_dialog = None
+        if cancelled:
+            self.status_bar.showMessage("Copy cancelled, nothing was changed", 5000)
+        elif worker and not worker.failed:
+            self.status_bar.showMessage(
+                f"Copied {total:,} rows to {worker.options['target_table']} in {worker.target_name}", 10000)
+
+    def start_database_watcher(self):
+        """開始監看目前資料庫的外部寫入（取代前一個資料庫的監看）"""
+        if self.database_watcher:
+            self.database_watcher.stop()
+            self.database_watcher.deleteLater()
+            self.database_watcher = None
+        if not self.db_handler or not self.db_handler.connection:
+            return
+        self.database_watcher = DatabaseWatcher(self.db_handler, parent=self)
+        self.database_watcher.schema_changed.connect(self.on_database_schema_changed)
+        self.database_watcher.data_changed.connect(self.on_database_data_changed)
+        self.database_watcher.start()
+
+    def can_refresh_current_table(self):
+        """有未提交的變更、即時模式的交易或匯入進行中時，不自動重新載入目前的表格"""
+        if not self.current_table_name or not self.db_handler:
+            return False
+        return (not self.change_tracker.has_changes() and not self.has_open_transaction()
+                and self.import_worker is None)
+
+    def reload_schema_trees(self):
+        """重建兩個 schema 樹狀結構，保留已展開的表格"""
+        for tree in (self.data_schema_tree, self.query_schema_tree):
+            expanded = set()
+            for row in range(tree.topLevelItemCount()):
+                item = tree.topLevelItem(row)
+                if item.isExpanded():
+                    expanded.add((item.data(0, Qt.UserRole) or {}).get('name'))
+            self.populate_schema_tree(tree)
+            for row in range(tree.topLevelItemCount()):
+                item = tree.topLevelItem(row)
+                if (item.data(0, Qt.UserRole) or {}).get('name') in expanded:
+                    item.setExpanded(True)
+
+    def on_database_schema_changed(self):
+        """其他連線修改了結構：重建 schema 樹狀結構，並重新載入目前的表格"""
+        self.reload_schema_trees()
+        
+        if not self.current_table_name:
+            return
+        if self.current_table_name not in self.db_handler.list_tables():
+            self.status_bar.showMessage(f"Table {self.current_table_name} was dropped by another connection", 10000)
+        elif self.can_refresh_current_table():
+            self.refresh_current_table()
+            self.status_bar.showMessage("Schema changed by another connection, reloaded", 5000)
+        else:
+            self.status_bar.showMessage("Schema changed by another connection", 5000)
+
+    def on_database_data_changed(self):
+        """其他連線寫入了資料：只會附加資料列的表格只讀取新的資料列，其他表格重新載入
+
+        data_version 無法指出寫入的是哪個表格，因此一律重新載入，已載入資料列的更新也會顯示。
+        """
+        if not self.can_refresh_current_table():
+            if self.current_table_name:
+                self.status_bar.showMessage("Database changed by another connection", 5000)
+            return
+        table_name = self.current_table_name
+        if (self.table_fully_loaded and self.current_key_columns
+                and self.config_manager.is_append_only_table(self.current_db_path, table_name)):
+            result = self.db_handler.fetch_appended_rows(table_name, self.current_key_columns[0],
+                                                         self.loaded_last_key, self.table_model.rowCount())
+            if result is not None:
+                self.append_loaded_rows(*result)
+                return
+        self.refresh_current_table()
+
+    def refresh_current_table(self):
+        """重新載入目前的表格；顯示的是資料庫搜尋結果時重新搜尋"""
+        search_text = self.search_input.text().strip()
+        if not self.table_fully_loaded and self.is_searchable_text(search_text):
+            self.perform_search(search_text)
+        else:
+            self.load_table_data(self.current_table_name)
+
+    def append_loaded_rows(self, columns, rows):
+        """將新的資料列（第一欄為 rowid）附加到目前的模型，保留捲動位置、選取與過濾"""
+        if not rows:
+            return
+        model = self.table_model
+        for row in rows:
+            row_num = model.rowCount()
+            items = [QStandardItem(self.format_cell_text(value)) for value in row[1:]]
+            items[0].setData((row[0],), ROW_KEY_ROLE)
+            model.appendRow(items)
+            self.original_data[row_num] = dict(zip(columns[1:], row[1:]))
+        self.loaded_last_key = rows[-1][0]
+        self.status_bar.showMessage(f"Loaded {len(rows):,} new rows from another connection", 5000)
+
     def on_query_schema_item_double_clicked(self, item):
         """處理 Query tab 樹狀結構項目雙擊 - 插入到 SQL 編輯器"""
         data = item.data(0, Qt.UserRole)
@@ -2026,18 +2609,39 @@ class MainWindow(QMainWindow):
         """載入指定表格的資料"""
         if not self.db_handler:
             return
+        
+        # 重新載入會替換資料模型，未提交的變更需要先處理
+        load_count = self.table_load_count
+        if not self.resolve_pending_changes():
+            return
+        # 提交變更時已經重新載入目前的表格，不需要再讀取一次
+        if table_name == self.current_table_name and self.table_load_count != load_count:
+            return
             
-        # 停止搜尋計時器
+        # 停止搜尋計時器與背景搜尋
         self.search_timer.stop()
+        self.cancel_running_search()
             
         try:
-            # 直接查詢表格資料，不包含 ROWID
+            # 查詢表格資料，前幾欄為資料列識別值（rowid 或 WITHOUT ROWID 表格的主鍵）
+            key_columns = self.db_handler.get_row_key_columns(table_name)
+            # 在讀取資料前記錄版本，讀取期間的外部寫入也能在提交時被發現
+            self.snapshot_data_version = self.db_handler.get_data_version()
             cursor = self.db_handler.connection.cursor()
-            cursor.execute(f"SELECT * FROM {table_name}")
-            data = cursor.fetchall()
-            
-            # 獲取欄位名稱
-            columns = [description[0] for description in cursor.description]
+            cursor.execute(self.db_handler.build_select_query(table_name, key_columns))
+            rows = cursor.fetchall()
+            
+            # 分離識別值與顯示的資料
+            key_count = len(key_columns)
+            columns = [description[0] for description in cursor.description][key_count:]
+            data = [row[key_count:] for row in rows]
+            row_keys = [row[:key_count] for row in rows] if key_count else None
+            self.current_key_columns = key_columns
+            if self.database_watcher:
+                self.database_watcher.mark_data_seen(self.snapshot_data_version)
+            self.loaded_last_key = None
+            if key_count == 1 and key_columns[0] in ROWID_ALIASES:
+                self.loaded_last_key = max((key[0] for key in row_keys), default=None)
             
             if data is not None and columns is not None:
                 # 檢查是否是同一個表格（從搜尋恢復）還是新表格
@@ -2049,10 +2653,10 @@ class MainWindow(QMainWindow):
                 
                 if is_same_table and table_name in self.column_widths:
                     # 同一個表格且已有寬度記錄，只更新資料模型
-                    self.update_table_model_only(data, columns)
+                    self.update_table_model_only(data, columns, row_keys)
                 else:
                     # 新表格或首次載入，計算寬度分配
-                    self.display_data_in_table_view(data, columns, self.table_view)
+                    self.display_data_in_table_view(data, columns, self.table_view, row_keys)
                 
                 # 應用欄位顯示設定
                 self.apply_column_visibility()
@@ -2060,6 +2664,15 @@ class MainWindow(QMainWindow):
                 self.update_toolbar_state()
                 # 重置狀態列（清除搜尋結果顯示）
                 self.update_status_bar()
+                
+                # 模型現在包含整個表格，可直接在記憶體中過濾
+                self.table_fully_loaded = True
+                self.table_load_count += 1
+                search_text = self.search_input.text().strip() if hasattr(self, 'search_input') else ''
+                if self.can_filter_in_memory():
+                    self.apply_client_filter(search_text)
+                else:
+                    self.table_proxy.set_search_text('')
         except Exception as e:
             from PyQt5.QtWidgets import QMessageBox
             QMessageBox.critical(self, "Error", f"Failed to load table data:\n{str(e)}")
@@ -2067,7 +2680,12 @@ class MainWindow(QMainWindow):
 
     def execute_sql(self):
         query = self.query_editor.toPlainText()
-        if not query:
+        if not query or not self.db_handler:
+            return
+
+        # 讀取查詢（可能使用很慢的 REGEXP）在背景唯讀連接上執行，可隨時取消
+        if is_read_only_query(query):
+            self.run_query_in_background(query)
             return
 
         results = self.db_handler.execute_query(query)
@@ -2076,34 +2694,77 @@ class MainWindow(QMainWindow):
             data = results[1:]
             self.display_data_in_table_view(data, columns, self.query_result_view)
 
-    def display_data_in_table_view(self, data, columns, table_view):
-        """在指定的 table view 中顯示資料"""
-        model = QStandardItemModel(len(data), len(columns))
+    def run_query_in_background(self, query):
+        """在背景執行緒中執行查詢，結果分批顯示"""
+        self.cancel_running_query()
+
+        self.query_row_count = 0
+        self.query_worker = QueryWorker(self.db_handler, query)
+        self.query_worker.columns_ready.connect(self.on_query_columns_ready)
+        self.query_worker.rows_found.connect(self.on_query_rows_found)
+        self.query_worker.query_failed.connect(self.on_query_failed)
+        self.query_worker.query_finished.connect(self.on_query_finished)
+        self.start_background_worker(self.query_worker)
+
+        self.cancel_query_button.setEnabled(True)
+        self.query_status_label.setText("Running...")
+
+    def cancel_running_query(self):
+        """中斷查詢頁正在執行的查詢"""
+        worker = self.query_worker
+        if worker is not None:
+            worker.cancel()
+            self.query_worker = None
+            self.query_status_label.setText("Cancelled")
+        self.cancel_query_button.setEnabled(False)
+
+    def on_query_columns_ready(self, columns):
+        if self.sender() is not self.query_worker:
+            return
+        model = QStandardItemModel(0, len(columns))
         model.setHorizontalHeaderLabels(columns)
+        self.query_result_view.setModel(model)
 
-        for row_num, row_data in enumerate(data):
-            for col_num, cell_data in enumerate(row_data):
-                item = QStandardItem(str(cell_data) if cell_data is not None else "")
-                model.setItem(row_num, col_num, item)
-        
-        table_view.setModel(model)
+    def on_query_rows_found(self, rows):
+        if self.sender() is not self.query_worker:
+            return
+        model = self.query_result_view.model()
+        first_batch = self.query_row_count == 0
+        for row_data in rows:
+            model.appendRow([QStandardItem(str(cell_data) if cell_data is not None else "")
+                             for cell_data in row_data])
+        self.query_row_count += len(rows)
+        self.query_status_label.setText(f"Running: {self.query_row_count} rows so far")
+
+        if first_batch:
+            self.query_result_view.resizeColumnsToContents()
+
+    def on_query_failed(self, message):
+        if self.sender() is not self.query_worker:
+            return
+        self.query_status_label.setText(f"Error: {message}")
+
+    def on_query_finished(self, total, cancelled):
+        if self.sender() is not self.query_worker:
+            return
+        self.query_worker = None
+        self.cancel_query_button.setEnabled(False)
+        if not self.query_status_label.text().startswith("Error"):
+            self.query_status_label.setText(f"{total} rows")
+
+    def display_data_in_table_view(self, data, columns, table_view, row_keys=None):
+        """在指定的 table view 中顯示資料"""
+        model = self.build_table_model(data, columns, row_keys)
         
-        # 如果是主要的資料瀏覽表格，添加變更追蹤和選擇監聽
+        # 如果是主要的資料瀏覽表格，添加變更追蹤
         if table_view == self.table_view:
-            # 連接資料變更信號
-            model.dataChanged.connect(self.on_data_changed)
-            # 連接選擇變更信號
-            selection_model = table_view.selectionModel()
-            if selection_model:
-                selection_model.selectionChanged.connect(self.on_selection_changed)
+            # 主要表格透過過濾代理模型顯示
+            self.set_table_model(model)
+            self.table_proxy.set_source_rows(data)
             # 儲存原始資料以便比較變更
-            self.original_data = {}
-            if data:
-                for row_num, row_data in enumerate(data):
-                    row_dict = {}
-                    for col_num, cell_data in enumerate(row_data):
-                        row_dict[columns[col_num]] = cell_data
-                    self.original_data[row_num] = row_dict
+            self.remember_original_data(data, columns)
+        else:
+            table_view.setModel(model)
         
         # 處理欄位寬度分配
         self.apply_column_width_settings(table_view, columns)
@@ -2205,24 +2866,42 @@ class MainWindow(QMainWindow):
         # 設置為互動模式，允許用戶調整
         header.setSectionResizeMode(QHeaderView.Interactive)
     
-    def update_table_model_only(self, data, columns):
-        """只更新表格資料模型，不調整欄位寬度（用於搜尋結果）"""
+    def build_table_model(self, data, columns, row_keys=None):
+        """建立資料模型；提供 row_keys 時，每列的識別值存放在第一欄的 ROW_KEY_ROLE"""
         model = QStandardItemModel(len(data), len(columns))
         model.setHorizontalHeaderLabels(columns)
 
         for row_num, row_data in enumerate(data):
             for col_num, cell_data in enumerate(row_data):
                 item = QStandardItem(str(cell_data) if cell_data is not None else "")
+                if col_num == 0 and row_keys is not None:
+                    item.setData(tuple(row_keys[row_num]), ROW_KEY_ROLE)
                 model.setItem(row_num, col_num, item)
+        return model
+
+    def remember_original_data(self, data, columns):
+        """儲存原始資料以便比較變更"""
+        self.original_data = {}
+        for row_num, row_data in enumerate(data):
+            row_dict = {}
+            for col_num, cell_data in enumerate(row_data):
+                row_dict[columns[col_num]] = cell_data
+            self.original_data[row_num] = row_dict
+
+    def get_row_key(self, row):
+        """取得模型中某一列的識別值（rowid 或主鍵），新增的列回傳 None"""
+        item = self.table_model.item(row, 0)
+        key = item.data(ROW_KEY_ROLE) if item else None
+        return tuple(key) if key is not None else None
+
+    def update_table_model_only(self, data, columns, row_keys=None):
+        """只更新表格資料模型，不調整欄位寬度（用於搜尋結果）"""
+        model = self.build_table_model(data, columns, row_keys)
         
         # 只設置資料模型，不觸發任何寬度調整
-        self.table_view.setModel(model)
-        
-        # 重新連接信號（因為模型變更了）
-        model.dataChanged.connect(self.on_data_changed)
-        selection_model = self.table_view.selectionModel()
-        if selection_model:
-            selection_model.selectionChanged.connect(self.on_selection_changed)
+        self.set_table_model(model)
+        self.table_proxy.set_source_rows(data)
+        self.remember_original_data(data, columns)
         
         # 應用欄位顯示設定
         self.apply_column_visibility()
@@ -2244,12 +2923,35 @@ class MainWindow(QMainWindow):
                 saved_width = self.vertical_header_widths[table_key]
                 vertical_header.setFixedWidth(saved_width)
 
+    def get_search_column_types(self):
+        """SQL 搜尋比對的欄位與宣告型別，記憶體過濾以相同的欄位型別比對（產生欄位不在其中）"""
+        if not self.db_handler or not self.current_table_name:
+            return None
+        return {column_info[1]: column_info[2] or ''
+                for column_info in self.db_handler.get_table_schema(self.current_table_name)}
+
+    def set_table_model(self, model):
+        """替換主要表格的資料模型（透過過濾代理模型顯示）"""
+        self.table_model = model
+        self.table_proxy.setSourceModel(model)
+        self.table_proxy.set_column_types(self.get_search_column_types())
+        # 變更與復原記錄以列號對應目前的模型
+        self.change_tracker.clear()
+        self.edit_journal.clear()
+        self.live_inserted_rows.clear()
+        # 連接資料變更信號
+        model.dataChanged.connect(self.on_data_changed)
+
     def on_data_changed(self, top_left, bottom_right, roles=None):
-        """處理資料變更事件"""
+        """處理資料變更事件：只比較變更範圍內的儲存格"""
         if not self.is_editing or not hasattr(self, 'original_data'):
             return
+        
+        # 只處理內容變更（背景色等 role 的變更不算編輯）
+        if roles and Qt.DisplayRole not in roles and Qt.EditRole not in roles:
+            return
             
-        model = self.table_view.model()
+        model = self.table_model
         if not model:
             return
             
@@ -2257,95 +2959,601 @@ class MainWindow(QMainWindow):
         for row in range(top_left.row(), bottom_right.row() + 1):
             if row not in self.original_data:
                 continue
-                
-            # 收集目前行的所有資料
-            current_row_data = {}
+            
+            before, after = self.track_row_cells(row, range(top_left.column(), bottom_right.column() + 1))
+            
+            # 直接在表格中編輯時，每次變更記錄為一個可復原的操作
+            if not self.journal_suspended and after:
+                self.record_edit({'kind': 'update', 'row': row, 'before': before, 'after': after})
+
+    def get_original_texts(self, row):
+        """取得某一列原始資料的文字 {欄位: 文字}"""
+        original_row_data = self.original_data.get(row, {})
+        return {column: str(value) if value is not None else ""
+                for column, value in original_row_data.items()}
+
+    def get_row_texts(self, row):
+        """取得模型中某一列目前顯示的文字 {欄位: 文字}"""
+        model = self.table_model
+        row_data = {}
+        for col in range(model.columnCount()):
+            column_name = model.headerData(col, Qt.Horizontal, Qt.DisplayRole)
+            item = model.item(row, col)
+            row_data[column_name] = item.text() if item else ""
+        return row_data
+
+    def set_row_texts(self, row, row_data):
+        """設定模型中某一列的文字（不記錄為新的操作），並更新變更記錄"""
+        model = self.table_model
+        changed_columns = []
+        self.journal_suspended = True
+        try:
             for col in range(model.columnCount()):
                 column_name = model.headerData(col, Qt.Horizontal, Qt.DisplayRole)
                 item = model.item(row, col)
-                value = item.text() if item else ""
-                current_row_data[column_name] = value
-            
-            # 比較與原始資料的差異
-            original_row_data = self.original_data[row]
-            has_changes = False
-            
-            for column_name, current_value in current_row_data.items():
-                original_value = str(original_row_data.get(column_name, ""))
-                if current_value != original_value:
-                    has_changes = True
-                    break
-            
-            if has_changes:
-                # 檢查是否已經記錄了這一行的變更
-                existing_change = None
-                for i, change in enumerate(self.pending_changes):
-                    if (change['action'] == 'update' and 
-                        change.get('row') == row):
-                        existing_change = i
-                        break
-                
-                # 更新或添加變更記錄
-                if existing_change is not None:
-                    self.pending_changes[existing_change]['new_data'] = current_row_data
-                else:
-                    self.pending_changes.append({
-                        'action': 'update',
-                        'row': row,
-                        'old_data': original_row_data.copy(),
-                        'new_data': current_row_data.copy()
-                    })
-                
-                # 標記修改過的行（添加背景色）
-                self.highlight_modified_row(row)
-                
-                self.update_toolbar_state()
-            else:
-                # 如果沒有變更，移除背景色標記
-                self.remove_row_highlight(row)
+                if item and column_name in row_data:
+                    changed_columns.append(col)
+                    if item.text() != str(row_data[column_name]):
+                        item.setText(str(row_data[column_name]))
+        finally:
+            self.journal_suspended = False
+        self.track_row_cells(row, changed_columns)
+
+    def track_row_cells(self, row, columns):
+        """比較指定欄位與原始資料並記錄到 change_tracker，回傳 (變更前, 變更後) 有改變的儲存格"""
+        before, after = {}, {}
+        if row not in self.original_data:
+            return before, after
+        
+        model = self.table_model
+        original_row_data = self.original_data[row]
+        key = self.get_row_key(row)
+        for col in columns:
+            column_name = model.headerData(col, Qt.Horizontal, Qt.DisplayRole)
+            item = model.item(row, col)
+            value = item.text() if item else ""
+            original_value = original_row_data.get(column_name)
+            original_text = str(original_value) if original_value is not None else ""
+            
+            previous = self.change_tracker.cell_value(row, column_name, original_text)
+            if value != previous:
+                before[column_name] = previous
+                after[column_name] = value
+            self.change_tracker.set_cell(row, key, column_name, value, original_text)
+        
+        # 標記或移除修改過的行的背景色
+        self.refresh_row_highlight(row)
+        self.update_toolbar_state()
+        return before, after
 
-    def highlight_modified_row(self, row):
-        """為修改過的行添加背景色"""
-        model = self.table_view.model()
-        if not model:
+    def apply_row_edit(self, row, before, after):
+        """套用編輯對話框的結果：更新表格顯示、變更記錄，並記錄為一個可復原的操作"""
+        changed = {column: str(value) for column, value in after.items()
+                   if column in before and str(value) != before[column]}
+        if not changed:
             return
-            
-        # 設置淡黃色背景來標示修改過的行
-        highlight_color = QColor(255, 248, 220)  # 淡黃色 (cornsilk)
-        
-        for col in range(model.columnCount()):
-            item = model.item(row, col)
-            if item:
-                item.setBackground(highlight_color)
+        self.set_row_texts(row, changed)
+        self.record_edit({'kind': 'update', 'row': row,
+                          'before': {column: before[column] for column in changed}, 'after': changed})
 
-    def remove_row_highlight(self, row):
-        """移除行的背景色標記"""
-        model = self.table_view.model()
-        if not model:
+    def record_edit(self, entry):
+        """記錄一個可復原的操作；即時模式下同時寫入資料庫"""
+        if self.live_edit and not self.apply_live_edit(entry):
             return
-            
-        for col in range(model.columnCount()):
-            item = model.item(row, col)
-            if item:
-                item.setBackground(QColor())  # 設置為預設背景（透明）
+        self.edit_journal.record(entry)
+        self.update_toolbar_state()
 
-    def clear_all_highlights(self):
-        """清除所有行的背景色標記"""
-        model = self.table_view.model()
-        if not model:
+    def undo_edit(self):
+        """復原最後一個操作，只還原受影響的資料列"""
+        entry = self.edit_journal.undo()
+        if entry is None:
             return
-            
-        for row in range(model.rowCount()):
-            for col in range(model.columnCount()):
-                item = model.item(row, col)
-                if item:
-                    item.setBackground(QColor())  # 設置為預設背景（透明）
+        try:
+            if entry.get('savepoint'):
+                self.db_handler.rollback_to_savepoint(entry.pop('savepoint'))
+        except Exception as e:
+            QMessageBox.critical(self, "Undo Failed", f"Failed to roll back to savepoint:\n{str(e)}")
+        self.revert_edit_entry(entry)
+        self.end_idle_live_transaction()
+        self.update_toolbar_state()
+
+    def end_idle_live_transaction(self):
+        """即時模式：所有操作都已復原時回滾外層交易，釋放寫入鎖
+
+        ROLLBACK TO 只移除 SAVEPOINT，第一個操作開始的 BEGIN IMMEDIATE 交易仍然開啟。
+        """
+        if self.live_edit and not self.edit_journal.can_undo() and self.has_open_transaction():
+            self.db_handler.connection.rollback()
+
+    def redo_edit(self):
+        """重做最後一個被復原的操作"""
+        entry = self.edit_journal.redo()
+        if entry is None:
+            return
+        self.reapply_edit_entry(entry)
+        if self.live_edit and not self.apply_live_edit(entry):
+            self.edit_journal.discard_last()
+            self.end_idle_live_transaction()
+        self.update_toolbar_state()
+
+    def revert_edit_entry(self, entry):
+        """在模型上還原一個操作"""
+        if entry['kind'] == 'update':
+            self.set_row_texts(entry['row'], entry['before'])
+        elif entry['kind'] == 'insert':
+            self.change_tracker.take_rows(entry['rows'])
+            self.table_proxy.hide_rows(entry['rows'])
+        elif entry['kind'] == 'delete':
+            self.change_tracker.unmark_deleted(entry['rows'])
+            self.change_tracker.restore_rows(entry['dropped'])
+            self.table_proxy.show_rows(entry['rows'])
+        elif entry['kind'] == 'batch':
+            for sub_entry in reversed(entry['entries']):
+                self.revert_edit_entry(sub_entry)
+
+    def reapply_edit_entry(self, entry):
+        """在模型上重新套用一個操作"""
+        if entry['kind'] == 'update':
+            self.set_row_texts(entry['row'], entry['after'])
+        elif entry['kind'] == 'insert':
+            for row, data in entry['rows'].items():
+                self.change_tracker.mark_inserted(row, dict(data))
+            self.table_proxy.show_rows(entry['rows'])
+        elif entry['kind'] == 'delete':
+            self.change_tracker.take_rows(entry['rows'])
+            self.change_tracker.mark_deleted(entry['keys'])
+            self.table_proxy.hide_rows(entry['rows'])
+        elif entry['kind'] == 'batch':
+            for sub_entry in entry['entries']:
+                self.reapply_edit_entry(sub_entry)
+
+    def apply_live_edit(self, entry):
+        """即時模式：在新的 SAVEPOINT 中把操作寫入資料庫，失敗時還原模型並回傳 False"""
+        self.savepoint_counter += 1
+        savepoint = f"edit_{self.savepoint_counter}"
+        try:
+            self.db_handler.create_savepoint(savepoint)
+            self.execute_live_entry(entry)
+            entry['savepoint'] = savepoint
+            return True
+        except Exception as e:
+            try:
+                self.db_handler.rollback_to_savepoint(savepoint)
+            except Exception:
+                pass
+            self.revert_edit_entry(entry)
+            self.end_idle_live_transaction()
+            QMessageBox.critical(self, "Edit Failed", f"Failed to apply change:\n{str(e)}")
+            return False
+
+    def execute_live_entry(self, entry):
+        """即時模式：把一個操作寫入資料庫；更新與刪除合併為一次 execute_changes"""
+        changes = []
+        for sub_entry in entry['entries'] if entry['kind'] == 'batch' else [entry]:
+            if sub_entry['kind'] == 'insert':
+                for row in sub_entry['rows']:
+                    self.execute_live_insert(row)
+            elif sub_entry['kind'] == 'update':
+                key = self.get_row_key(sub_entry['row'])
+                if key is None:
+                    raise ValueError("Cannot identify the row to update (missing rowid/primary key)")
+                changes.append({'action': 'update', 'key': key, 'values': dict(sub_entry['after'])})
+            elif sub_entry['keys']:
+                changes.append({'action': 'delete', 'keys': list(sub_entry['keys'].values())})
+        if changes:
+            self.db_handler.execute_changes(self.current_table_name, self.current_key_columns, changes)
+
+    def execute_live_insert(self, row):
+        """即時模式：寫入新增的資料列，並記下其識別值，之後的編輯會成為一般的更新"""
+        change = self.build_insert_change({'row': row})
+        values = change['values'] if change else {}
+        cursor = self.db_handler.connection.cursor()
+        if values:
+            self.db_handler.insert_row(cursor, self.current_table_name, values)
+        else:
+            cursor.execute(f"INSERT INTO {quote_identifier(self.current_table_name)} DEFAULT VALUES")
+        
+        key_columns = self.current_key_columns
+        if len(key_columns) == 1 and key_columns[0] in ROWID_ALIASES:
+            key = (cursor.lastrowid,)
+        else:
+            column_types = self.db_handler.get_column_types(self.current_table_name)
+            key = tuple(coerce_value(values.get(column), column_types.get(column)) for column in key_columns)
+        
+        item = self.table_model.item(row, 0)
+        if item:
+            item.setData(key, ROW_KEY_ROLE)
+        self.original_data[row] = self.get_row_texts(row)
+        self.live_inserted_rows.add(row)
+
+    def set_live_edit(self, enabled):
+        """切換即時模式；有未提交的變更時不能切換"""
+        if enabled == self.live_edit:
+            return
+        if self.change_tracker.has_changes() or self.edit_journal.can_undo() or self.has_open_transaction():
+            QMessageBox.warning(self, "Unsaved Changes",
+                                "Please commit or roll back your changes before switching live mode.")
+            self.live_checkbox.blockSignals(True)
+            self.live_checkbox.setChecked(self.live_edit)
+            self.live_checkbox.blockSignals(False)
+            return
+        self.live_edit = enabled
+        self.update_toolbar_state()
+
+    def refresh_row_highlight(self, row):
+        """重新繪製某一列的背景色（由 change_tracker 決定，見 TableFilterProxyModel.data）"""
+        self.table_proxy.refresh_rows([row])
+
+    def clear_all_highlights(self):
+        """清除所有行的背景色標記（變更記錄清空後只需通知畫面一次）"""
+        self.table_proxy.refresh_all_rows()
 
     def on_selection_changed(self, selected=None, deselected=None):
         """處理表格選擇變更"""
         _ = selected, deselected  # 忽略未使用的参数
         self.update_toolbar_state()
 
+    def export_table(self, filtered=False):
+        """匯出目前的表格；filtered=True 時只匯出符合目前搜尋條件的資料列
+
+        資料在背景唯讀連接上重新查詢並直接寫入檔案，不受畫面上已載入的資料列數限制，
+        搜尋結果使用與資料頁背景搜尋相同的 SQL 條件；未提交的變更不會被匯出。
+        表格正在記憶體中過濾時，則匯出過濾後畫面上的資料列（包含未提交的變更）。
+        """
+        if not self.current_table_name or not self.db_handler:
+            return
+        
+        # 表格的宣告型別決定 Parquet/Arrow 的欄位型別
+        column_types = self.db_handler.get_column_types(self.current_table_name)
+        search_text = self.search_input.text().strip()
+        if filtered and search_text and self.can_filter_in_memory() and self.table_proxy.search_text():
+            self.start_export(None, [], self.current_table_name, {'column_types': column_types},
+                              rows=self.get_filtered_rows(column_types))
+            return
+        
+        params = []
+        try:
+            if filtered and search_text:
+                query, params = self.db_handler.build_search_query(
+                    self.current_table_name, search_text, regex=self.is_regex_search())
+                if not query:
+                    QMessageBox.information(self, "Export", "The table has no searchable columns.")
+                    return
+            else:
+                query = self.db_handler.build_select_query(self.current_table_name)
+        except re.error as e:
+            QMessageBox.warning(self, "Export", f"Invalid regular expression:\n{str(e)}")
+            return
+        
+        self.start_export(query, params, self.current_table_name, {'column_types': column_types})
+
+    def get_filtered_rows(self, column_types):
+        """回傳 (欄位, 資料列)：記憶體過濾目前顯示的資料列，表格上的文字依欄位型別轉換"""
+        model = self.table_model
+        columns = [model.headerData(col, Qt.Horizontal) for col in range(model.columnCount())]
+        declared_types = [column_types.get(column) for column in columns]
+        rows = []
+        for source_row in self.table_proxy.accepted_source_rows():
+            values = self.table_proxy.row_values(source_row)
+            rows.append(tuple(coerce_value(value, declared_type)
+                              for value, declared_type in zip(values, declared_types)))
+        return columns, rows
+
+    def export_query_results(self):
+        """重新執行查詢頁的查詢，並將結果匯出到檔案"""
+        query = self.query_editor.toPlainText().strip()
+        if not query or not self.db_handler:
+            return
+        if not is_read_only_query(query):
+            QMessageBox.warning(self, "Export", "Only read-only queries (SELECT, WITH, ...) can be exported.")
+            return
+        self.start_export(query, [], "query")
+
+    def start_export(self, query, params, default_name, options=None, rows=None):
+        """選擇檔案後在背景執行緒中匯出查詢結果（或 rows 中的資料列），並顯示可取消的進度"""
+        if self.export_worker is not None:
+            QMessageBox.warning(self, "Export Running", "Please wait for the current export to finish.")
+            return
+        
+        export_formats = available_export_formats()
+        default_dir = os.path.dirname(self.current_db_path) if self.current_db_path else ""
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Export", os.path.join(default_dir, default_name), ";;".join(export_formats))
+        if not path:
+            return
+        extension, export_function = export_formats.get(selected_filter, next(iter(export_formats.values())))
+        if not os.path.splitext(path)[1]:
+            path += extension
+        
+        self.export_worker = ExportWorker(self.db_handler, query, params, path, export_function, options, rows)
+        self.export_worker.progress.connect(self.on_export_progress)
+        self.export_worker.export_failed.connect(self.on_export_failed)
+        self.export_worker.export_finished.connect(self.on_export_finished)
+        
+        # 總筆數未知，進度條只顯示已匯出的筆數
+        self.export_progress_dialog = QProgressDialog(f"Exporting to {os.path.basename(path)}...", "Cancel", 0, 0, self)
+        self.export_progress_dialog.setWindowTitle("Export")
+        self.export_progress_dialog.setMinimumDuration(0)
+        self.export_progress_dialog.canceled.connect(self.export_worker.cancel)
+        self.export_progress_dialog.show()
+        
+        self.start_background_worker(self.export_worker)
+
+    def dump_database(self):
+        """選擇表格與選項後，在背景執行緒中將資料庫 dump 為 SQL 檔案（可壓縮）
+
+        dump 在背景唯讀連接上讀取，未提交的變更不會被寫出。
+        """
+        if not self.db_handler or not self.db_handler.connection:
+            return
+        if self.export_worker is not None:
+            QMessageBox.warning(self, "Export Running", "Please wait for the current export to finish.")
+            return
+        
+        tables = list_dump_tables(self.db_handler.connection)
+        dialog = DumpDialog(self, tables)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        options = dialog.get_dump_options()
+        extension = dialog.get_extension()
+        
+        default_name = os.path.splitext(os.path.basename(self.current_db_path or "dump"))[0] + extension
+        default_dir = os.path.dirname(self.current_db_path) if self.current_db_path else ""
+        path, _ = QFileDialog.getSaveFileName(self, "Dump SQL", os.path.join(default_dir, default_name),
+                                              f"SQL dump (*{extension});;All files (*)")
+        if not path:
+            return
+        if not path.endswith(extension):
+            path += extension
+        
+        self.export_worker = DumpWorker(self.db_handler, path, options)
+        self.export_worker.table_progress.connect(self.on_dump_progress)
+        self.export_worker.export_failed.connect(self.on_export_failed)
+        self.export_worker.export_finished.connect(self.on_export_finished)
+        
+        table_count = len(options['tables']) if options['tables'] is not None else len(tables)
+        self.export_progress_dialog = QProgressDialog(f"Dumping to {os.path.basename(path)}...", "Cancel",
+                                                      0, table_count, self)
+        self.export_progress_dialog.setWindowTitle("Dump SQL")
+        self.export_progress_dialog.setMinimumDuration(0)
+        self.export_progress_dialog.canceled.connect(self.export_worker.cancel)
+        self.export_progress_dialog.show()
+        
+        self.start_background_worker(self.export_worker)
+
+    def on_dump_progress(self, index, table_name, rows):
+        if self.export_progress_dialog:
+            self.export_progress_dialog.setValue(index)
+            self.export_progress_dialog.setLabelText(
+                f"Dumping table {index + 1} of {self.export_progress_dialog.maximum()}: {table_name} ({rows:,} rows)...")
+
+    def on_export_progress(self, rows):
+        if self.export_progress_dialog:
+            self.export_progress_dialog.setLabelText(f"Exported {rows:,} rows...")
+
+    def on_export_failed(self, message):
+        QMessageBox.critical(self, "Export Failed", f"Failed to export:\n{message}")
+
+    def on_export_finished(self, total, cancelled):
+        """匯出結束（完成、取消或失敗）時關閉進度對話框"""
+        worker, self.export_worker = self.export_worker, None
+        if self.export_progress_dialog:
+            self.export_progress_dialog.canceled.disconnect()
+            self.export_progress_dialog.close()
+            self.export_progress_dialog = None
+        if cancelled:
+            self.status_bar.showMessage("Export cancelled", 5000)
+        elif worker and not worker.failed:
+            self.status_bar.showMessage(f"Exported {total:,} rows to {worker.path}", 10000)
+
+    def backup_database(self):
+        """以 SQLite 線上備份 API 在背景執行緒中複製資料庫，可選擇在完成後檢查備份的完整性
+
+        備份只包含已提交的資料；其他程式在備份期間寫入資料庫也能得到一致的副本。
+        """
+        if not self.db_handler or not self.db_handler.connection or not self.current_db_path:
+            return
+        if self.backup_worker is not None:
+            QMessageBox.warning(self, "Backup Running", "Please wait for the current backup to finish.")
+            return
+        
+        default_path = snapshot_path(self.current_db_path, os.path.dirname(self.current_db_path))
+        path, _ = QFileDialog.getSaveFileName(self, "Backup Database", default_path,
+                                              "SQLite databases (*.db *.sqlite *.sqlite3);;All files (*)")
+        if not path:
+            return
+        if os.path.abspath(path) == os.path.abspath(self.current_db_path):
+            QMessageBox.warning(self, "Backup", "The backup cannot replace the database itself.")
+            return
+        verify = QMessageBox.question(
+            self, "Backup", "Run PRAGMA integrity_check on the backup when it is finished?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes) == QMessageBox.Yes
+        
+        self.backup_worker = BackupWorker(self.current_db_path, path, verify)
+        self.backup_worker.progress.connect(self.on_backup_progress)
+        self.backup_worker.backup_failed.connect(self.on_backup_failed)
+        self.backup_worker.backup_finished.connect(self.on_backup_finished)
+        
+        self.backup_progress_dialog = QProgressDialog(f"Backing up to {os.path.basename(path)}...", "Cancel",
+                                                      0, 0, self)
+        self.backup_progress_dialog.setWindowTitle("Backup")
+        self.backup_progress_dialog.setMinimumDuration(0)
+        self.backup_progress_dialog.canceled.connect(self.backup_worker.cancel)
+        self.backup_progress_dialog.show()
+        
+        self.start_background_worker(self.backup_worker)
+
+    def on_backup_progress(self, copied, total):
+        if self.backup_progress_dialog:
+            self.backup_progress_dialog.setMaximum(total)
+            self.backup_progress_dialog.setValue(copied)
+            if copied == total and self.backup_worker and self.backup_worker.verify:
+                self.backup_progress_dialog.setLabelText("Checking the integrity of the backup...")
+            else:
+                self.backup_progress_dialog.setLabelText(f"Copied {copied:,} of {total:,} pages...")
+
+    def on_backup_failed(self, message):
+        QMessageBox.critical(self, "Backup Failed", f"Failed to back up the database:\n{message}")
+
+    def on_backup_finished(self, cancelled):
+        """備份結束時關閉進度對話框，並報告完整性檢查的結果"""
+        worker, self.backup_worker = self.backup_worker, None
+        if self.backup_progress_dialog:
+            self.backup_progress_dialog.canceled.disconnect()
+            self.backup_progress_dialog.close()
+            self.backup_progress_dialog = None
+        if cancelled:
+            self.status_bar.showMessage("Backup cancelled", 5000)
+            return
+        if worker is None or worker.failed:
+            return
+        
+        if worker.problems:
+            details = "\n".join(worker.problems[:20])
+            QMessageBox.warning(self, "Backup", f"The backup was written to {worker.target_path}, "
+                                f"but its integrity check reported problems:\n{details}")
+            return
+        checked = " (integrity check passed)" if worker.problems is not None else ""
+        self.status_bar.showMessage(f"Backed up {worker.page_count:,} pages to {worker.target_path}{checked}", 10000)
+
+    def analyze_database(self, tables=None):
+        """在背景的寫入連接上執行 ANALYZE，更新查詢規劃器的統計資料與索引節點的選擇性
+
+        未指定表格時先顯示 AnalyzeDialog 選擇表格與是否抽樣（PRAGMA analysis_limit）。
+        """
+        if not self.db_handler or not self.db_handler.connection:
+            return
+        if self.analyze_worker is not None:
+            QMessageBox.warning(self, "Analyze Running", "Please wait for the current analysis to finish.")
+            return
+        
+        analysis_limit = 0
+        if tables is None:
+            dialog = AnalyzeDialog(self, self.db_handler.list_tables())
+            if dialog.exec_() != QDialog.Accepted:
+                return
+            tables = dialog.get_selected_tables()
+            analysis_limit = dialog.get_analysis_limit()
+        
+        self.analyze_worker = AnalyzeWorker(self.db_handler, tables, analysis_limit)
+        self.analyze_worker.progress.connect(self.on_analyze_progress)
+        self.analyze_worker.analyze_failed.connect(self.on_analyze_failed)
+        self.analyze_worker.analyze_finished.connect(self.on_analyze_finished)
+        
+        self.analyze_progress_dialog = QProgressDialog("Analyzing...", "Cancel", 0, len(tables), self)
+        self.analyze_progress_dialog.setWindowTitle("Analyze")
+        self.analyze_progress_dialog.setMinimumDuration(0)
+        self.analyze_progress_dialog.canceled.connect(self.analyze_worker.cancel)
+        self.analyze_progress_dialog.show()
+        
+        self.start_background_worker(self.analyze_worker)
+
+    def on_analyze_progress(self, done, total, table_name):
+        if self.analyze_progress_dialog:
+            self.analyze_progress_dialog.setValue(done)
+            if table_name:
+                self.analyze_progress_dialog.setLabelText(f"Analyzing {table_name} ({done + 1} of {total})...")
+
+    def on_analyze_failed(self, message):
+        QMessageBox.critical(self, "Analyze Failed", f"Failed to analyze the database:\n{message}")
+
+    def on_analyze_finished(self, cancelled):
+        """分析結束時關閉進度對話框，並重建 schema 樹狀結構以顯示新的索引統計"""
+        worker, self.analyze_worker = self.analyze_worker, None
+        if self.analyze_progress_dialog:
+            self.analyze_progress_dialog.canceled.disconnect()
+            self.analyze_progress_dialog.close()
+            self.analyze_progress_dialog = None
+        if worker is None or worker.failed:
+            return
+        
+        # ANALYZE 只寫入 sqlite_stat1，已載入的資料不需要重新載入
+        self.reload_schema_trees()
+        if self.database_watcher:
+            self.database_watcher.sync()
+        if cancelled:
+            self.status_bar.showMessage(f"Analyze cancelled after {worker.analyzed} of {len(worker.tables)} tables", 5000)
+        else:
+            self.status_bar.showMessage(f"Analyzed {len(worker.tables)} tables", 5000)
+
+    def import_file(self):
+        """選擇 CSV/TSV 或 JSON Lines 檔案，設定目標表格與欄位後在背景執行緒中匯入"""
+        if not self.db_handler or not self.db_handler.connection:
+            return
+        if self.import_worker is not None:
+            QMessageBox.warning(self, "Import Running", "Please wait for the current import to finish.")
+            return
+        # 匯入使用另一條連接寫入，主連接不能有未完成的交易
+        if not self.resolve_pending_changes():
+            return
+        
+        default_dir = os.path.dirname(self.current_db_path) if self.current_db_path else ""
+        path, _ = QFileDialog.getOpenFileName(self, "Import", default_dir,
+                                              "Data files (*.csv *.tsv *.tab *.txt *.jsonl *.ndjson *.json);;All files (*)")
+        if not path:
+            return
+        
+        try:
+            tables = self.db_handler.list_tables()
+            dialog = ImportDialog(self, path, tables, self.get_table_column_types)
+        except Exception as e:
+            QMessageBox.critical(self, "Import Failed", f"Failed to read the file:\n{str(e)}")
+            return
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        
+        self.start_import(dialog.get_import_function(), dialog.get_import_options())
+
+    def get_table_column_types(self, table_name):
+        """取得表格的 [(欄位名稱, 宣告型別)]"""
+        return [(column_info[1], column_info[2]) for column_info in self.db_handler.get_table_schema(table_name)]
+
+    def start_import(self, import_function, options):
+        """在背景執行緒中執行匯入，並顯示可取消的進度（已匯入筆數與每秒筆數）"""
+        self.import_worker = ImportWorker(self.db_handler, import_function, options)
+        self.import_worker.progress.connect(self.on_import_progress)
+        self.import_worker.import_failed.connect(self.on_import_failed)
+        self.import_worker.import_finished.connect(self.on_import_finished)
+        
+        self.import_progress_dialog = QProgressDialog(
+            f"Importing {os.path.basename(options['path'])}...", "Cancel", 0, 0, self)
+        self.import_progress_dialog.setWindowTitle("Import")
+        self.import_progress_dialog.setWindowModality(Qt.WindowModal)
+        self.import_progress_dialog.setMinimumDuration(0)
+        self.import_progress_dialog.canceled.connect(self.import_worker.cancel)
+        self.import_progress_dialog.show()
+        
+        self.start_background_worker(self.import_worker)
+
+    def on_import_progress(self, rows, rate):
+        if self.import_progress_dialog:
+            self.import_progress_dialog.setLabelText(f"Imported {rows:,} rows ({rate:,.0f} rows/s)...")
+
+    def on_import_failed(self, message):
+        QMessageBox.critical(self, "Import Failed", f"Failed to import (no rows were imported):\n{message}")
+
+    def on_import_finished(self, total, cancelled):
+        """匯入結束時關閉進度對話框，並重新載入表格列表與目前的表格"""
+        worker, self.import_worker = self.import_worker, None
+        if self.import_progress_dialog:
+            self.import_progress_dialog.canceled.disconnect()
+            self.import_progress_dialog.close()
+            self.import_progress_dialog = None
+        if cancelled:
+            self.status_bar.showMessage("Import cancelled, no rows were imported", 5000)
+            return
+        if worker is None or worker.failed:
+            return
+        
+        table_name = worker.options['table_name']
+        self.status_bar.showMessage(f"Imported {total:,} rows into {table_name} ({worker.rate:,.0f} rows/s)", 10000)
+        self.load_tables()
+        if table_name == self.current_table_name:
+            self.load_table_data(table_name)
+        # 匯入經由另一條連接寫入，畫面已更新，不需要再由監看器通知
+        if self.database_watcher:
+            self.database_watcher.sync()
+
     def resizeEvent(self, event):
         """視窗大小改變時保存設置"""
         super().resizeEvent(event)
@@ -2480,8 +3688,19 @@ class MainWindow(QMainWindow):
         self.apply_column_visibility()
 
     def closeEvent(self, event):
+        # 未提交的變更在關閉前提交或放棄，使用者取消時保持視窗開啟
+        if not self.resolve_pending_changes():
+            event.ignore()
+            return
+        # 中斷所有背景工作並等待執行緒結束，避免執行緒在視窗關閉後仍使用連接
+        for worker in list(self.background_workers):
+            worker.cancel()
+        for worker in list(self.background_workers):
+            worker.wait()
         # 保存視窗設置
         self.save_window_geometry()
+        if self.database_watcher:
+            self.database_watcher.stop()
         # This will just hide the window, the main loop will show the connections dialog
         self.hide()
         event.accept()
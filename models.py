@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Table Models
+資料表格使用的 Qt 模型
+"""
+
+from PyQt5.QtCore import Qt, QSortFilterProxyModel, QModelIndex
+from PyQt5.QtGui import QColor
+from db_handler import SearchMatcher
+
+# 表格已完整載入且不超過此筆數時，搜尋直接在記憶體中過濾，不再回到 SQLite
+CLIENT_FILTER_MAX_ROWS = 200000
+
+# 資料列識別值（rowid 或主鍵 tuple）存放在每列第一欄項目的這個 role
+ROW_KEY_ROLE = Qt.UserRole + 1
+
+# 有未提交變更的資料列背景色（淡黃色 cornsilk）
+MODIFIED_ROW_COLOR = QColor(255, 248, 220)
+
+
+class TableFilterProxyModel(QSortFilterProxyModel):
+    """在記憶體中過濾已載入資料的代理模型
+
+    比對規則與 SQL 搜尋（build_search_query）相同，由 SearchMatcher 實作：
+    文字欄位預先串成一個小寫的搜尋字串，過濾時只需做子字串比對，數字與日期再比對少數幾個欄位，
+    因此每次按鍵都能立即更新，不需要延遲搜尋。
+    已標記刪除（尚未提交）的資料列也在這裡隱藏，不必從來源模型逐列移除；
+    有未提交變更的資料列背景色由 data() 依 change tracker 提供，不寫入每個儲存格。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._row_values = None  # 每一列的值（第一次過濾時才建立），之後隨來源模型更新
+        self._search_keys = None  # 每一列的搜尋字串，由 _key_matcher 計算
+        self._key_matcher = None
+        self._source_rows = None  # 建立模型時的原始資料列，可直接作為 _row_values
+        self._column_types = None  # {欄位: 宣告型別}，未設定時所有欄位都視為文字
+        self._search_text = ''
+        self._search_regex = False
+        self._matcher = None
+        self._hidden_rows = set()  # 標記刪除的來源資料列
+        self._change_tracker = None  # 提供 is_modified(來源列號)，決定背景色
+
+    def setSourceModel(self, model):
+        old_model = self.sourceModel()
+        if old_model is not None:
+            for signal, slot in self._source_connections():
+                try:
+                    getattr(old_model, signal).disconnect(slot)
+                except TypeError:
+                    pass
+
+        # 先連接自己的信號，確保搜尋字串在代理模型重新過濾前已更新
+        if model is not None:
+            for signal, slot in self._source_connections():
+                getattr(model, signal).connect(slot)
+
+        self._row_values = None
+        self._search_keys = None
+        self._source_rows = None
+        self._hidden_rows = set()
+        super().setSourceModel(model)
+        if model is old_model:
+            # 重新設定同一個模型時 Qt 不會重新過濾
+            self.invalidateFilter()
+
+    def set_source_rows(self, rows):
+        """提供建立來源模型時使用的原始資料列
+
+        過濾時直接使用這些 Python 值，不必逐格向模型讀取資料。
+        """
+        self._source_rows = rows
+        if self._matcher is not None:
+            self._row_values = None
+            self._search_keys = None
+            self.invalidateFilter()
+
+    def set_column_types(self, column_types):
+        """設定 {欄位名稱: 宣告型別}，數字與日期依此比對；不在其中的欄位不參與搜尋
+
+        None 表示沒有結構資訊（例如查詢結果），所有欄位都以文字比對。
+        """
+        self._column_types = column_types
+        self._matcher = None
+        self._search_text = ''
+
+    def _source_connections(self):
+        return (
+            ('rowsInserted', self._on_rows_inserted),
+            ('rowsRemoved', self._on_rows_removed),
+            ('dataChanged', self._on_data_changed),
+            ('modelReset', self._invalidate_search_keys),
+        )
+
+    def set_change_tracker(self, tracker):
+        """設定追蹤未提交變更的物件（需提供 is_modified(row)）"""
+        self._change_tracker = tracker
+        self.refresh_all_rows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.BackgroundRole and self._change_tracker is not None and index.isValid():
+            if self._change_tracker.is_modified(self.mapToSource(index).row()):
+                return MODIFIED_ROW_COLOR
+        return super().data(index, role)
+
+    def refresh_rows(self, source_rows):
+        """通知畫面重新取得指定來源資料列的背景色"""
+        model = self.sourceModel()
+        if model is None:
+            return
+        last_column = self.columnCount() - 1
+        for source_row in source_rows:
+            proxy_index = self.mapFromSource(model.index(source_row, 0))
+            if proxy_index.isValid():
+                row = proxy_index.row()
+                self.dataChanged.emit(self.index(row, 0), self.index(row, last_column), [Qt.BackgroundRole])
+
+    def refresh_all_rows(self):
+        """通知畫面重新取得所有資料列的背景色（只發出一次 dataChanged）"""
+        if self.rowCount() and self.columnCount():
+            self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1),
+                                  [Qt.BackgroundRole])
+
+    def hide_rows(self, rows):
+        """隱藏指定的來源資料列（標記刪除）"""
+        self._hidden_rows.update(rows)
+        self.invalidateFilter()
+
+    def show_rows(self, rows):
+        """取消隱藏指定的來源資料列"""
+        self._hidden_rows.difference_update(rows)
+        self.invalidateFilter()
+
+    def hidden_rows(self):
+        return set(self._hidden_rows)
+
+    def search_text(self):
+        return self._search_text
+
+    def search_columns(self):
+        """SearchMatcher 使用的 [(欄位名稱, 宣告型別)]，依來源模型的欄位順序"""
+        model = self.sourceModel()
+        if model is None:
+            return []
+        names = [model.headerData(col, Qt.Horizontal, Qt.DisplayRole) for col in range(model.columnCount())]
+        if self._column_types is None:
+            return [(name, 'TEXT') for name in names]
+        return [(name, self._column_types.get(name)) for name in names]
+
+    def set_search_text(self, text, regex=False):
+        """設定過濾文字；空字串表示顯示全部
+
+        比對規則與 SQL 搜尋相同（見 SearchMatcher）。
+        regex=True 時 text 視為正規表示式（不分大小寫），逐格比對；無效的表示式會拋出 re.error。
+        """
+        if text == self._search_text and regex == self._search_regex and (
+                not text or self._search_keys is not None):
+            return
+        matcher = SearchMatcher(self.search_columns(), text, regex) if text else None
+        self._search_text = text
+        self._search_regex = regex
+        self._matcher = matcher
+        if matcher is not None:
+            self.rebuild_search_keys()
+        self.invalidateFilter()
+
+    def rebuild_search_keys(self):
+        """必要時建立每一列的值，並以目前的 matcher 計算搜尋字串（規則相同時沿用）"""
+        model = self.sourceModel()
+        if model is None:
+            self._row_values = []
+            self._search_keys = []
+            return
+
+        if self._row_values is None:
+            rows, self._source_rows = self._source_rows, None
+            if rows is not None and len(rows) == model.rowCount():
+                self._row_values = list(rows)
+            else:
+                self._row_values = [self._model_row_values(model, row) for row in range(model.rowCount())]
+            self._search_keys = None
+
+        matcher = self._matcher
+        if self._search_keys is None or self._key_matcher.key_spec != matcher.key_spec:
+            self._search_keys = [matcher.text_key(values) for values in self._row_values]
+            self._key_matcher = matcher
+
+    def _model_row_values(self, model, row):
+        return tuple(model.data(model.index(row, col), Qt.DisplayRole) for col in range(model.columnCount()))
+
+    def _on_rows_inserted(self, parent, first, last):
+        if self._hidden_rows:
+            count = last - first + 1
+            self._hidden_rows = {row if row < first else row + count for row in self._hidden_rows}
+        if self._row_values is None:
+            self._source_rows = None
+            return
+        model = self.sourceModel()
+        values = [self._model_row_values(model, row) for row in range(first, last + 1)]
+        self._row_values[first:first] = values
+        if self._search_keys is not None:
+            self._search_keys[first:first] = [self._key_matcher.text_key(row_values) for row_values in values]
+
+    def _on_rows_removed(self, parent, first, last):
+        if self._hidden_rows:
+            count = last - first + 1
+            self._hidden_rows = {row if row < first else row - count
+                                 for row in self._hidden_rows if not first <= row <= last}
+        if self._row_values is None:
+            self._source_rows = None
+            return
+        del self._row_values[first:last + 1]
+        if self._search_keys is not None:
+            del self._search_keys[first:last + 1]
+
+    def _on_data_changed(self, top_left, bottom_right, roles=None):
+        if roles and Qt.DisplayRole not in roles and Qt.EditRole not in roles:
+            return
+        if self._row_values is None:
+            # 原始資料列已與模型不一致，之後改為向模型讀取
+            self._source_rows = None
+            return
+        model = self.sourceModel()
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            self._row_values[row] = self._model_row_values(model, row)
+            if self._search_keys is not None:
+                self._search_keys[row] = self._key_matcher.text_key(self._row_values[row])
+
+    def _invalidate_search_keys(self):
+        self._hidden_rows = set()
+        self._row_values = None
+        self._search_keys = None
+        self._source_rows = None
+        if self._matcher is not None:
+            self.rebuild_search_keys()
+
+    def accepted_source_rows(self):
+        """目前通過過濾的來源列號（依來源模型的順序）"""
+        return sorted(self.mapToSource(self.index(row, 0)).row() for row in range(self.rowCount()))
+
+    def row_values(self, source_row):
+        """來源資料列的值：未修改的列為讀取時的 Python 值，修改過的列為表格上的文字"""
+        if self._row_values is not None:
+            return self._row_values[source_row]
+        model = self.sourceModel()
+        if self._source_rows is not None and len(self._source_rows) == model.rowCount():
+            return tuple(self._source_rows[source_row])
+        return self._model_row_values(model, source_row)
+
+    def filterAcceptsRow(self, source_row, source_parent=QModelIndex()):
+        if source_row in self._hidden_rows:
+            return False
+        if self._matcher is None:
+            return True
+        if self._search_keys is None or source_row >= len(self._search_keys):
+            return True
+        return self._matcher.matches(self._row_values[source_row], self._search_keys[source_row])
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Schema Introspection
+以 pragma 表格值函式（pragma_table_xinfo 等）一次讀取整個資料庫的結構，回傳不可變的快照
+"""
+
+import sqlite3
+from dataclasses import dataclass
+from types import MappingProxyType
+
+
+@dataclass(frozen=True)
+class ColumnInfo:
+    """表格欄位（對應 PRAGMA table_xinfo 的一列）
+
+    hidden 為 0（一般欄位）、1（虛擬表格的隱藏欄位）、2 或 3（VIRTUAL/STORED 產生欄位）。
+    """
+    cid: int
+    name: str
+    type: str
+    notnull: bool
+    default: object
+    pk: int  # 在主鍵中的位置（從 1 開始），不是主鍵時為 0
+    hidden: int = 0
+
+
+@dataclass(frozen=True)
+class IndexColumn:
+    """索引欄位（對應 PRAGMA index_info 的一列）；運算式索引的欄位名稱為 None"""
+    seqno: int
+    cid: int
+    name: str
+
+
+@dataclass(frozen=True)
+class IndexInfo:
+    """索引（對應 PRAGMA index_list 的一列）
+
+    origin 為 'c'（CREATE INDEX）、'u'（UNIQUE 限制）或 'pk'（PRIMARY KEY 限制）。
+    """
+    name: str
+    unique: bool
+    origin: str
+    partial: bool
+    columns: tuple
+
+    @property
+    def primary(self):
+        return self.origin == 'pk'
+
+
+@dataclass(frozen=True)
+class ForeignKeyInfo:
+    """外鍵（PRAGMA foreign_key_list 中同一個 id 的各列合併為一個外鍵）"""
+    id: int
+    table: str  # 參照的表格
+    from_columns: tuple
+    to_columns: tuple  # 參照主鍵時為 (None, ...)
+    on_update: str
+    on_delete: str
+    match: str
+
+
+@dataclass(frozen=True)
+class TableInfo:
+    """表格或檢視的結構"""
+    name: str
+    type: str  # 'table' 或 'view'
+    sql: str
+    columns: tuple
+    indexes: tuple = ()
+    foreign_keys: tuple = ()
+
+    @property
+    def table_info(self):
+        """與 PRAGMA table_info 相同的欄位列表（不含隱藏欄位與產生欄位）"""
+        return tuple(column for column in self.columns if column.hidden == 0)
+
+    @property
+    def select_columns(self):
+        """SELECT * 回傳的欄位（包含產生欄位，不含虛擬表格的隱藏欄位）"""
+        return tuple(column for column in self.columns if column.hidden != 1)
+
+    @property
+    def column_types(self):
+        """{欄位名稱: 宣告型別}（SELECT * 回傳的欄位）"""
+        return {column.name: column.type for column in self.select_columns}
+
+
+@dataclass(frozen=True)
+class SchemaSnapshot:
+    """整個資料庫結構的快照；tables 依建立順序排列，表格名稱的比對不分大小寫（與 SQLite 相同）"""
+    tables: MappingProxyType
+    schema_version: int
+
+    def table(self, name):
+        """取得表格的 TableInfo，不存在時回傳 None"""
+        info = self.tables.get(name)
+        if info is None:
+            info = next((table for table_name, table in self.tables.items()
+                         if table_name.lower() == name.lower()), None)
+        return info
+
+    def table_names(self, object_type='table'):
+        return [name for name, info in self.tables.items() if info.type == object_type]
+
+
+# 所有表格與檢視的欄位
+_COLUMNS_QUERY = """
+    SELECT m.name, p.cid, p.name, p.type, p."notnull", p.dflt_value, p.pk, p.hidden
+    FROM sqlite_master AS m JOIN pragma_table_xinfo(m.name, 'main') AS p
+    WHERE m.type IN ('table', 'view')
+    ORDER BY m.rowid, p.cid
+"""
+
+# 所有索引與索引欄位（LEFT JOIN 保留沒有欄位資訊的索引）
+_INDEXES_QUERY = """
+    SELECT m.name, il.name, il."unique", il.origin, il.partial, ii.seqno, ii.cid, ii.name
+    FROM sqlite_master AS m
+        JOIN pragma_index_list(m.name, 'main') AS il
+        LEFT JOIN pragma_index_info(il.name, 'main') AS ii
+    WHERE m.type = 'table'
+    ORDER BY m.rowid, il.seq, ii.seqno
+"""
+
+# 所有外鍵
+_FOREIGN_KEYS_QUERY = """
+    SELECT m.name, fk.id, fk."table", fk."from", fk."to", fk.on_update, fk.on_delete, fk."match"
+    FROM sqlite_master AS m JOIN pragma_foreign_key_list(m.name, 'main') AS fk
+    WHERE m.type = 'table'
+    ORDER BY m.rowid, fk.id, fk.seq
+"""
+
+
+def _run_for_tables(connection, query, table_names):
+    """執行整個資料庫的 pragma 查詢；若有表格無法讀取（例如虛擬表格的模組未載入、
+    檢視參照不存在的表格）整個查詢會失敗，此時改為逐一表格查詢並略過失敗的表格"""
+    try:
+        return connection.execute(query).fetchall()
+    except sqlite3.Error:
+        pass
+    per_table_query = query.replace("WHERE m.type", "WHERE m.name = ? AND m.type")
+    rows = []
+    for table_name in table_names:
+        try:
+            rows.extend(connection.execute(per_table_query, (table_name,)).fetchall())
+        except sqlite3.Error:
+            continue
+    return rows
+
+
+def _group_rows(rows):
+    """依第一欄（表格名稱）分組，其餘欄位保持原本的順序"""
+    groups = {}
+    for row in rows:
+        groups.setdefault(row[0], []).append(row[1:])
+    return groups
+
+
+def read_schema_snapshot(connection):
+    """以少數幾個查詢讀取 main 資料庫所有表格、檢視的欄位（含產生欄位）、索引、索引欄位與外鍵，回傳 SchemaSnapshot
+
+    查詢在同一個讀取交易中執行（連接已在交易中時沿用該交易），結果是一致的快照。
+    """
+    own_transaction = not connection.in_transaction
+    if own_transaction:
+        connection.execute("BEGIN")
+    try:
+        schema_version = connection.execute("PRAGMA schema_version").fetchone()[0]
+        objects = connection.execute(
+            "SELECT name, type, sql FROM sqlite_master WHERE type IN ('table', 'view') ORDER BY rowid").fetchall()
+        table_names = [name for name, _, _ in objects]
+        columns = _group_rows(_run_for_tables(connection, _COLUMNS_QUERY, table_names))
+        index_rows = _group_rows(_run_for_tables(connection, _INDEXES_QUERY, table_names))
+        foreign_key_rows = _group_rows(_run_for_tables(connection, _FOREIGN_KEYS_QUERY, table_names))
+    finally:
+        if own_transaction:
+            connection.rollback()
+
+    tables = {}
+    for name, object_type, sql in objects:
+        indexes = {}
+        for index_name, unique, origin, partial, seqno, cid, column_name in index_rows.get(name, ()):
+            index = indexes.setdefault(index_name, (bool(unique), origin, bool(partial), []))
+            if seqno is not None:
+                index[3].append(IndexColumn(seqno, cid, column_name))
+        foreign_keys = {}
+        for key_id, table, from_column, to_column, on_update, on_delete, match in foreign_key_rows.get(name, ()):
+            key = foreign_keys.setdefault(key_id, (table, [], [], on_update, on_delete, match))
+            key[1].append(from_column)
+            key[2].append(to_column)
+
+        tables[name] = TableInfo(
+            name=name,
+            type=object_type,
+            sql=sql,
+            columns=tuple(ColumnInfo(cid, column_name, column_type or "", bool(notnull), default, pk, hidden)
+                          for cid, column_name, column_type, notnull, default, pk, hidden in columns.get(name, ())),
+            indexes=tuple(IndexInfo(index_name, unique, origin, partial, tuple(index_columns))
+                          for index_name, (unique, origin, partial, index_columns) in indexes.items()),
+            foreign_keys=tuple(ForeignKeyInfo(key_id, table, tuple(from_columns), tuple(to_columns),
+                                              on_update, on_delete, match)
+                               for key_id, (table, from_columns, to_columns, on_update, on_delete, match)
+                               in foreign_keys.items()),
+        )
+    return SchemaSnapshot(MappingProxyType(tables), schema_version)
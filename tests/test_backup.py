@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Backup Test Suite
+測試備份模組的功能
+"""
+
+import unittest
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+
+# 添加上一層目錄到 Python 路徑，以便能正確導入 backup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backup import BackupCancelled, backup_database, main
+
+
+class TestBackup(unittest.TestCase):
+    """測試線上備份"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source_path = os.path.join(self.temp_dir.name, 'source.db')
+        self.target_path = os.path.join(self.temp_dir.name, 'backup.db')
+        self.connection = sqlite3.connect(self.source_path)
+        self.connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, data BLOB)")
+        self.connection.executemany("INSERT INTO items (data) VALUES (?)", [(bytes(200),) for _ in range(2000)])
+        self.connection.commit()
+
+    def tearDown(self):
+        """清理測試環境"""
+        self.connection.close()
+        self.temp_dir.cleanup()
+
+    def count_rows(self, path):
+        connection = sqlite3.connect(path)
+        try:
+            return connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        finally:
+            connection.close()
+
+    def test_backup_with_concurrent_writes(self):
+        """測試分段複製期間其他連接寫入時，備份仍是一致且包含新資料的快照"""
+        progress = []
+
+        def on_progress(copied, total):
+            if not progress:
+                # 在兩步之間寫入來源資料庫
+                self.connection.execute("INSERT INTO items (data) VALUES (x'01')")
+                self.connection.commit()
+            progress.append((copied, total))
+
+        page_count, problems = backup_database(self.source_path, self.target_path, pages=10,
+                                               progress_callback=on_progress, verify=True)
+
+        self.assertEqual(problems, [])
+        self.assertEqual(progress[-1], (page_count, page_count))
+        self.assertGreater(len(progress), 2)
+        self.assertEqual(self.count_rows(self.target_path), 2001)
+
+    def test_backup_finishes_under_constant_writes(self):
+        """測試來源在每一步之間都被寫入時，重新開始數次後改為一步完成，不會一直重來"""
+        progress = []
+
+        def on_progress(copied, total):
+            progress.append((copied, total))
+            self.connection.execute("INSERT INTO items (data) VALUES (x'01')")
+            self.connection.commit()
+
+        page_count, problems = backup_database(self.source_path, self.target_path, pages=10,
+                                               progress_callback=on_progress, verify=True, max_restarts=2)
+
+        self.assertEqual(problems, [])
+        self.assertEqual(progress[-1], (page_count, page_count))
+        self.assertLess(len(progress), 20)
+        self.assertGreater(self.count_rows(self.target_path), 2000)
+
+    def test_cancel_keeps_existing_backup(self):
+        """測試取消時刪除暫存檔，不覆蓋原有的備份"""
+        backup_database(self.source_path, self.target_path)
+        self.connection.execute("DELETE FROM items")
+        self.connection.commit()
+
+        with self.assertRaises(BackupCancelled):
+            backup_database(self.source_path, self.target_path, pages=1, progress_callback=lambda copied, total: True)
+
+        self.assertEqual(self.count_rows(self.target_path), 2000)
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)), ['backup.db', 'source.db'])
+
+    def test_command_line_snapshot(self):
+        """測試命令列備份到目錄時產生帶有時間戳記的檔案"""
+        snapshots = os.path.join(self.temp_dir.name, 'snapshots')
+        os.mkdir(snapshots)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertEqual(main([self.source_path, snapshots, '--check', '--quiet']), 0)
+
+        self.assertIn("Integrity check passed", output.getvalue())
+        [snapshot] = os.listdir(snapshots)
+        self.assertRegex(snapshot, r'^source-\d{8}-\d{6}\.db$')
+        self.assertEqual(self.count_rows(os.path.join(snapshots, snapshot)), 2000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Edit Session Changes Test Suite
+測試變更記錄模組的功能
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import sqlite3
+
+# 添加上一層目錄到 Python 路徑，以便能正確導入 changes
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from db_handler import DBHandler
+from changes import (ChangeTracker, EditJournal, find_conflicts, overwrite_values, rebase_changes, resolve_conflicts,
+                     KEEP_THEIRS, OVERWRITE, coerce_pasted_rows, detect_header, map_pasted_columns, parse_pasted_text)
+
+
+class TestEditJournal(unittest.TestCase):
+    """測試 EditJournal 類別"""
+
+    def test_undo_redo_order(self):
+        """測試復原與重做依後進先出的順序"""
+        journal = EditJournal()
+        journal.record({'kind': 'update', 'row': 0})
+        journal.record({'kind': 'update', 'row': 1})
+
+        self.assertEqual(journal.undo()['row'], 1)
+        self.assertEqual(journal.undo()['row'], 0)
+        self.assertIsNone(journal.undo())
+        self.assertTrue(journal.can_redo())
+
+        self.assertEqual(journal.redo()['row'], 0)
+        self.assertEqual(len(journal), 1)
+
+    def test_record_clears_redo(self):
+        """測試新的操作會清除重做記錄"""
+        journal = EditJournal()
+        journal.record({'kind': 'insert', 'row': 5})
+        journal.undo()
+        journal.record({'kind': 'delete', 'rows': [1]})
+
+        self.assertFalse(journal.can_redo())
+        self.assertEqual(journal.peek_undo()['kind'], 'delete')
+
+        journal.discard_last()
+        self.assertFalse(journal.can_undo())
+
+
+class TestCommitConflicts(unittest.TestCase):
+    """測試提交時的衝突檢查"""
+
+    def setUp(self):
+        self.changes = [
+            {'action': 'update', 'key': (1,), 'values': {'name': 'mine'},
+             'row_values': {'name': 'mine', 'email': 'a@x'}, 'original': {'name': 'a', 'email': 'a@x'}},
+            {'action': 'update', 'key': (2,), 'values': {'name': 'mine'},
+             'row_values': {'name': 'mine', 'email': 'b@x'}, 'original': {'name': 'b', 'email': 'b@x'}},
+            {'action': 'delete', 'keys': [(3,), (4,)],
+             'originals': {(3,): {'name': 'c', 'email': 'c@x'}, (4,): {'name': 'd', 'email': 'd@x'}}},
+        ]
+
+    def test_find_conflicts(self):
+        """測試找出被其他連線修改或刪除的資料列"""
+        current_rows = {
+            (1,): {'name': 'a', 'email': 'new@x'},   # 其他欄位被修改
+            (3,): {'name': 'c', 'email': 'c@x'},     # 未變更
+            (4,): {'name': 'theirs', 'email': 'd@x'},
+        }
+        conflicts = find_conflicts(self.changes, current_rows)
+        summary = [(c['action'], c['key'], c['their_columns'], c['overlap']) for c in conflicts]
+        self.assertEqual(summary, [
+            ('update', (1,), ['email'], False),
+            ('update', (2,), [], False),
+            ('delete', (4,), ['name'], False),
+        ])
+        self.assertIsNone(conflicts[1]['current'])
+
+    def test_resolve_conflicts(self):
+        """測試依處理方式調整要提交的變更"""
+        current_rows = {(1,): {'name': 'a', 'email': 'new@x'}, (4,): {'name': 'theirs', 'email': 'd@x'}}
+        conflicts = find_conflicts(self.changes, current_rows)
+
+        merged = resolve_conflicts(self.changes, conflicts, {(4,): KEEP_THEIRS})
+        self.assertEqual([(c['action'], c.get('key'), c.get('keys')) for c in merged],
+                         [('update', (1,), None), ('delete', None, [(3,)])])
+        self.assertEqual(merged[0]['values'], {'name': 'mine'})
+
+        overwritten = resolve_conflicts(self.changes, conflicts, {(1,): OVERWRITE})
+        self.assertEqual(overwritten[0]['values'], {'name': 'mine', 'email': 'a@x'})
+        self.assertEqual(overwritten[1]['keys'], [(3,), (4,)])
+
+    def test_overwrite_keeps_value_types(self):
+        """測試 OVERWRITE 寫回未修改欄位的原始值：NULL 仍為 NULL、BLOB 仍為 BLOB，修改的文字依型別轉換"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, 'overwrite.db')
+            setup = sqlite3.connect(db_path)
+            setup.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, note TEXT, data BLOB, qty INTEGER)")
+            setup.execute("INSERT INTO items VALUES (1, 'a', NULL, ?, 1)", (b'\x01\x02',))
+            setup.commit()
+            setup.close()
+            db_handler = DBHandler(db_path)
+            connection = db_handler.connection
+            original = {'id': 1, 'name': 'a', 'note': None, 'data': b'\x01\x02', 'qty': 1}
+            column_types = db_handler.get_column_types('items')
+
+            values = {'name': 'mine', 'qty': '5'}
+            changes = [{'action': 'update', 'key': (1,), 'values': values, 'original': original,
+                        'row_values': overwrite_values(original, values, column_types)}]
+            connection.execute("UPDATE items SET qty = 2 WHERE id = 1")
+            connection.commit()
+
+            current_rows = db_handler.fetch_rows_by_keys('items', ['rowid'], [(1,)])
+            conflicts = find_conflicts(changes, current_rows)
+            self.assertEqual(conflicts[0]['their_columns'], ['qty'])
+            resolved = resolve_conflicts(changes, conflicts, {(1,): OVERWRITE})
+            db_handler.apply_changes('items', ['rowid'], resolved)
+
+            row = connection.execute("SELECT name, note, data, qty FROM items WHERE id = 1").fetchone()
+            self.assertEqual(row, ('mine', None, b'\x01\x02', 5))
+            db_handler.disconnect_database()
+
+    def test_rebase_changes(self):
+        """測試處理衝突後以重新讀取的資料列為快照，只有之後的新修改才算衝突"""
+        current_rows = {(1,): {'name': 'a', 'email': 'new@x'}, (4,): {'name': 'theirs', 'email': 'd@x'}}
+        conflicts = find_conflicts(self.changes, current_rows)
+        changes = rebase_changes(resolve_conflicts(self.changes, conflicts, {}), current_rows)
+        self.assertEqual(changes[0]['original'], {'name': 'a', 'email': 'new@x'})
+        self.assertEqual(find_conflicts(changes, current_rows), [])
+
+        current_rows[(4,)] = {'name': 'again', 'email': 'd@x'}
+        self.assertEqual([(c['key'], c['their_columns']) for c in find_conflicts(changes, current_rows)],
+                         [((4,), ['name'])])
+
+
+class TestChangeTracker(unittest.TestCase):
+    """測試 ChangeTracker 類別"""
+
+    def test_only_dirty_cells_are_kept(self):
+        """測試只記錄被修改的儲存格，改回原始值時取消變更"""
+        tracker = ChangeTracker()
+        tracker.set_cell(0, (1,), 'name', 'new', 'old')
+        tracker.set_cell(0, (1,), 'email', 'a@x', 'a@x')
+        self.assertEqual(tracker.dirty_cells(0), {'name': 'new'})
+        self.assertEqual(tracker.cell_value(0, 'name', 'old'), 'new')
+        self.assertEqual(tracker.cell_value(0, 'email', 'a@x'), 'a@x')
+
+        tracker.set_cell(0, (1,), 'name', 'old', 'old')
+        self.assertFalse(tracker.is_dirty(0))
+        self.assertFalse(tracker.has_changes())
+
+    def test_to_changes(self):
+        """測試轉換為變更列表"""
+        tracker = ChangeTracker()
+        tracker.set_cell(2, (3,), 'name', 'x', 'c')
+        tracker.mark_inserted(5, {'name': 'new'})
+        tracker.mark_deleted({0: (1,), 1: (2,)})
+
+        self.assertEqual(len(tracker), 4)
+        self.assertEqual(tracker.to_changes(), [
+            {'action': 'insert', 'row': 5, 'data': {'name': 'new'}},
+            {'action': 'update', 'row': 2, 'key': (3,), 'values': {'name': 'x'}},
+            {'action': 'delete', 'rows': [0, 1], 'keys': [(1,), (2,)]},
+        ])
+
+    def test_take_and_restore_rows(self):
+        """測試刪除資料列時取出其變更，復原時放回"""
+        tracker = ChangeTracker()
+        tracker.set_cell(2, (3,), 'name', 'x', 'c')
+        tracker.mark_inserted(5, {'name': 'new'})
+
+        state = tracker.take_rows([2, 5])
+        self.assertFalse(tracker.has_changes())
+
+        tracker.restore_rows(state)
+        self.assertEqual(tracker.dirty_cells(2), {'name': 'x'})
+        self.assertTrue(tracker.is_inserted(5))
+
+
+class TestPastedRows(unittest.TestCase):
+    """測試剪貼簿資料的解析、欄位對應與型別轉換"""
+
+    def test_parse_pasted_text(self):
+        """測試 TSV 與 CSV（含引號內的換行）"""
+        self.assertEqual(parse_pasted_text("a\tb, c\n1\t2\n\n"), [['a', 'b, c'], ['1', '2']])
+        self.assertEqual(parse_pasted_text('x,"multi\nline"\r\n'), [['x', 'multi\nline']])
+        self.assertEqual(parse_pasted_text(''), [])
+
+    def test_map_and_coerce(self):
+        """測試依標題列對應欄位，並依型別親和性轉換"""
+        columns = ['id', 'name', 'amount']
+        column_types = {'id': 'INTEGER', 'name': 'TEXT', 'amount': 'REAL'}
+        rows = [['Amount', 'Name', 'extra'], ['1', '007', 'x'], ['n/a', 'b', 'y'], ['2']]
+        self.assertTrue(detect_header(rows[:1] + [['1']], columns + ['extra']))
+        self.assertFalse(detect_header(rows, columns))
+
+        targets, data = map_pasted_columns(rows, columns, has_header=True)
+        self.assertEqual(targets, ['amount', 'name', None])
+        values_rows, mismatches = coerce_pasted_rows(data, targets, column_types)
+        self.assertEqual(values_rows, [{'amount': 1.0, 'name': '007'}, {'amount': 'n/a', 'name': 'b'}, {'amount': 2.0}])
+        self.assertEqual(mismatches, [(1, 'amount')])
+
+        targets, data = map_pasted_columns([['5', 'e']], ['name', 'amount'])
+        self.assertEqual(targets, ['name', 'amount'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,7 +13,9 @@ import sqlite3
 # 添加上一層目錄到 Python 路徑，以便能正確導入 db_handler
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from db_handler import DBHandler
+from db_handler import (DBHandler, classify_search_text, is_read_only_query, coerce_value, plan_changes, CommitCancelled,
+                        AnalyzeCancelled, analyze_tables, parse_index_stat, plan_row_count, key_chunk_size,
+                        DELETE_CHUNK_SIZE)
 
 class TestDBHandler(unittest.TestCase):
     """測試 DBHandler 類別"""
@@ -86,10 +88,11 @@ class TestDBHandler(unittest.TestCase):
         cursor = conn.cursor()
 
         # 創建帶索引的表格
-        cursor.execute("CREATE TABLE indexed_table (id INTEGER PRIMARY KEY, name TEXT UNIQUE, email TEXT)")
+        # INTEGER PRIMARY KEY 是 rowid 的別名，沒有索引；以文字主鍵產生主鍵索引
+        cursor.execute("CREATE TABLE indexed_table (code TEXT PRIMARY KEY, name TEXT UNIQUE, email TEXT)")
         cursor.execute("CREATE INDEX idx_email ON indexed_table(email)")
-        cursor.execute("INSERT INTO indexed_table (name, email) VALUES ('test1', 'test1@example.com')")
-        cursor.execute("INSERT INTO indexed_table (name, email) VALUES ('test2', 'test2@example.com')")
+        cursor.execute("INSERT INTO indexed_table VALUES ('a', 'test1', 'test1@example.com')")
+        cursor.execute("INSERT INTO indexed_table VALUES ('b', 'test2', 'test2@example.com')")
         conn.commit()
         conn.close()
 
@@ -122,6 +125,8 @@ class TestDBHandler(unittest.TestCase):
         self.assertIsNotNone(email_index)
         self.assertEqual(len(email_index['columns']), 1)
         self.assertEqual(email_index['columns'][0]['name'], 'email')
+        self.assertFalse(email_index['primary'])
+        self.assertEqual([idx['columns'][0]['name'] for idx in primary_indexes], ['code'])
 
     def test_execute_query(self):
         """測試執行 SQL 查詢"""
@@ -138,5 +143,307 @@ class TestDBHandler(unittest.TestCase):
         data, _ = self.db_handler.get_table_data('test_table')
         self.assertEqual(len(data), 3)
 
+    def test_build_search_query(self):
+        """測試建立搜尋查詢"""
+        query, params = self.db_handler.build_search_query('test_table', 'test')
+        self.assertIn('LIKE', query)
+        self.assertEqual(params, ['%test%'])
+
+        cursor = self.db_handler.connection.cursor()
+        cursor.execute(query, params)
+        self.assertEqual(len(cursor.fetchall()), 2)
+
+    def test_build_typed_search_query(self):
+        """測試數字與日期搜尋會加入型別比對條件，有索引的條件可使用索引且結果最先回傳"""
+        conn = sqlite3.connect(self.temp_db_path)
+        cursor = conn.cursor()
+        cursor.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, amount INTEGER, created_at INTEGER, shipped DATE, note TEXT)")
+        cursor.execute("CREATE INDEX idx_amount ON orders(amount)")
+        cursor.executemany("INSERT INTO orders VALUES (?, ?, ?, ?, ?)",
+                           [(i + 100, i % 1000 + 100, 1600000000 + i, '2023-12-31', "plain") for i in range(2000)])
+        cursor.execute("INSERT INTO orders VALUES (5000, 42, 1704412800, '2024-01-05', 'first')")
+        cursor.execute("INSERT INTO orders VALUES (5001, 7, 1704499200, '2024-01-06', 'order 42')")
+        cursor.execute("INSERT INTO orders VALUES (42, 7, 1704499200, '2024-01-06', 'second')")
+        cursor.execute("ANALYZE")
+        conn.commit()
+        conn.close()
+
+        query, params = self.db_handler.build_search_query('orders', '42')
+        cursor = self.db_handler.connection.cursor()
+        plan = [row[3] for row in cursor.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()]
+        self.assertTrue(any('idx_amount' in detail for detail in plan), plan)
+        self.assertTrue(any('INTEGER PRIMARY KEY' in detail for detail in plan), plan)
+        # 索引查詢的結果先回傳，之後才是 LIKE 掃描的結果，且不重複
+        ids = [row[0] for row in cursor.execute(query, params).fetchall()]
+        self.assertEqual(sorted(ids[:2]), [42, 5000])
+        self.assertEqual(ids[2:], [5001])
+
+        # 日期同時比對 epoch 整數欄位與文字日期欄位
+        query, params = self.db_handler.build_search_query('orders', '2024-01-05')
+        ids = [row[0] for row in cursor.execute(query, params).fetchall()]
+        self.assertEqual(ids, [5000])
+        self.assertIn(1704412800, params)
+        self.assertIn('2024-01-05', params)
+
+    def test_classify_search_text(self):
+        """測試搜尋文字的分類"""
+        self.assertEqual(classify_search_text('42')['kind'], 'integer')
+        self.assertEqual(classify_search_text('3.5')['kind'], 'real')
+        self.assertEqual(classify_search_text('2024-01-05')['kind'], 'date')
+        self.assertEqual(classify_search_text('2024-01-05')['text_range'], ('2024-01-05', '2024-01-06'))
+        self.assertEqual(classify_search_text('alice')['kind'], 'text')
+
+    def test_regexp_function(self):
+        """測試 REGEXP 使用者函式與正規表示式搜尋"""
+        cursor = self.db_handler.connection.cursor()
+        cursor.execute("SELECT name FROM test_table WHERE name REGEXP '2$'")
+        self.assertEqual(cursor.fetchall(), [('test2',)])
+
+        query, params = self.db_handler.build_search_query('test_table', '^TEST1$', regex=True)
+        self.assertIn('REGEXP', query)
+        rows = cursor.execute(query, params).fetchall()
+        self.assertEqual(rows, [(1, 'test1')])
+
+        reader = self.db_handler.open_reader_connection()
+        try:
+            self.assertEqual(reader.execute("SELECT 'abc' REGEXP 'b'").fetchone(), (1,))
+        finally:
+            reader.close()
+
+    def test_is_read_only_query(self):
+        """測試判斷唯讀查詢"""
+        self.assertTrue(is_read_only_query("SELECT * FROM test_table"))
+        self.assertTrue(is_read_only_query("-- comment\nWITH t AS (SELECT 1) SELECT * FROM t"))
+        self.assertFalse(is_read_only_query("DELETE FROM test_table"))
+        self.assertFalse(is_read_only_query("   "))
+
+        # WITH 依 CTE 列表之後的語句判斷
+        self.assertTrue(is_read_only_query(
+            "WITH RECURSIVE t(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM t WHERE n < 3), "
+            "delete_me AS MATERIALIZED (SELECT ')' AS x) SELECT * FROM t"))
+        self.assertFalse(is_read_only_query(
+            "WITH old AS (SELECT id FROM test_table /* ) */ WHERE name = 'a)') DELETE FROM test_table WHERE id IN old"))
+        self.assertFalse(is_read_only_query("with t as (select 1) update test_table set name = 'x'"))
+        self.assertFalse(is_read_only_query('WITH "select" AS (SELECT 1) INSERT INTO test_table (name) SELECT * FROM "select"'))
+
+    def test_open_reader_connection(self):
+        """測試開啟唯讀連接"""
+        reader = self.db_handler.open_reader_connection()
+        try:
+            rows = reader.execute("SELECT name FROM test_table ORDER BY id").fetchall()
+            self.assertEqual(rows, [('test1',), ('test2',)])
+            with self.assertRaises(sqlite3.OperationalError):
+                reader.execute("INSERT INTO test_table (name) VALUES ('x')")
+        finally:
+            reader.close()
+
+    def test_get_row_key_columns(self):
+        """測試取得資料列識別欄位"""
+        self.db_handler.connect_to_database(self.temp_db_path)
+        cursor = self.db_handler.connection.cursor()
+        cursor.execute("CREATE TABLE kv (k TEXT, n INTEGER, v TEXT, PRIMARY KEY (k, n)) WITHOUT ROWID")
+        cursor.execute("CREATE TABLE shadow (rowid TEXT, name TEXT)")
+        self.db_handler.connection.commit()
+
+        self.assertEqual(self.db_handler.get_row_key_columns("test_table"), ["rowid"])
+        self.assertEqual(self.db_handler.get_row_key_columns("kv"), ["k", "n"])
+        self.assertEqual(self.db_handler.get_row_key_columns("shadow"), ["_rowid_"])
+
+    def test_update_and_delete_duplicate_rows(self):
+        """測試以 rowid 更新和刪除內容完全相同的資料列"""
+        self.db_handler.connect_to_database(self.temp_db_path)
+        cursor = self.db_handler.connection.cursor()
+        cursor.execute("CREATE TABLE dup (name TEXT, amount INTEGER)")
+        cursor.executemany("INSERT INTO dup VALUES (?, ?)", [("same", 1), ("same", 1), ("same", 1)])
+
+        key_columns = self.db_handler.get_row_key_columns("dup")
+        self.db_handler.update_row(cursor, "dup", key_columns, (2,), {"amount": "5"})
+        self.db_handler.delete_row(cursor, "dup", key_columns, (3,))
+        self.db_handler.connection.commit()
+
+        rows = cursor.execute("SELECT rowid, name, amount FROM dup ORDER BY rowid").fetchall()
+        self.assertEqual(rows, [(1, "same", 1), (2, "same", 5)])
+
+    def test_coerce_value(self):
+        """測試依欄位型別親和性轉換輸入值"""
+        self.assertEqual(coerce_value("42", "INTEGER"), 42)
+        self.assertEqual(coerce_value("1.5", "REAL"), 1.5)
+        self.assertEqual(coerce_value("007", "TEXT"), "007")
+        self.assertIsNone(coerce_value("", "INTEGER"))
+        self.assertEqual(coerce_value("", "TEXT"), "")
+        self.assertEqual(coerce_value("abc", "INTEGER"), "abc")
+
+    def test_plan_changes(self):
+        """測試依語句形狀分組變更"""
+        changes = [
+            {'action': 'insert', 'values': {'name': 'a'}},
+            {'action': 'update', 'key': (1,), 'values': {'name': 'x'}},
+            {'action': 'delete', 'key': (2,)},
+            {'action': 'update', 'key': (3,), 'values': {'name': 'y'}},
+            {'action': 'update', 'key': (4,), 'values': {'name': 'z', 'id': '9'}},
+        ]
+        plan = plan_changes(changes)
+        self.assertEqual([(action, columns, len(group)) for action, columns, group in plan], [
+            ('delete', (), 1),
+            ('update', ('name',), 2),
+            ('update', ('name', 'id'), 1),
+            ('insert', ('name',), 1),
+        ])
+        self.assertEqual(plan_row_count(plan), 5)
+
+        # 進度以資料列計算：一筆刪除變更包含 50,000 列
+        bulk_delete = [{'action': 'delete', 'keys': [(i,) for i in range(50000)]}]
+        self.assertEqual(plan_row_count(plan_changes(bulk_delete + changes[:1])), 50001)
+
+    def test_key_chunk_size(self):
+        """測試複合主鍵的每段資料列數使綁定的參數不超過上限"""
+        self.assertEqual(key_chunk_size(["rowid"]), DELETE_CHUNK_SIZE)
+        for key_columns in (["a", "b"], ["a", "b", "c"]):
+            self.assertLessEqual(key_chunk_size(key_columns) * len(key_columns), DELETE_CHUNK_SIZE)
+
+    def test_apply_changes(self):
+        """測試在單一交易中批次套用變更"""
+        self.db_handler.connect_to_database(self.temp_db_path)
+        key_columns = self.db_handler.get_row_key_columns("test_table")
+        changes = [{'action': 'update', 'key': (1,), 'values': {'name': 'renamed'}},
+                   {'action': 'delete', 'key': (2,)}]
+        changes += [{'action': 'insert', 'values': {'id': str(i), 'name': f'n{i}'}} for i in range(3, 103)]
+
+        progress = []
+        applied = self.db_handler.apply_changes("test_table", key_columns, changes,
+                                                lambda done, total: progress.append((done, total)))
+        self.assertEqual(applied, 102)
+        self.assertEqual(progress[-1], (102, 102))
+
+        cursor = self.db_handler.connection.cursor()
+        self.assertEqual(cursor.execute("SELECT COUNT(*) FROM test_table").fetchone(), (101,))
+        self.assertEqual(cursor.execute("SELECT name FROM test_table WHERE id = 1").fetchone(), ('renamed',))
+        self.assertEqual(cursor.execute("SELECT typeof(id) FROM test_table WHERE id = 50").fetchone(), ('integer',))
+
+    def test_apply_changes_rolls_back(self):
+        """測試失敗或取消時整批變更都會回滾"""
+        self.db_handler.connect_to_database(self.temp_db_path)
+        key_columns = self.db_handler.get_row_key_columns("test_table")
+        changes = [{'action': 'delete', 'key': (1,)},
+                   {'action': 'insert', 'values': {'id': '2', 'name': 'duplicate'}}]
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db_handler.apply_changes("test_table", key_columns, changes)
+
+        with self.assertRaises(CommitCancelled):
+            self.db_handler.apply_changes("test_table", key_columns, changes[:1], lambda done, total: True)
+
+        cursor = self.db_handler.connection.cursor()
+        self.assertEqual(cursor.execute("SELECT id, name FROM test_table ORDER BY id").fetchall(),
+                         [(1, 'test1'), (2, 'test2')])
+
+    def test_apply_bulk_delete(self):
+        """測試以 IN (...) 分段批次刪除（rowid 與複合主鍵）"""
+        self.db_handler.connect_to_database(self.temp_db_path)
+        cursor = self.db_handler.connection.cursor()
+        cursor.executemany("INSERT INTO test_table (id, name) VALUES (?, ?)",
+                           [(i, f'n{i}') for i in range(3, 1503)])
+        cursor.execute("CREATE TABLE kv (k TEXT, n INTEGER, v TEXT, PRIMARY KEY (k, n)) WITHOUT ROWID")
+        cursor.executemany("INSERT INTO kv VALUES (?, ?, ?)", [('a', 1, 'x'), ('a', 2, 'y'), ('b', 1, 'z')])
+        self.db_handler.connection.commit()
+
+        keys = [(rowid,) for rowid in range(1, 1503, 2)]
+        applied = self.db_handler.apply_changes("test_table", ["rowid"], [{'action': 'delete', 'keys': keys}])
+        self.assertEqual(applied, len(keys))
+        self.assertEqual(cursor.execute("SELECT COUNT(*) FROM test_table").fetchone(), (751,))
+        self.assertEqual(cursor.execute("SELECT COUNT(*) FROM test_table WHERE id % 2 = 1").fetchone(), (0,))
+
+        self.db_handler.apply_changes("kv", ["k", "n"], [{'action': 'delete', 'keys': [('a', 2), ('b', 1)]}])
+        self.assertEqual(cursor.execute("SELECT * FROM kv").fetchall(), [('a', 1, 'x')])
+
+    def test_savepoint_rollback(self):
+        """測試 ROLLBACK TO 只復原最後一個 SAVEPOINT 之後的變更"""
+        self.db_handler.connect_to_database(self.temp_db_path)
+        changes = [{'action': 'update', 'key': (1,), 'values': {'name': 'first'}}]
+        self.db_handler.create_savepoint("edit_1")
+        self.db_handler.execute_changes("test_table", ["rowid"], changes)
+        self.db_handler.create_savepoint("edit_2")
+        self.db_handler.execute_changes("test_table", ["rowid"], [{'action': 'delete', 'key': (2,)}])
+
+        self.db_handler.rollback_to_savepoint("edit_2")
+        self.assertTrue(self.db_handler.connection.in_transaction)
+        self.db_handler.connection.commit()
+
+        cursor = self.db_handler.connection.cursor()
+        self.assertEqual(cursor.execute("SELECT id, name FROM test_table ORDER BY id").fetchall(),
+                         [(1, 'first'), (2, 'test2')])
+
+    def test_data_version_and_fetch_rows_by_keys(self):
+        """測試其他連線寫入後 data_version 改變，並能以識別值批次重新讀取資料列"""
+        self.db_handler.connect_to_database(self.temp_db_path)
+        version = self.db_handler.get_data_version()
+
+        other = sqlite3.connect(self.temp_db_path)
+        other.execute("UPDATE test_table SET name = 'changed' WHERE id = 2")
+        other.commit()
+        other.close()
+
+        self.assertNotEqual(self.db_handler.get_data_version(), version)
+        rows = self.db_handler.fetch_rows_by_keys("test_table", ["rowid"], [(1,), (2,), (99,)])
+        self.assertEqual(rows, {(1,): {'id': 1, 'name': 'test1'}, (2,): {'id': 2, 'name': 'changed'}})
+
+    def test_schema_cache_invalidated_by_schema_version(self):
+        """測試 schema 快取在結構未改變時重複使用，其他連線修改結構後重新讀取"""
+        snapshot = self.db_handler.get_schema_snapshot()
+        self.assertIs(self.db_handler.get_schema_snapshot(), snapshot)
+
+        other = sqlite3.connect(self.temp_db_path)
+        other.execute("INSERT INTO test_table (name) VALUES ('data only')")
+        other.commit()
+        self.assertIs(self.db_handler.get_schema_snapshot(), snapshot)
+
+        other.execute("ALTER TABLE test_table ADD COLUMN email TEXT")
+        other.execute("CREATE INDEX idx_email ON test_table (email)")
+        other.commit()
+        other.close()
+
+        self.assertIsNot(self.db_handler.get_schema_snapshot(), snapshot)
+        self.assertEqual([column[1] for column in self.db_handler.get_table_schema("test_table")],
+                         ['id', 'name', 'email'])
+        self.assertEqual([index['name'] for index in self.db_handler.get_table_indexes("test_table")],
+                         ['idx_email'])
+
+    def test_parse_index_stat(self):
+        """測試解析 sqlite_stat1：第二個數字是每個鍵值的平均資料列數"""
+        stat = parse_index_stat("10000 5000 2 unordered")
+        self.assertEqual(stat['row_count'], 10000)
+        self.assertEqual(stat['rows_per_key'], [5000, 2])
+        self.assertEqual(stat['distinct_keys'], 5000)
+        self.assertEqual(stat['options'], ['unordered'])
+        self.assertTrue(stat['low_selectivity'])
+        self.assertFalse(parse_index_stat("10000 1")['low_selectivity'])
+        self.assertIsNone(parse_index_stat(""))
+
+    def test_analyze_and_index_statistics(self):
+        """測試逐一表格執行 ANALYZE 後讀取索引統計，並可在表格之間取消"""
+        connection = self.db_handler.connection
+        connection.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, status TEXT, code TEXT)")
+        connection.execute("CREATE INDEX events_status ON events (status)")
+        connection.execute("CREATE INDEX events_code ON events (code)")
+        connection.executemany("INSERT INTO events (status, code) VALUES (?, ?)",
+                               [('open' if i % 2 else 'closed', f"code{i}") for i in range(1000)])
+        connection.commit()
+        self.assertEqual(self.db_handler.get_index_statistics("events"), {})
+
+        writer = self.db_handler.open_writer_connection()
+        try:
+            with self.assertRaises(AnalyzeCancelled):
+                analyze_tables(writer, ["events", "test_table"], progress_callback=lambda done, total, name: done == 1)
+            progress = []
+            analyze_tables(writer, ["events"], analysis_limit=100,
+                           progress_callback=lambda *args: progress.append(args))
+        finally:
+            writer.close()
+
+        self.assertEqual(progress, [(0, 1, 'events'), (1, 1, None)])
+        statistics = self.db_handler.get_index_statistics("events")
+        self.assertTrue(statistics['events_status']['low_selectivity'])
+        self.assertFalse(statistics['events_code']['low_selectivity'])
+        self.assertEqual(statistics['events_code']['rows_per_key'], [1])
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Exporters Test Suite
+測試匯出模組的功能
+"""
+
+import unittest
+import csv
+import gzip
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+
+# 添加上一層目錄到 Python 路徑，以便能正確導入 exporters
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from exporters import (ExportCancelled, dump_sql, export_arrow, export_delimited, export_jsonl, export_parquet,
+                       export_tsv, is_pyarrow_available, is_zstd_available, list_dump_tables)
+
+
+class TestDelimitedExport(unittest.TestCase):
+    """測試 CSV/TSV 串流匯出"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, data BLOB)")
+        self.connection.executemany("INSERT INTO items VALUES (?, ?, ?)",
+                                    [(i, f"item {i}, \"quoted\"", b'\x00\xff' if i == 1 else None)
+                                     for i in range(1, 26)])
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'items.csv')
+
+    def tearDown(self):
+        """清理測試環境"""
+        self.connection.close()
+        self.temp_dir.cleanup()
+
+    def test_export_csv(self):
+        """測試分批寫出所有資料列，BLOB 轉為十六進位"""
+        progress = []
+        cursor = self.connection.execute("SELECT * FROM items ORDER BY id")
+        total = export_delimited(cursor, self.path, batch_size=10, progress_callback=progress.append)
+
+        self.assertEqual(total, 25)
+        self.assertEqual(progress, [10, 20, 25])
+        with open(self.path, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ['id', 'name', 'data'])
+        self.assertEqual(rows[1], ['1', 'item 1, "quoted"', '00ff'])
+        self.assertEqual(rows[2], ['2', 'item 2, "quoted"', ''])
+        self.assertEqual(len(rows), 26)
+
+    def test_export_jsonl(self):
+        """測試每列輸出一個 JSON 物件，保留數值型別"""
+        path = os.path.join(self.temp_dir.name, 'items.jsonl')
+        cursor = self.connection.execute("SELECT id, name, data, id * 0.5 AS half FROM items ORDER BY id")
+        self.assertEqual(export_jsonl(cursor, path, batch_size=7), 25)
+
+        with open(path, encoding='utf-8') as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 25)
+        self.assertEqual(json.loads(lines[0]), {'id': 1, 'name': 'item 1, "quoted"', 'data': '00ff', 'half': 0.5})
+
+    def test_cancel_keeps_existing_file(self):
+        """測試取消時不留下不完整的檔案，也不覆蓋原有的檔案"""
+        with open(self.path, 'w') as f:
+            f.write('old')
+        cursor = self.connection.execute("SELECT * FROM items")
+        with self.assertRaises(ExportCancelled):
+            export_tsv(cursor, self.path, batch_size=10, progress_callback=lambda total: True)
+
+        with open(self.path) as f:
+            self.assertEqual(f.read(), 'old')
+        self.assertEqual(os.listdir(self.temp_dir.name), ['items.csv'])
+
+
+@unittest.skipUnless(is_pyarrow_available(), "pyarrow is not installed")
+class TestColumnarExport(unittest.TestCase):
+    """測試 Parquet/Arrow 匯出（需要 pyarrow）"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, price REAL, qty NUMERIC, "
+                                "data BLOB, extra)")
+        self.connection.executemany("INSERT INTO items VALUES (?, ?, ?, ?, ?, ?)",
+                                    [(i, f"item {i}", i * 1.5, i, b'\x01', i) for i in range(1, 101)])
+        # 沒有型別親和性的欄位可以存放不同型別的值
+        self.connection.execute("INSERT INTO items VALUES (101, 42, 7, NULL, NULL, '7')")
+        self.column_types = {'id': 'INTEGER', 'name': 'TEXT', 'price': 'REAL', 'qty': 'NUMERIC', 'data': 'BLOB',
+                             'extra': ''}
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """清理測試環境"""
+        self.connection.close()
+        self.temp_dir.cleanup()
+
+    def test_export_parquet(self):
+        """測試依型別親和性決定欄位型別，並分成多個 row group"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        path = os.path.join(self.temp_dir.name, 'items.parquet')
+        cursor = self.connection.execute("SELECT * FROM items ORDER BY id")
+        total = export_parquet(cursor, path, batch_size=40, column_types=self.column_types)
+
+        self.assertEqual(total, 101)
+        parquet_file = pq.ParquetFile(path)
+        self.assertEqual(parquet_file.metadata.num_row_groups, 3)
+        table = parquet_file.read()
+        self.assertEqual(table.schema.field('id').type, pa.int64())
+        self.assertEqual(table.schema.field('qty').type, pa.float64())
+        self.assertEqual(table.schema.field('data').type, pa.binary())
+        self.assertEqual(table.column('name').to_pylist()[-1], '42')
+        self.assertEqual(table.column('price').to_pylist()[-1], 7.0)
+        self.assertEqual(table.schema.field('extra').type, pa.int64())
+        self.assertEqual(table.column('extra').to_pylist()[-1], 7)
+
+    def test_export_arrow_query(self):
+        """測試查詢結果沒有宣告型別時由資料推斷"""
+        import pyarrow as pa
+        path = os.path.join(self.temp_dir.name, 'items.arrow')
+        cursor = self.connection.execute("SELECT id, name, price * 2 AS doubled FROM items WHERE id <= 10")
+        self.assertEqual(export_arrow(cursor, path), 10)
+
+        with pa.ipc.open_file(path) as reader:
+            table = reader.read_all()
+        self.assertEqual(table.schema.field('doubled').type, pa.float64())
+        self.assertEqual(table.column('id').to_pylist(), list(range(1, 11)))
+
+    def test_export_numeric_affinity_text(self):
+        """測試 NUMERIC 親和性的欄位（DATETIME）存放 ISO 日期文字時匯出為 string"""
+        import pyarrow.parquet as pq
+        self.connection.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, created DATETIME, amount DECIMAL(10, 2))")
+        self.connection.executemany("INSERT INTO events (created, amount) VALUES (?, ?)",
+                                    [('2024-01-05 10:00:00', 10), ('2024-01-06 11:30:00', 10.5), (None, None)])
+        path = os.path.join(self.temp_dir.name, 'events.parquet')
+        cursor = self.connection.execute("SELECT * FROM events ORDER BY id")
+        column_types = {'id': 'INTEGER', 'created': 'DATETIME', 'amount': 'DECIMAL(10, 2)'}
+        self.assertEqual(export_parquet(cursor, path, column_types=column_types), 3)
+
+        table = pq.read_table(path)
+        self.assertEqual(str(table.schema.field('created').type), 'string')
+        self.assertEqual(table.column('created').to_pylist(), ['2024-01-05 10:00:00', '2024-01-06 11:30:00', None])
+        self.assertEqual(table.column('amount').to_pylist(), [10.0, 10.5, None])
+
+
+class TestSqlDump(unittest.TestCase):
+    """測試 SQL dump"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.executescript('''
+            CREATE TABLE items (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, price REAL, data BLOB,
+                                doubled INTEGER GENERATED ALWAYS AS (id * 2) VIRTUAL);
+            CREATE INDEX items_name ON items (name);
+            CREATE TABLE "log ""entries""" (item_id INTEGER, note TEXT);
+            CREATE TRIGGER items_log AFTER INSERT ON items BEGIN
+                INSERT INTO "log ""entries""" VALUES (new.id, 'added');
+            END;
+            CREATE VIEW cheap_items AS SELECT * FROM items WHERE price < 5;
+        ''')
+        self.connection.executemany("INSERT INTO items (name, price, data) VALUES (?, ?, ?)",
+                                    [(f"it's {i}", i / 3, bytes([i]) if i % 2 else None) for i in range(1, 12)])
+        self.connection.execute("DELETE FROM items WHERE id = 11")
+        self.connection.commit()
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """清理測試環境"""
+        self.connection.close()
+        self.temp_dir.cleanup()
+
+    def replay(self, script):
+        restored = sqlite3.connect(':memory:')
+        restored.executescript(script)
+        return restored
+
+    def assertSameRows(self, restored, query):
+        self.assertEqual(restored.execute(query).fetchall(), self.connection.execute(query).fetchall())
+
+    def test_dump_replays_database(self):
+        """測試多列 INSERT 的 dump 可還原資料、AUTOINCREMENT 計數器、索引、觸發程序與檢視"""
+        path = os.path.join(self.temp_dir.name, 'dump.sql.gz')
+        progress = []
+        total = dump_sql(self.connection, path, rows_per_insert=4, compression='gzip',
+                         progress_callback=lambda *args: progress.append(args))
+
+        self.assertEqual(total, 21)
+        self.assertEqual(progress[:3], [(0, 'items', 0), (0, 'items', 10), (1, 'log "entries"', 0)])
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            script = f.read()
+        self.assertEqual(script.count('INSERT INTO "items"'), 3)
+        restored = self.replay(script)
+        self.assertSameRows(restored, "SELECT * FROM items")
+        self.assertSameRows(restored, 'SELECT * FROM "log ""entries"""')
+        self.assertSameRows(restored, "SELECT * FROM sqlite_sequence")
+        self.assertSameRows(restored, "SELECT type, name FROM sqlite_master ORDER BY name")
+
+    def test_dump_selected_tables_schema_only(self):
+        """測試只 dump 選擇的表格的結構"""
+        path = os.path.join(self.temp_dir.name, 'schema.sql')
+        self.assertEqual(list_dump_tables(self.connection), ['items', 'log "entries"'])
+        self.assertEqual(dump_sql(self.connection, path, tables=['items'], schema_only=True), 0)
+
+        with open(path, encoding='utf-8') as f:
+            script = f.read()
+        self.assertNotIn("INSERT INTO \"items\"", script)
+        restored = self.replay(script)
+        self.assertEqual([row[0] for row in restored.execute("SELECT name FROM sqlite_master ORDER BY name")],
+                         ['items', 'items_log', 'items_name', 'sqlite_sequence'])
+
+    @unittest.skipUnless(is_zstd_available(), "zstd is not available")
+    def test_dump_zstd(self):
+        """測試 zstd 壓縮"""
+        import zstandard
+        path = os.path.join(self.temp_dir.name, 'dump.sql.zst')
+        dump_sql(self.connection, path, compression='zstd')
+        with zstandard.open(path, 'rt', encoding='utf-8') as f:
+            self.assertSameRows(self.replay(f.read()), "SELECT * FROM items")
+
+
+if __name__ == '__main__':
+    unittest.main()
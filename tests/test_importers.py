@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Importers Test Suite
+測試匯入模組的功能
+"""
+
+import unittest
+import os
+import sqlite3
+import sys
+import tempfile
+
+# 添加上一層目錄到 Python 路徑，以便能正確導入 importers
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from importers import (ImportCancelled, flatten_record, import_delimited, import_jsonl, infer_column_types,
+                       sniff_delimited_file, sniff_jsonl_file)
+
+
+class TestDelimitedImport(unittest.TestCase):
+    """測試 CSV/TSV 匯入"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'people.csv')
+        with open(self.path, 'w', newline='', encoding='utf-8') as f:
+            f.write('\ufeffid,name,score,zip\n')  # Excel 輸出的 BOM
+            for i in range(1, 11):
+                f.write(f'{i},"Name, {i}",{i * 0.5 if i != 3 else ""},0{i}\n')
+            f.write('11,short\n')
+        self.connection = sqlite3.connect(':memory:')
+
+    def tearDown(self):
+        """清理測試環境"""
+        self.connection.close()
+        self.temp_dir.cleanup()
+
+    def test_sniff_and_infer(self):
+        """測試分析分隔字元、標題列，並由樣本推斷欄位型別"""
+        delimiter, has_header, columns, rows = sniff_delimited_file(self.path)
+        self.assertEqual(delimiter, ',')
+        self.assertTrue(has_header)
+        self.assertEqual(columns, ['id', 'name', 'score', 'zip'])
+        self.assertEqual(len(rows), 11)
+        # 空白值不影響推斷，前導零的數字保留為文字
+        self.assertEqual(infer_column_types(rows, 4), ['INTEGER', 'TEXT', 'REAL', 'TEXT'])
+
+    def test_import_new_table(self):
+        """測試建立新表格並匯入，非文字欄位的空白值寫入 NULL"""
+        progress = []
+        total = import_delimited(self.connection, self.path, 'people', [0, 1, 2, 3],
+                                 ['id', 'name', 'score', 'zip'], ['INTEGER', 'TEXT', 'REAL', 'TEXT'],
+                                 create_table=True, relaxed=True, batch_size=4,
+                                 progress_callback=lambda rows, rate: progress.append(rows))
+
+        self.assertEqual(total, 11)
+        self.assertEqual(progress, [4, 8, 11])
+        self.assertEqual(self.connection.execute("SELECT * FROM people WHERE id = 1").fetchone(),
+                         (1, 'Name, 1', 0.5, '01'))
+        self.assertIsNone(self.connection.execute("SELECT score FROM people WHERE id = 3").fetchone()[0])
+        self.assertEqual(self.connection.execute("SELECT name, score, zip FROM people WHERE id = 11").fetchone(),
+                         ('short', None, ''))
+
+    def test_cancel_rolls_back(self):
+        """測試取消時回滾整個匯入，包括建立的表格"""
+        self.connection.execute("CREATE TABLE existing (name TEXT, id INTEGER)")
+        with self.assertRaises(ImportCancelled):
+            import_delimited(self.connection, self.path, 'existing', [1, 0], ['name', 'id'], ['TEXT', 'INTEGER'],
+                             batch_size=4, progress_callback=lambda rows, rate: True)
+        self.assertEqual(self.connection.execute("SELECT COUNT(*) FROM existing").fetchone()[0], 0)
+
+        import_delimited(self.connection, self.path, 'existing', [1, 0], ['name', 'id'], ['TEXT', 'INTEGER'])
+        self.assertEqual(self.connection.execute("SELECT name FROM existing WHERE id = 2").fetchone()[0], 'Name, 2')
+
+
+class TestJsonLinesImport(unittest.TestCase):
+    """測試 JSON Lines 匯入"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'events.jsonl')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('{"id": 1, "user": {"name": "Ann", "geo": {"lat": 1.5}}, "tags": ["a", "b"], "ok": true}\n')
+            f.write('\n')
+            f.write('{"id": 2, "user": {"name": "Bob"}, "ok": false, "score": 2.5}\n')
+        self.connection = sqlite3.connect(':memory:')
+
+    def tearDown(self):
+        """清理測試環境"""
+        self.connection.close()
+        self.temp_dir.cleanup()
+
+    def test_flatten_record(self):
+        """測試巢狀物件展開，陣列保持原樣"""
+        self.assertEqual(flatten_record({'a': {'b': 1, 'c': {'d': None}}, 'e': [1], 'f': {}}),
+                         {'a.b': 1, 'a.c.d': None, 'e': [1], 'f': {}})
+
+    def test_import_flattened(self):
+        """測試展開巢狀物件後匯入，欄位與型別由樣本推斷"""
+        columns, rows, types = sniff_jsonl_file(self.path)
+        self.assertEqual(columns, ['id', 'user.name', 'user.geo.lat', 'tags', 'ok', 'score'])
+        self.assertEqual(types, ['INTEGER', 'TEXT', 'REAL', 'TEXT', 'INTEGER', 'REAL'])
+        self.assertEqual(rows[0][3], '["a", "b"]')
+
+        total = import_jsonl(self.connection, self.path, 'events', columns, columns, types, create_table=True)
+        self.assertEqual(total, 2)
+        self.assertEqual(self.connection.execute('SELECT "user.name", "user.geo.lat", ok, score FROM events').fetchall(),
+                         [('Ann', 1.5, 1, None), ('Bob', None, 0, 2.5)])
+
+    def test_import_nested_as_json(self):
+        """測試不展開時，巢狀物件存為 JSON 文字，可用 json_extract 查詢"""
+        columns, _, types = sniff_jsonl_file(self.path, flatten=False)
+        self.assertEqual(columns, ['id', 'user', 'tags', 'ok', 'score'])
+        import_jsonl(self.connection, self.path, 'events', columns, columns, types, flatten=False, create_table=True)
+        self.assertEqual(self.connection.execute(
+            "SELECT json_extract(user, '$.geo.lat') FROM events WHERE id = 1").fetchone()[0], 1.5)
+
+if __name__ == '__main__':
+    unittest.main()
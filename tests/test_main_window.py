@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Main Window Test Suite
+測試主視窗對其他連線寫入的反應
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import sqlite3
+
+# 添加上一層目錄到 Python 路徑，以便能正確導入模組
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication
+import config
+from main import MainWindow
+
+class TestExternalWrites(unittest.TestCase):
+    """測試其他連線寫入後重新整理目前的表格"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+        if not isinstance(cls.app, QApplication):
+            raise unittest.SkipTest("QApplication is required")
+
+    def setUp(self):
+        """設置測試環境（使用暫存的設定檔，不影響使用者的設定）"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.original_config_file = config.CONFIG_FILE
+        config.CONFIG_FILE = os.path.join(self.temp_dir.name, 'config.ini')
+
+        self.db_path = os.path.join(self.temp_dir.name, 'main.db')
+        self.other = sqlite3.connect(self.db_path)
+        self.other.execute("CREATE TABLE log (id INTEGER PRIMARY KEY, message TEXT)")
+        self.other.executemany("INSERT INTO log (message) VALUES (?)", [(f"message {i}",) for i in range(5)])
+        self.other.commit()
+
+        self.window = MainWindow()
+        self.window.connect_to_database(self.db_path)
+        self.window.load_table_data('log')
+
+    def tearDown(self):
+        """清理測試環境"""
+        if self.window.database_watcher:
+            self.window.database_watcher.stop()
+        self.window.db_handler.disconnect_database()
+        self.window.deleteLater()
+        self.other.close()
+        config.CONFIG_FILE = self.original_config_file
+        self.temp_dir.cleanup()
+
+    def test_external_update_refreshes_table(self):
+        """測試其他連線只更新既有資料列（資料列數與最大 rowid 不變）時，表格也會重新載入"""
+        self.assertEqual(self.window.table_model.item(2, 1).text(), 'message 2')
+
+        self.other.execute("UPDATE log SET message = 'changed' WHERE id = 3")
+        self.other.commit()
+        self.assertEqual(self.window.database_watcher.check(), 'data')
+
+        self.assertEqual(self.window.table_model.rowCount(), 5)
+        self.assertEqual(self.window.table_model.item(2, 1).text(), 'changed')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Table Models Test Suite
+測試資料表格模型的功能
+"""
+
+import unittest
+import os
+import sys
+import sqlite3
+
+# 添加上一層目錄到 Python 路徑，以便能正確導入模組
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QStandardItemModel, QStandardItem
+from changes import ChangeTracker
+from db_handler import build_search_query
+from models import TableFilterProxyModel, MODIFIED_ROW_COLOR
+
+class TestTableFilterProxyModel(unittest.TestCase):
+    """測試 TableFilterProxyModel 類別"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.model = QStandardItemModel(0, 2)
+        for name, email in [('Alice', 'alice@example.com'), ('Bob', 'bob@example.com'), ('Carol', 'carol@test.org')]:
+            self.model.appendRow([QStandardItem(name), QStandardItem(email)])
+        self.proxy = TableFilterProxyModel()
+        self.proxy.setSourceModel(self.model)
+
+    def test_filter_is_case_insensitive(self):
+        """測試過濾不分大小寫"""
+        self.proxy.set_search_text('ALICE')
+        self.assertEqual(self.proxy.rowCount(), 1)
+        self.assertEqual(self.proxy.index(0, 0).data(), 'Alice')
+
+        self.proxy.set_search_text('example')
+        self.assertEqual(self.proxy.rowCount(), 2)
+
+        self.proxy.set_search_text('')
+        self.assertEqual(self.proxy.rowCount(), 3)
+
+    def test_regex_filter(self):
+        """測試正規表示式過濾逐格比對"""
+        self.proxy.set_search_text(r'^(alice|bob)$', regex=True)
+        self.assertEqual(self.proxy.rowCount(), 2)
+
+        self.proxy.set_search_text(r'\.org$', regex=True)
+        self.assertEqual(self.proxy.rowCount(), 1)
+
+    def test_match_does_not_span_cells(self):
+        """測試搜尋文字不會跨欄位比對"""
+        self.proxy.set_search_text('bobbob')
+        self.assertEqual(self.proxy.rowCount(), 0)
+
+    def test_search_keys_follow_source_changes(self):
+        """測試來源模型變更後搜尋字串同步更新"""
+        self.proxy.set_search_text('dave')
+        self.assertEqual(self.proxy.rowCount(), 0)
+
+        self.model.appendRow([QStandardItem('Dave'), QStandardItem('dave@example.com')])
+        self.assertEqual(self.proxy.rowCount(), 1)
+
+        self.model.item(0, 0).setText('Dave Jr')
+        self.assertEqual(self.proxy.rowCount(), 2)
+
+        self.model.removeRow(0)
+        self.assertEqual(self.proxy.rowCount(), 1)
+        self.assertEqual(self.proxy.index(0, 0).data(), 'Dave')
+
+    def test_search_keys_from_source_rows(self):
+        """測試使用原始資料列計算搜尋字串，且編輯後不會使用過期的資料"""
+        self.proxy.setSourceModel(self.model)
+        self.proxy.set_source_rows([('Alice', 'alice@example.com'), ('Bob', 'bob@example.com'), ('Carol', None)])
+        self.model.item(1, 0).setText('Robert')
+
+        self.proxy.set_search_text('robert')
+        self.assertEqual(self.proxy.rowCount(), 1)
+
+    def test_hide_rows(self):
+        """測試隱藏標記刪除的資料列，並在來源模型增刪列時保持對應"""
+        self.proxy.hide_rows([0, 2])
+        self.assertEqual(self.proxy.rowCount(), 1)
+        self.assertEqual(self.proxy.index(0, 0).data(), 'Bob')
+
+        self.proxy.set_search_text('o')
+        self.assertEqual(self.proxy.rowCount(), 1)
+        self.proxy.set_search_text('')
+
+        self.model.removeRow(1)
+        self.assertEqual(self.proxy.hidden_rows(), {0, 1})
+        self.assertEqual(self.proxy.rowCount(), 0)
+
+        self.proxy.setSourceModel(self.model)
+        self.assertEqual(self.proxy.rowCount(), 2)
+
+    def test_modified_row_background(self):
+        """測試有未提交變更的資料列由代理模型提供背景色"""
+        tracker = ChangeTracker()
+        self.proxy.set_change_tracker(tracker)
+        tracker.set_cell(1, 2, 'email', 'bobby@example.com', 'bob@example.com')
+        tracker.mark_inserted(2, {'name': 'Carol'})
+
+        self.assertIsNone(self.proxy.index(0, 1).data(Qt.BackgroundRole))
+        self.assertEqual(self.proxy.index(1, 0).data(Qt.BackgroundRole), MODIFIED_ROW_COLOR)
+        self.assertEqual(self.proxy.index(2, 1).data(Qt.BackgroundRole), MODIFIED_ROW_COLOR)
+
+        # 過濾後仍依來源列號判斷
+        self.proxy.set_search_text('bob')
+        self.assertEqual(self.proxy.index(0, 0).data(Qt.BackgroundRole), MODIFIED_ROW_COLOR)
+
+    def test_filter_matches_sql_search(self):
+        """測試有欄位型別時，記憶體過濾與 SQL 搜尋（build_search_query）回傳相同的資料列"""
+        connection = sqlite3.connect(':memory:')
+        connection.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, amount INTEGER, price REAL, "
+                           "created DATETIME, created_at INTEGER, note TEXT)")
+        connection.executemany("INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?)", [
+            (1, 42, 9.5, '2024-01-05 10:00:00', 1704412800, 'Order 42'),
+            (2, 7, 42.0, '2024-01-06', 1704499200, 'Straße 50% off'),
+            (3, None, None, None, None, 'a_b'),
+            (4, 420, 1.0, '2023-12-31', 1600000000, None),
+        ])
+        schema_info = connection.execute("PRAGMA table_info(orders)").fetchall()
+        rows = connection.execute("SELECT * FROM orders ORDER BY id").fetchall()
+
+        model = QStandardItemModel(0, len(schema_info))
+        model.setHorizontalHeaderLabels([column_info[1] for column_info in schema_info])
+        for row in rows:
+            model.appendRow([QStandardItem('' if value is None else str(value)) for value in row])
+        self.proxy.setSourceModel(model)
+        self.proxy.set_column_types({column_info[1]: column_info[2] for column_info in schema_info})
+        self.proxy.set_source_rows(rows)
+
+        for search_text in ('42', '2024-01-05', 'order', '50%', 'a_b', '_', 'STRASSE', 'r 4'):
+            query, params = build_search_query('orders', schema_info, [], search_text)
+            expected = sorted(row[0] for row in connection.execute(query, params))
+            self.proxy.set_search_text(search_text)
+            filtered = sorted(int(self.proxy.index(row, 0).data()) for row in range(self.proxy.rowCount()))
+            self.assertEqual(filtered, expected, search_text)
+
+        self.assertEqual(expected, [1])
+
+        # 編輯過的資料列以表格上的文字依欄位型別比對
+        self.proxy.set_search_text('42')
+        model.item(3, 1).setText('42')
+        filtered = sorted(int(self.proxy.index(row, 0).data()) for row in range(self.proxy.rowCount()))
+        self.assertEqual(filtered, [1, 2, 4])
+        connection.close()
+
+if __name__ == '__main__':
+    unittest.main()
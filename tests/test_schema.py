@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Schema Introspection Test Suite
+測試資料庫結構快照的功能
+"""
+
+import unittest
+import dataclasses
+import os
+import sqlite3
+import sys
+
+# 添加上一層目錄到 Python 路徑，以便能正確導入 schema
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from schema import read_schema_snapshot
+
+
+class TestSchemaSnapshot(unittest.TestCase):
+    """測試以 pragma 表格值函式讀取結構快照"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.executescript('''
+            CREATE TABLE customers (id INTEGER PRIMARY KEY, region TEXT NOT NULL, code TEXT DEFAULT 'x',
+                                    label TEXT GENERATED ALWAYS AS (region || code) VIRTUAL,
+                                    UNIQUE (region, code));
+            CREATE TABLE "order lines" (order_id INTEGER, line INTEGER, customer_region TEXT, customer_code TEXT,
+                                        amount REAL,
+                                        PRIMARY KEY (order_id, line),
+                                        FOREIGN KEY (customer_region, customer_code)
+                                            REFERENCES customers (region, code) ON DELETE CASCADE);
+            CREATE INDEX order_amount ON "order lines" (amount DESC, lower(customer_code)) WHERE amount > 0;
+            CREATE VIEW big_orders AS SELECT order_id, amount FROM "order lines" WHERE amount > 100;
+        ''')
+
+    def tearDown(self):
+        """清理測試環境"""
+        self.connection.close()
+
+    def test_snapshot(self):
+        """測試一次讀取欄位、索引、索引欄位與外鍵"""
+        snapshot = read_schema_snapshot(self.connection)
+
+        self.assertEqual(list(snapshot.tables), ['customers', 'order lines', 'big_orders'])
+        self.assertEqual(snapshot.table_names('view'), ['big_orders'])
+        self.assertEqual(snapshot.schema_version, self.connection.execute("PRAGMA schema_version").fetchone()[0])
+
+        customers = snapshot.table('CUSTOMERS')
+        self.assertEqual([(column.name, column.type, column.notnull, column.pk) for column in customers.table_info],
+                         [('id', 'INTEGER', False, 1), ('region', 'TEXT', True, 0), ('code', 'TEXT', False, 0)])
+        # 產生欄位不在 table_info 中，但會出現在 SELECT * 的欄位中
+        self.assertEqual([column.name for column in customers.select_columns], ['id', 'region', 'code', 'label'])
+        self.assertEqual(customers.columns[2].default, "'x'")
+        [unique_index] = customers.indexes
+        self.assertEqual((unique_index.unique, unique_index.origin, unique_index.primary), (True, 'u', False))
+        self.assertEqual([column.name for column in unique_index.columns], ['region', 'code'])
+
+        lines = snapshot.table('order lines')
+        indexes = {index.name: index for index in lines.indexes}
+        self.assertTrue(indexes['sqlite_autoindex_order lines_1'].primary)
+        # 運算式索引的欄位沒有名稱
+        self.assertEqual([column.name for column in indexes['order_amount'].columns], ['amount', None])
+        self.assertTrue(indexes['order_amount'].partial)
+        [foreign_key] = lines.foreign_keys
+        self.assertEqual((foreign_key.table, foreign_key.from_columns, foreign_key.to_columns, foreign_key.on_delete),
+                         ('customers', ('customer_region', 'customer_code'), ('region', 'code'), 'CASCADE'))
+
+        self.assertEqual(snapshot.table('big_orders').column_types, {'order_id': 'INTEGER', 'amount': 'REAL'})
+        self.assertIsNone(snapshot.table('missing'))
+        self.assertFalse(self.connection.in_transaction)
+
+    def test_snapshot_is_immutable(self):
+        """測試快照不能被修改"""
+        snapshot = read_schema_snapshot(self.connection)
+        with self.assertRaises(TypeError):
+            snapshot.tables['customers'] = None
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            snapshot.table('customers').name = 'other'
+
+    def test_unreadable_view(self):
+        """測試檢視參照不存在的表格時，仍能讀取其他表格"""
+        self.connection.execute("CREATE VIEW broken AS SELECT * FROM missing_table")
+        snapshot = read_schema_snapshot(self.connection)
+
+        self.assertEqual(snapshot.table('broken').columns, ())
+        self.assertEqual(len(snapshot.table('customers').columns), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
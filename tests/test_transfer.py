@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Transfer Test Suite
+測試資料庫之間複製表格的功能
+"""
+
+import unittest
+import os
+import sqlite3
+import sys
+import tempfile
+
+# 添加上一層目錄到 Python 路徑，以便能正確導入 transfer
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from transfer import (IF_EXISTS_APPEND, IF_EXISTS_REPLACE, copy_table, open_target_connection,
+                      rename_create_index, rename_create_table)
+
+
+class TestCopyTable(unittest.TestCase):
+    """測試以 ATTACH 與 INSERT ... SELECT 複製表格"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source_path = os.path.join(self.temp_dir.name, 'source.db')
+        source = sqlite3.connect(self.source_path)
+        source.executescript('''
+            CREATE TABLE "order items" (id INTEGER PRIMARY KEY, name TEXT NOT NULL, qty INTEGER,
+                                        total INTEGER GENERATED ALWAYS AS (qty * 2) VIRTUAL);
+            CREATE UNIQUE INDEX "order items_name" ON "order items" (name);
+        ''')
+        source.executemany('INSERT INTO "order items" (name, qty) VALUES (?, ?)',
+                           [(f"item {i}", i) for i in range(100)])
+        source.commit()
+        source.close()
+        self.target = open_target_connection(os.path.join(self.temp_dir.name, 'target.db'))
+
+    def tearDown(self):
+        """清理測試環境"""
+        self.target.close()
+        self.temp_dir.cleanup()
+
+    def test_rename_create_statements(self):
+        """測試改寫 CREATE 語句中的名稱"""
+        self.assertEqual(rename_create_table('CREATE TABLE "a ""b"" c"(x)', 'd'), 'CREATE TABLE "d"(x)')
+        self.assertEqual(rename_create_index('CREATE UNIQUE INDEX [i] ON t (x)', 'j', 'u'),
+                         'CREATE UNIQUE INDEX "j" ON "u" (x)')
+
+    def test_copy_subset_with_indexes(self):
+        """測試依條件複製部分資料列，並在載入後建立索引"""
+        total = copy_table(self.target, self.source_path, 'order items', 'archive', where="qty >= 90")
+
+        self.assertEqual(total, 10)
+        self.assertEqual(self.target.execute("SELECT MIN(total) FROM archive").fetchone()[0], 180)
+        self.assertEqual(self.target.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'archive'").fetchall(),
+            [('archive_name',)])
+        # 來源資料庫只在複製期間附加
+        self.assertEqual([row[1] for row in self.target.execute("PRAGMA database_list")], ['main'])
+
+    def test_existing_table(self):
+        """測試目標表格已存在時失敗、附加或重新建立，錯誤時全部回滾"""
+        copy_table(self.target, self.source_path, 'order items', where="qty < 5")
+        with self.assertRaises(ValueError):
+            copy_table(self.target, self.source_path, 'order items')
+
+        self.assertEqual(copy_table(self.target, self.source_path, 'order items', where="qty >= 95",
+                                    if_exists=IF_EXISTS_APPEND), 5)
+        self.assertEqual(self.target.execute('SELECT COUNT(*) FROM "order items"').fetchone()[0], 10)
+
+        with self.assertRaises(sqlite3.OperationalError):
+            copy_table(self.target, self.source_path, 'order items', where="no_such_column = 1",
+                       if_exists=IF_EXISTS_REPLACE)
+        self.assertEqual(self.target.execute('SELECT COUNT(*) FROM "order items"').fetchone()[0], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Database Watcher Test Suite
+測試外部寫入偵測與只讀取新資料列的功能
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import sqlite3
+
+# 添加上一層目錄到 Python 路徑，以便能正確導入模組
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyQt5.QtCore import QCoreApplication
+from db_handler import DBHandler
+from watcher import DatabaseWatcher
+
+class TestDatabaseWatcher(unittest.TestCase):
+    """測試 DatabaseWatcher 與 DBHandler.fetch_appended_rows"""
+
+    @classmethod
+    def setUpClass(cls):
+        # QFileSystemWatcher 需要 QCoreApplication
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        """設置測試環境"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'watched.db')
+        self.other = sqlite3.connect(self.db_path)
+        self.other.execute("PRAGMA journal_mode=WAL")
+        self.other.execute("CREATE TABLE log (id INTEGER PRIMARY KEY, message TEXT)")
+        self.other.executemany("INSERT INTO log (message) VALUES (?)", [(f"message {i}",) for i in range(5)])
+        self.other.commit()
+
+        self.db_handler = DBHandler(self.db_path)
+        self.watcher = DatabaseWatcher(self.db_handler)
+        self.watcher.start()
+        self.signals = []
+        self.watcher.schema_changed.connect(lambda: self.signals.append('schema'))
+        self.watcher.data_changed.connect(lambda: self.signals.append('data'))
+
+    def tearDown(self):
+        """清理測試環境"""
+        self.watcher.stop()
+        self.db_handler.disconnect_database()
+        self.other.close()
+        self.temp_dir.cleanup()
+
+    def test_detects_data_and_schema_changes(self):
+        """測試其他連線寫入資料或修改結構時發出對應的信號，本連線的寫入不會觸發"""
+        self.assertIsNone(self.watcher.check())
+        self.assertIn(self.db_path, self.watcher.file_watcher.files())
+
+        self.db_handler.connection.execute("INSERT INTO log (message) VALUES ('own')")
+        self.db_handler.connection.commit()
+        self.assertIsNone(self.watcher.check())
+
+        self.other.execute("INSERT INTO log (message) VALUES ('external')")
+        self.other.commit()
+        self.assertEqual(self.watcher.check(), 'data')
+        self.assertIn(f"{self.db_path}-wal", self.watcher.file_watcher.files())
+
+        self.other.execute("CREATE INDEX log_message ON log (message)")
+        self.other.commit()
+        self.assertEqual(self.watcher.check(), 'schema')
+        self.assertEqual(self.signals, ['data', 'schema'])
+
+    def test_fetch_appended_rows(self):
+        """測試只讀取 rowid 大於已載入最大值的資料列，有資料列被刪除時要求重新載入"""
+        self.other.executemany("INSERT INTO log (message) VALUES (?)", [("new 1",), ("new 2",)])
+        self.other.commit()
+
+        columns, rows = self.db_handler.fetch_appended_rows("log", "rowid", 5, 5)
+        self.assertEqual(columns[1:], ['id', 'message'])
+        self.assertEqual(rows, [(6, 6, 'new 1'), (7, 7, 'new 2')])
+        self.assertFalse(self.db_handler.connection.in_transaction)
+
+        self.other.execute("DELETE FROM log WHERE id = 2")
+        self.other.commit()
+        self.assertIsNone(self.db_handler.fetch_appended_rows("log", "rowid", 7, 7))
+        self.assertIsNone(self.db_handler.fetch_appended_rows("log", "id", 7, 6))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Background Workers Test Suite
+測試背景工作模組的功能
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import sqlite3
+
+# 添加上一層目錄到 Python 路徑，以便能正確導入模組
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from db_handler import DBHandler
+from workers import QueryWorker, GlobalSearchWorker
+
+class TestQueryWorker(unittest.TestCase):
+    """測試 QueryWorker 類別"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.temp_db_fd, self.temp_db_path = tempfile.mkstemp(suffix='.db')
+
+        conn = sqlite3.connect(self.temp_db_path)
+        cursor = conn.cursor()
+        cursor.execute("CREATE TABLE test_table (id INTEGER PRIMARY KEY, name TEXT)")
+        cursor.executemany("INSERT INTO test_table (name) VALUES (?)",
+                           [(f"name{i}",) for i in range(25)])
+        conn.commit()
+        conn.close()
+
+        self.db_handler = DBHandler(self.temp_db_path)
+
+    def tearDown(self):
+        """清理測試環境"""
+        self.db_handler.disconnect_database()
+        os.close(self.temp_db_fd)
+        os.unlink(self.temp_db_path)
+
+    def test_rows_are_streamed_in_batches(self):
+        """測試搜尋結果分批送出"""
+        query, params = self.db_handler.build_search_query('test_table', 'name1')
+        worker = QueryWorker(self.db_handler, query, params, batch_size=4)
+
+        batches = []
+        finished = []
+        worker.rows_found.connect(batches.append)
+        worker.query_finished.connect(lambda total, cancelled: finished.append((total, cancelled)))
+
+        # 直接在目前執行緒執行，信號會同步送達
+        worker.run()
+
+        # name1, name10 ~ name19 共 11 筆
+        self.assertEqual(sum(len(batch) for batch in batches), 11)
+        self.assertTrue(all(len(batch) <= 4 for batch in batches))
+        self.assertEqual(finished, [(11, False)])
+
+    def test_cancel_before_start(self):
+        """測試在開始前取消搜尋"""
+        query, params = self.db_handler.build_search_query('test_table', 'name')
+        worker = QueryWorker(self.db_handler, query, params)
+
+        batches = []
+        finished = []
+        worker.rows_found.connect(batches.append)
+        worker.query_finished.connect(lambda total, cancelled: finished.append((total, cancelled)))
+
+        worker.cancel()
+        worker.run()
+
+        self.assertEqual(batches, [])
+        self.assertEqual(finished, [(0, True)])
+
+class TestGlobalSearchWorker(unittest.TestCase):
+    """測試 GlobalSearchWorker 類別"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.temp_db_fd, self.temp_db_path = tempfile.mkstemp(suffix='.db')
+
+        conn = sqlite3.connect(self.temp_db_path)
+        cursor = conn.cursor()
+        cursor.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT)")
+        cursor.execute("CREATE TABLE orders (order_id INTEGER PRIMARY KEY, email TEXT)")
+        cursor.execute("CREATE TABLE logs (id INTEGER PRIMARY KEY, message TEXT)")
+        cursor.execute("INSERT INTO users (email) VALUES ('alice@example.com'), ('bob@example.com'), ('alice@example.org')")
+        cursor.execute("INSERT INTO orders (email) VALUES ('alice@example.com')")
+        cursor.execute("INSERT INTO logs (message) VALUES ('nothing here')")
+        conn.commit()
+        conn.close()
+
+        self.db_handler = DBHandler(self.temp_db_path)
+
+    def tearDown(self):
+        """清理測試環境"""
+        self.db_handler.disconnect_database()
+        os.close(self.temp_db_fd)
+        os.unlink(self.temp_db_path)
+
+    def test_only_matching_tables_are_reported(self):
+        """測試查詢在 worker 中建立，且只回報有符合資料的表格"""
+        worker = GlobalSearchWorker(self.db_handler, 'alice', max_workers=2, row_limit=1)
+        started = []
+        matches = {}
+        progress = []
+        worker.search_started.connect(started.append)
+        worker.table_matched.connect(lambda table, columns, rows, timed_out: matches.update({table: rows}))
+        worker.progress.connect(lambda done, total: progress.append((done, total)))
+
+        worker.run()
+
+        self.assertEqual(started, [3])
+        self.assertEqual(sorted(matches), ['orders', 'users'])
+        self.assertEqual(len(matches['users']), 1)
+        self.assertEqual(progress[-1], (3, 3))
+
+if __name__ == '__main__':
+    unittest.main()
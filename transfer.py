@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Transfer
+以 ATTACH 與 INSERT ... SELECT 在資料庫之間複製表格（或部分資料列），資料完全在 SQLite 內部搬移
+"""
+
+import os
+import re
+import sqlite3
+from pathlib import Path
+
+from db_handler import quote_identifier
+
+# 附加來源資料庫時使用的 schema 名稱
+SOURCE_SCHEMA = 'source'
+
+# 目標表格已存在時的處理方式
+IF_EXISTS_FAIL = 'fail'
+IF_EXISTS_APPEND = 'append'
+IF_EXISTS_REPLACE = 'replace'
+
+# 識別字：雙引號、反引號、方括號或未加引號的名稱
+_IDENTIFIER = r'(?:"(?:[^"]|"")*"|`(?:[^`]|``)*`|\[[^\]]*\]|[^\s(]+)'
+
+# sqlite_master.sql 中的 CREATE 語句已正規化（沒有 TEMP、IF NOT EXISTS 與 schema 前綴）
+_CREATE_TABLE_PATTERN = re.compile(rf'^CREATE\s+(VIRTUAL\s+)?TABLE\s+{_IDENTIFIER}', re.IGNORECASE)
+_CREATE_INDEX_PATTERN = re.compile(rf'^CREATE\s+(UNIQUE\s+)?INDEX\s+{_IDENTIFIER}\s+ON\s+{_IDENTIFIER}',
+                                   re.IGNORECASE)
+
+
+def open_target_connection(path):
+    """開啟目標資料庫的寫入連接
+
+    以 URI 開啟，之後才能用 URI 以唯讀方式 ATTACH 來源資料庫；
+    check_same_thread=False 讓 UI 執行緒可以呼叫 interrupt() 取消複製。
+    """
+    return sqlite3.connect(Path(os.path.abspath(path)).as_uri(), uri=True, timeout=30, check_same_thread=False)
+
+
+def rename_create_table(sql, table_name):
+    """將 CREATE TABLE 語句中的表格名稱改為 table_name"""
+    return _CREATE_TABLE_PATTERN.sub(
+        lambda match: f"CREATE {(match.group(1) or '').upper()}TABLE {quote_identifier(table_name)}", sql, count=1)
+
+
+def rename_create_index(sql, index_name, table_name):
+    """將 CREATE INDEX 語句中的索引名稱與表格名稱改為 index_name、table_name"""
+    return _CREATE_INDEX_PATTERN.sub(
+        lambda match: (f"CREATE {(match.group(1) or '').upper()}INDEX {quote_identifier(index_name)} "
+                       f"ON {quote_identifier(table_name)}"), sql, count=1)
+
+
+def _table_columns(connection, schema, table_name):
+    """可寫入的欄位（略過產生欄位與虛擬表格的隱藏欄位）"""
+    return [row[0] for row in connection.execute(
+        "SELECT name FROM pragma_table_xinfo(?, ?) WHERE hidden = 0", (table_name, schema))]
+
+
+def _object_exists(connection, object_type, name):
+    return connection.execute("SELECT 1 FROM main.sqlite_master WHERE type = ? AND name = ? COLLATE NOCASE",
+                              (object_type, name)).fetchone() is not None
+
+
+def _unique_index_name(connection, name):
+    """目標資料庫已有同名索引時加上數字後綴"""
+    candidate, suffix = name, 2
+    while _object_exists(connection, 'index', candidate):
+        candidate = f"{name}_{suffix}"
+        suffix += 1
+    return candidate
+
+
+def copy_table(connection, source_path, source_table, target_table=None, where=None,
+               if_exists=IF_EXISTS_FAIL, create_indexes=True):
+    """將 source_path 中的 source_table 複製到 connection（目標資料庫）的 target_table，回傳複製的資料列數
+
+    來源資料庫以唯讀方式 ATTACH，資料列以單一 INSERT ... SELECT 在 SQLite 內部搬移，不經過 Python。
+    where 為套用在來源表格上的 SQL 條件（不含 WHERE 關鍵字），用於只複製部分資料列。
+    目標表格不存在時依來源的 CREATE TABLE 建立；已存在時依 if_exists 失敗、附加（只寫入同名欄位）
+    或刪除後重新建立。create_indexes=True 時，新建立的表格在資料載入後才建立來源表格的索引。
+    觸發程序不會被複製。全部在同一個交易中完成，失敗或被 interrupt() 取消時全部回滾。
+    """
+    target_table = target_table or source_table
+    source_uri = Path(os.path.abspath(source_path)).as_uri() + "?mode=ro"
+    connection.execute(f"ATTACH DATABASE ? AS {SOURCE_SCHEMA}", (source_uri,))
+    try:
+        row = connection.execute(
+            f"SELECT sql FROM {SOURCE_SCHEMA}.sqlite_master WHERE type = 'table' AND name = ?",
+            (source_table,)).fetchone()
+        if row is None:
+            raise ValueError(f"Table '{source_table}' does not exist in the source database")
+        create_sql = row[0]
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            created = True
+            if _object_exists(connection, 'table', target_table):
+                if if_exists == IF_EXISTS_APPEND:
+                    created = False
+                elif if_exists == IF_EXISTS_REPLACE:
+                    connection.execute(f"DROP TABLE main.{quote_identifier(target_table)}")
+                else:
+                    raise ValueError(f"Table '{target_table}' already exists in the target database")
+            if created:
+                connection.execute(rename_create_table(create_sql, target_table))
+
+            # 附加到既有表格時只寫入兩邊都有的欄位
+            target_columns = {column.lower() for column in _table_columns(connection, 'main', target_table)}
+            columns = [column for column in _table_columns(connection, SOURCE_SCHEMA, source_table)
+                       if column.lower() in target_columns]
+            if not columns:
+                raise ValueError(f"Table '{target_table}' has no columns in common with '{source_table}'")
+            column_list = ", ".join(quote_identifier(column) for column in columns)
+            insert_sql = (f"INSERT INTO main.{quote_identifier(target_table)} ({column_list}) "
+                          f"SELECT {column_list} FROM {SOURCE_SCHEMA}.{quote_identifier(source_table)}")
+            if where and where.strip():
+                insert_sql += f" WHERE {where}"
+            total = connection.execute(insert_sql).rowcount
+
+            if created and create_indexes:
+                # 資料載入後才建立索引，比逐列維護索引快得多
+                for index_name, index_sql in connection.execute(
+                        f"SELECT name, sql FROM {SOURCE_SCHEMA}.sqlite_master "
+                        "WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (source_table,)).fetchall():
+                    if target_table != source_table:
+                        index_name = index_name.replace(source_table, target_table)
+                    connection.execute(rename_create_index(
+                        index_sql, _unique_index_name(connection, index_name), target_table))
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+    finally:
+        connection.execute(f"DETACH DATABASE {SOURCE_SCHEMA}")
+    return total
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Database Watcher
+偵測其他程式對目前資料庫的寫入：QFileSystemWatcher 監看資料庫與 -wal 檔案，
+檔案變更時（以及定期輪詢）比較 PRAGMA data_version 與 schema_version，判斷是結構還是資料改變
+"""
+
+import os
+import sqlite3
+
+from PyQt5.QtCore import QFileSystemWatcher, QObject, QTimer, pyqtSignal
+
+# 輪詢間隔（毫秒）；檔案監看在某些檔案系統上收不到通知，輪詢作為後備
+WATCH_POLL_INTERVAL = 2000
+
+# 收到檔案變更通知後等待的毫秒數，合併同一次交易的多個通知
+WATCH_DEBOUNCE = 200
+
+
+class DatabaseWatcher(QObject):
+    """監看 DBHandler 目前連接的資料庫是否被其他連線修改
+
+    data_version 只在其他連線提交時改變，本連線的提交不會觸發；schema_version 在任何結構變更時改變。
+    兩個 PRAGMA 都只讀取資料庫標頭，成本很低。結構改變時發出 schema_changed，否則資料改變時發出 data_changed。
+    """
+
+    schema_changed = pyqtSignal()
+    data_changed = pyqtSignal()
+
+    def __init__(self, db_handler, poll_interval=WATCH_POLL_INTERVAL, parent=None):
+        super().__init__(parent)
+        self.db_handler = db_handler
+        self.data_version = None
+        self.schema_version = None
+
+        self.file_watcher = QFileSystemWatcher(self)
+        self.file_watcher.fileChanged.connect(self.on_file_changed)
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.timeout.connect(self.check)
+
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(poll_interval)
+        self.poll_timer.timeout.connect(self.check)
+
+    def start(self):
+        """記錄目前的版本並開始監看"""
+        self.data_version, self.schema_version = self.read_versions()
+        self.update_watched_paths()
+        self.poll_timer.start()
+
+    def stop(self):
+        self.poll_timer.stop()
+        self.debounce_timer.stop()
+        if self.file_watcher.files():
+            self.file_watcher.removePaths(self.file_watcher.files())
+
+    def read_versions(self):
+        """回傳 (data_version, schema_version)；沒有連接時為 (None, None)"""
+        connection = self.db_handler.connection
+        if connection is None:
+            return None, None
+        data_version = connection.execute("PRAGMA data_version").fetchone()[0]
+        schema_version = connection.execute("PRAGMA schema_version").fetchone()[0]
+        return data_version, schema_version
+
+    def update_watched_paths(self):
+        """監看資料庫與 -wal 檔案；-wal 檔案可能在連接後才建立，檔案被取代時監看也會失效，因此每次檢查都重新加入"""
+        db_path = self.db_handler.current_database
+        if not db_path:
+            return
+        watched = set(self.file_watcher.files())
+        paths = [path for path in (db_path, f"{db_path}-wal")
+                 if path not in watched and os.path.exists(path)]
+        if paths:
+            self.file_watcher.addPaths(paths)
+
+    def sync(self):
+        """記錄目前的版本但不發出信號；本程式透過其他連接寫入且已自行更新畫面後使用（例如 ANALYZE）"""
+        self.data_version, self.schema_version = self.read_versions()
+
+    def mark_data_seen(self, data_version):
+        """呼叫端已讀取 data_version 時的資料（例如重新載入了表格），之前的寫入不再通知"""
+        self.data_version = data_version
+
+    def on_file_changed(self, path):
+        self.debounce_timer.start(WATCH_DEBOUNCE)
+
+    def check(self):
+        """比較版本並發出對應的信號；回傳 'schema'、'data' 或 None（沒有改變）"""
+        self.update_watched_paths()
+        try:
+            data_version, schema_version = self.read_versions()
+        except sqlite3.Error:
+            # 例如其他連線正在進行排他鎖定，下一次輪詢再檢查
+            return None
+        if data_version is None:
+            return None
+
+        change = None
+        if schema_version != self.schema_version:
+            change = 'schema'
+        elif data_version != self.data_version:
+            change = 'data'
+        self.data_version, self.schema_version = data_version, schema_version
+
+        if change == 'schema':
+            self.schema_changed.emit()
+        elif change == 'data':
+            self.data_changed.emit()
+        return change
@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""
+SQLite Explorer - Background Workers
+在背景執行緒中執行耗時的資料庫操作，避免阻塞 UI
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PyQt5.QtCore import QThread, pyqtSignal
+from exporters import ExportCancelled, RowsCursor, dump_sql
+from importers import ImportCancelled
+from backup import BackupCancelled, backup_database
+from transfer import copy_table, open_target_connection
+from db_handler import AnalyzeCancelled, analyze_tables, build_search_query, table_index_list, table_schema_rows
+from schema import read_schema_snapshot
+
+
+class QueryWorker(QThread):
+    """在背景唯讀連接上執行查詢，並分批送出結果資料列
+
+    用於資料頁的搜尋與查詢頁的 SELECT；取消時以 interrupt() 中斷執行中的 SQL。
+    """
+
+    # 定義信號，用於通知 UI 更新
+    columns_ready = pyqtSignal(list)
+    rows_found = pyqtSignal(list)
+    query_finished = pyqtSignal(int, bool)  # 總筆數、是否被取消
+    query_failed = pyqtSignal(str)
+
+    def __init__(self, db_handler, query, params=None, batch_size=500, parent=None):
+        super().__init__(parent)
+        self.db_handler = db_handler
+        self.query = query
+        self.params = params or []
+        self.batch_size = batch_size
+        self._connection = None
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """取消查詢；正在執行的 SQL 會透過 interrupt() 立即中斷"""
+        with self._lock:
+            self._cancelled = True
+            if self._connection:
+                self._connection.interrupt()
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        total = 0
+        connection = None
+        try:
+            connection = self.db_handler.open_reader_connection()
+            if connection is None:
+                self.query_failed.emit("No database connected")
+                return
+
+            with self._lock:
+                if self._cancelled:
+                    return
+                self._connection = connection
+
+            cursor = connection.cursor()
+            cursor.execute(self.query, self.params)
+            self.columns_ready.emit([description[0] for description in cursor.description])
+
+            while not self._cancelled:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                total += len(rows)
+                self.rows_found.emit(rows)
+
+        except sqlite3.OperationalError as e:
+            # interrupt() 會讓查詢以 "interrupted" 錯誤結束，這是正常的取消流程
+            if not self._cancelled:
+                self.query_failed.emit(str(e))
+        except Exception as e:
+            self.query_failed.emit(str(e))
+        finally:
+            with self._lock:
+                self._connection = None
+            if connection:
+                connection.close()
+            self.query_finished.emit(total, self._cancelled)
+
+
+class GlobalSearchWorker(QThread):
+    """同時在多個表格中搜尋，使用一組唯讀連接平行執行
+
+    各表格的搜尋查詢在背景由唯讀連接讀取的結構快照建立，不佔用介面執行緒與主連接。
+    每個表格有各自的時間上限，超過時只回報已找到的部分，避免單一大表格拖住其他表格。
+    """
+
+    search_started = pyqtSignal(int)  # 要搜尋的表格數（沒有可搜尋欄位的表格不計）
+    table_matched = pyqtSignal(str, list, list, bool)  # 表格、欄位、資料列、是否逾時
+    progress = pyqtSignal(int, int)  # 已完成表格數、總表格數
+    search_finished = pyqtSignal(bool)  # 是否被取消
+
+    def __init__(self, db_handler, search_text, max_workers=4, row_limit=200,
+                 table_time_limit=2.0, parent=None):
+        super().__init__(parent)
+        self.db_handler = db_handler
+        self.search_text = search_text
+        self.max_workers = max_workers
+        self.row_limit = row_limit
+        self.table_time_limit = table_time_limit
+        self._cancelled = False
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """取消所有表格的搜尋"""
+        with self._lock:
+            self._cancelled = True
+            for connection in self._connections:
+                connection.interrupt()
+
+    def _open_connection(self):
+        connection = self.db_handler.open_reader_connection()
+        if connection is not None:
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def build_table_queries(self, connection):
+        """為每個表格建立搜尋查詢，回傳 [(表格, 查詢, 參數), ...]（沒有可搜尋欄位的表格略過）"""
+        snapshot = read_schema_snapshot(connection)
+        table_queries = []
+        for table_name in snapshot.table_names():
+            table_info = snapshot.table(table_name)
+            query, params = build_search_query(table_name, table_schema_rows(table_info),
+                                               table_index_list(table_info), self.search_text)
+            if query:
+                table_queries.append((table_name, query, params))
+        return table_queries
+
+    def run(self):
+        total = 0
+        done = 0
+        try:
+            connection = self._open_connection()
+            if connection is None:
+                return
+            table_queries = self.build_table_queries(connection)
+            total = len(table_queries)
+            self.search_started.emit(total)
+            if not table_queries or self._cancelled:
+                return
+
+            # 建立唯讀連接池，每個工作執行緒每次借用一條
+            pool = queue.Queue()
+            pool.put(connection)
+            for _ in range(min(self.max_workers, total) - 1):
+                connection = self._open_connection()
+                if connection is None:
+                    break
+                pool.put(connection)
+
+            with ThreadPoolExecutor(max_workers=pool.qsize()) as executor:
+                futures = [executor.submit(self._search_table, pool, *table_query)
+                           for table_query in table_queries]
+                for future in as_completed(futures):
+                    table_name, columns, rows, timed_out = future.result()
+                    done += 1
+                    if rows or timed_out:
+                        self.table_matched.emit(table_name, columns, rows, timed_out)
+                    self.progress.emit(done, total)
+        except sqlite3.Error as e:
+            # 讀取結構時被取消（interrupt）或資料庫無法讀取
+            if not self._cancelled:
+                print(f"Global search error: {e}")
+        finally:
+            with self._lock:
+                connections, self._connections = self._connections, []
+            for connection in connections:
+                connection.close()
+            self.search_finished.emit(self._cancelled)
+
+    def _search_table(self, pool, table_name, query, params):
+        """在單一表格中搜尋，回傳 (表格, 欄位, 資料列, 是否逾時)"""
+        if self._cancelled:
+            return table_name, [], [], False
+
+        connection = pool.get()
+        deadline = time.monotonic() + self.table_time_limit
+        timed_out = [False]
+
+        def check_deadline():
+            # 回傳非 0 值會讓 SQLite 中斷目前的查詢
+            if self._cancelled:
+                return 1
+            if time.monotonic() > deadline:
+                timed_out[0] = True
+                return 1
+            return 0
+
+        columns = []
+        rows = []
+        try:
+            connection.set_progress_handler(check_deadline, 10000)
+            cursor = connection.cursor()
+            cursor.execute(f"{query} LIMIT {int(self.row_limit)}", params)
+            columns = [description[0] for description in cursor.description]
+            while True:
+                batch = cursor.fetchmany(100)
+                if not batch:
+                    break
+                rows.extend(batch)
+        except sqlite3.OperationalError:
+            # 逾時或取消時保留已讀到的資料列
+            pass
+        except Exception as e:
+            print(f"Global search error in {table_name}: {e}")
+        finally:
+            connection.set_progress_handler(None, 0)
+            pool.put(connection)
+
+        return table_name, columns, rows, timed_out[0]
+
+
+class ExportWorker(QThread):
+    """在背景唯讀連接上執行查詢，並以 exporters 中的函式將結果串流寫入檔案
+
+    資料列直接由 cursor 逐批寫出，不經過表格模型，記憶體用量固定。
+    提供 rows（(欄位列表, 資料列列表)）時不執行查詢，直接匯出這些已在記憶體中的資料列。
+    """
+
+    progress = pyqtSignal(int)  # 已寫入的資料列數
+    export_finished = pyqtSignal(int, bool)  # 總筆數、是否被取消
+    export_failed = pyqtSignal(str)
+
+    def __init__(self, db_handler, query, params, path, export_function, options=None, rows=None, parent=None):
+        super().__init__(parent)
+        self.db_handler = db_handler
+        self.query = query
+        self.params = params or []
+        self.rows = rows
+        self.path = path
+        self.export_function = export_function
+        self.options = options or {}  # 傳給匯出函式的其他參數（例如 column_types）
+        self._connection = None
+        self._cancelled = False
+        self._total = 0
+        self.failed = False
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """取消匯出；正在執行的 SQL 會透過 interrupt() 立即中斷"""
+        with self._lock:
+            self._cancelled = True
+            if self._connection:
+                self._connection.interrupt()
+
+    def _fail(self, message):
+        self.failed = True
+        self.export_failed.emit(message)
+
+    def _report_progress(self, total):
+        self._total = total
+        self.progress.emit(total)
+        return self._cancelled
+
+    def _export(self, connection):
+        if self.rows is not None:
+            cursor = RowsCursor(*self.rows)
+        else:
+            cursor = connection.cursor()
+            cursor.execute(self.query, self.params)
+        return self.export_function(cursor, self.path, progress_callback=self._report_progress, **self.options)
+
+    def run(self):
+        connection = None
+        try:
+            connection = self.db_handler.open_reader_connection()
+            if connection is None:
+                self._fail("No database connected")
+                return
+
+            with self._lock:
+                if self._cancelled:
+                    return
+                self._connection = connection
+
+            self._total = self._export(connection)
+
+        except ExportCancelled:
+            pass
+        except sqlite3.OperationalError as e:
+            # interrupt() 會讓查詢以 "interrupted" 錯誤結束，這是正常的取消流程
+            if not self._cancelled:
+                self._fail(str(e))
+        except Exception as e:
+            self._fail(str(e))
+        finally:
+            with self._lock:
+                self._connection = None
+            if connection:
+                connection.close()
+            self.export_finished.emit(self._total, self._cancelled)
+
+
+class DumpWorker(ExportWorker):
+    """在背景唯讀連接上以 exporters.dump_sql 將資料庫 dump 為 SQL 檔案，並回報每個表格的進度"""
+
+    table_progress = pyqtSignal(int, str, int)  # 表格序號、表格名稱、該表格已寫入的列數
+
+    def __init__(self, db_handler, path, options=None, parent=None):
+        super().__init__(db_handler, None, None, path, dump_sql, options, parent)
+        self._finished_rows = 0  # 已完成的表格的總列數
+        self._table_index = -1
+
+    def _report_table_progress(self, index, table_name, rows):
+        if index != self._table_index:
+            self._finished_rows = self._total
+            self._table_index = index
+        self._total = self._finished_rows + rows
+        self.table_progress.emit(index, table_name, rows)
+        return self._cancelled
+
+    def _export(self, connection):
+        return self.export_function(connection, self.path, progress_callback=self._report_table_progress,
+                                    **self.options)
+
+
+class ImportWorker(QThread):
+    """在背景的寫入連接上執行 importers 中的匯入函式，並回報進度（筆數與每秒筆數）"""
+
+    progress = pyqtSignal(int, float)  # 已匯入的資料列數、每秒列數
+    import_finished = pyqtSignal(int, bool)  # 總筆數、是否被取消
+    import_failed = pyqtSignal(str)
+
+    def __init__(self, db_handler, import_function, options, parent=None):
+        super().__init__(parent)
+        self.db_handler = db_handler
+        self.import_function = import_function
+        self.options = options  # 傳給匯入函式的參數（檔案、表格、欄位對應等）
+        self._connection = None
+        self._cancelled = False
+        self._total = 0
+        self.rate = 0.0
+        self.failed = False
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """取消匯入；正在執行的 SQL 會透過 interrupt() 立即中斷，已寫入的資料列全部回滾"""
+        with self._lock:
+            self._cancelled = True
+            if self._connection:
+                self._connection.interrupt()
+
+    def _fail(self, message):
+        self.failed = True
+        self.import_failed.emit(message)
+
+    def _report_progress(self, total, rate):
+        self._total = total
+        self.rate = rate
+        self.progress.emit(total, rate)
+        return self._cancelled
+
+    def run(self):
+        connection = None
+        try:
+            connection = self.db_handler.open_writer_connection()
+            if connection is None:
+                self._fail("No database connected")
+                return
+
+            with self._lock:
+                if self._cancelled:
+                    return
+                self._connection = connection
+
+            self._total = self.import_function(connection, progress_callback=self._report_progress, **self.options)
+
+        except ImportCancelled:
+            pass
+        except sqlite3.OperationalError as e:
+            if not self._cancelled:
+                self._fail(str(e))
+        except Exception as e:
+            self._fail(str(e))
+        finally:
+            with self._lock:
+                self._connection = None
+            if connection:
+                connection.close()
+            self.import_finished.emit(0 if self._cancelled or self.failed else self._total, self._cancelled)
+
+
+class BackupWorker(QThread):
+    """在背景執行 backup.backup_database，並回報已複製的頁數"""
+
+    progress = pyqtSignal(int, int)  # 已複製頁數、總頁數
+    backup_finished = pyqtSignal(bool)  # 是否被取消
+    backup_failed = pyqtSignal(str)
+
+    def __init__(self, source_path, target_path, verify=False, parent=None):
+        super().__init__(parent)
+        self.source_path = source_path
+        self.target_path = target_path
+        self.verify = verify
+        self.page_count = 0
+        self.problems = None  # 完整性檢查發現的問題；未檢查時為 None
+        self.failed = False
+        self._cancelled = False
+
+    def cancel(self):
+        """取消備份；在下一步開始前停止，並刪除未完成的備份檔案"""
+        self._cancelled = True
+
+    def _report_progress(self, copied, total):
+        self.progress.emit(copied, total)
+        return self._cancelled
+
+    def run(self):
+        # 最後一步之後才要求取消時，備份已經完成，不視為取消
+        cancelled = False
+        try:
+            self.page_count, self.problems = backup_database(
+                self.source_path, self.target_path, progress_callback=self._report_progress, verify=self.verify)
+        except BackupCancelled:
+            cancelled = True
+        except Exception as e:
+            self.failed = True
+            self.backup_failed.emit(str(e))
+        finally:
+            self.backup_finished.emit(cancelled)
+
+
+class CopyTableWorker(QThread):
+    """在背景的目標資料庫連接上執行 transfer.copy_table（ATTACH 來源後以 INSERT ... SELECT 複製）"""
+
+    copy_finished = pyqtSignal(int, bool)  # 複製的資料列數、是否被取消
+    copy_failed = pyqtSignal(str)
+
+    def __init__(self, target_path, options, target_name=None, parent=None):
+        super().__init__(parent)
+        self.target_path = target_path
+        self.target_name = target_name or target_path  # 顯示用的目標連接名稱
+        self.options = options  # 傳給 copy_table 的參數（來源、表格、條件等）
+        self._connection = None
+        self._cancelled = False
+        self._total = 0
+        self.failed = False
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """取消複製；執行中的 INSERT ... SELECT 透過 interrupt() 中斷，已複製的資料列全部回滾"""
+        with self._lock:
+            self._cancelled = True
+            if self._connection:
+                self._connection.interrupt()
+
+    def run(self):
+        connection = None
+        cancelled = False
+        try:
+            connection = open_target_connection(self.target_path)
+            with self._lock:
+                if self._cancelled:
+                    cancelled = True
+                    return
+                self._connection = connection
+
+            self._total = copy_table(connection, **self.options)
+
+        except sqlite3.OperationalError as e:
+            # interrupt() 讓 INSERT ... SELECT 以 "interrupted" 錯誤結束；複製已完成時不視為取消
+            if self._cancelled:
+                cancelled = True
+            else:
+                self.failed = True
+                self.copy_failed.emit(str(e))
+        except Exception as e:
+            self.failed = True
+            self.copy_failed.emit(str(e))
+        finally:
+            with self._lock:
+                self._connection = None
+            if connection:
+                connection.close()
+            self.copy_finished.emit(0 if cancelled or self.failed else self._total, cancelled)
+
+
+class AnalyzeWorker(QThread):
+    """在背景的寫入連接上逐一表格執行 ANALYZE（見 db_handler.analyze_tables），並回報進度"""
+
+    progress = pyqtSignal(int, int, str)  # 已完成的表格數、表格總數、正在分析的表格
+    analyze_finished = pyqtSignal(bool)  # 是否被取消
+    analyze_failed = pyqtSignal(str)
+
+    def __init__(self, db_handler, tables, analysis_limit=0, parent=None):
+        super().__init__(parent)
+        self.db_handler = db_handler
+        self.tables = tables
+        self.analysis_limit = analysis_limit
+        self.analyzed = 0
+        self.failed = False
+        self._cancelled = False
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """取消分析；執行中的 ANALYZE 透過 interrupt() 中斷，已分析的表格保留新的統計資料"""
+        with self._lock:
+            self._cancelled = True
+            if self._connection:
+                self._connection.interrupt()
+
+    def _report_progress(self, done, total, table_name):
+        self.analyzed = done
+        self.progress.emit(done, total, table_name or "")
+        return self._cancelled
+
+    def run(self):
+        connection = None
+        cancelled = False
+        try:
+            connection = self.db_handler.open_writer_connection()
+            with self._lock:
+                self._connection = connection
+            analyze_tables(connection, self.tables, self.analysis_limit, self._report_progress)
+        except AnalyzeCancelled:
+            cancelled = True
+        except sqlite3.OperationalError as e:
+            if self._cancelled:
+                cancelled = True
+            else:
+                self.failed = True
+                self.analyze_failed.emit(str(e))
+        except Exception as e:
+            self.failed = True
+            self.analyze_failed.emit(str(e))
+        finally:
+            with self._lock:
+                self._connection = None
+            if connection:
+                connection.close()
+            self.analyze_finished.emit(cancelled)